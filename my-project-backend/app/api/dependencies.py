@@ -1,12 +1,25 @@
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from app.core.security import verify_token
 from app.core.config import settings
 from app.db.mongo import get_db
 from app.schemas.user import UserInDB
+from app.core.ratelimit import build_limiter
+import hmac
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 
+limiter = build_limiter(get_db)
+
+def get_client_identifier(request: Request) -> str:
+    """Get client IP for tracking likes/views without auth.
+
+    X-Forwarded-For is only honoured through uvicorn's proxy_headers for
+    FORWARDED_ALLOW_IPS (see serve.py), which rewrites request.client; reading
+    the header here would let any client pick its own rate-limit key.
+    """
+    return (request.client.host if request.client else None) or "unknown"
+
 async def get_current_user(token: str = Depends(oauth2_scheme), db=Depends(get_db)) -> UserInDB:
     """Get current authenticated user from JWT token"""
     credentials_exception = HTTPException(
@@ -47,3 +60,46 @@ async def get_current_superuser(current_user: UserInDB = Depends(get_current_act
             detail="Not enough permissions"
         )
     return current_user
+
+async def authenticate_superuser(token: str, db) -> UserInDB:
+    """Resolve a bearer token to an active admin outside FastAPI's dependency injection"""
+    user = await get_current_user(token, db)
+    return await get_current_superuser(await get_current_active_user(user))
+
+async def authorize_superuser_token(token: str) -> bool:
+    """True when the token belongs to an active admin (for ASGI middleware)"""
+    try:
+        await authenticate_superuser(token, get_db())
+        return True
+    except Exception:
+        # Invalid token, non-admin or lookup failure: serve the request unprofiled
+        return False
+
+async def require_metrics_access(request: Request, db=Depends(get_db)):
+    """Allow scrapers presenting METRICS_TOKEN, or an admin JWT"""
+    scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    if settings.metrics_token and hmac.compare_digest(token, settings.metrics_token):
+        return
+    await authenticate_superuser(token, db)
+
+async def enforce_rate_limit(policy_name: str, identifier: str, peek: bool = False):
+    """Raise 429 when the identifier's bucket for a policy is empty (peek: check without consuming)"""
+    result = await limiter.hit(policy_name, identifier, peek=peek)
+    if result is not None and not result.allowed:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many requests, please try again later",
+            headers={"Retry-After": str(max(1, int(result.retry_after + 0.999)))},
+        )
+
+def rate_limit(policy_name: str):
+    """Dependency limiting a route per client identifier (IP)"""
+    async def dependency(request: Request):
+        await enforce_rate_limit(policy_name, get_client_identifier(request))
+    return dependency
@@ -1,11 +1,24 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, BackgroundTasks
 from typing import List, Optional
 from datetime import datetime, timedelta
 from app.schemas.user import UserInDB, UserOut
-from app.api.dependencies import get_current_superuser
+from app.api.dependencies import get_current_superuser, limiter
 from app.db.mongo import get_db
 from app.core.config import settings
+from app.schemas.article import ArticleBulkAction
+from app.schemas.comment import CommentBulkDelete
+from app.schemas.settings import SiteSettingsUpdate
+from app.services.article_import import import_articles, DEFAULT_BATCH_SIZE
+from app.services import events
+from app.services.site_settings import site_settings
+from app.services.taxonomy import TAXONOMY_FIELDS, record_change, record_guarded_changes, get_facets
+from app.core.profiling import list_profiles, get_profile, to_collapsed, to_speedscope
+from fastapi.responses import PlainTextResponse
+from app.core.memory import memory_diagnostics
+from app.db.slow_queries import SLOW_QUERIES, list_slow_queries
+import asyncio
 from bson import ObjectId
+from pymongo import ReturnDocument, UpdateOne
 
 router = APIRouter()
 
@@ -47,12 +60,8 @@ async def get_dashboard_stats(
             "created_at": {"$gte": seven_days_ago}
         })
         
-        # Category distribution
-        pipeline = [
-            {"$group": {"_id": "$category", "count": {"$sum": 1}}},
-            {"$sort": {"count": -1}}
-        ]
-        category_stats = await db[settings.articles_collection].aggregate(pipeline).to_list(100)
+        # Category distribution (maintained incrementally, see app/services/taxonomy.py)
+        facets = await get_facets(db, approved_only=False)
         
         return {
             "users": {
@@ -76,14 +85,27 @@ async def get_dashboard_stats(
                 "comments_last_7_days": recent_comments
             },
             "category_distribution": [
-                {"category": item["_id"], "count": item["count"]} 
-                for item in category_stats
+                {"category": item["name"], "count": item["count"]} 
+                for item in facets["categories"]
             ]
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/taxonomy")
+async def get_taxonomy_admin(
+    limit: int = Query(default=200, ge=1, le=1000),
+    current_admin: UserInDB = Depends(get_current_superuser),
+    db = Depends(get_db)
+):
+    """Tag and category counts including unpublished articles"""
+    try:
+        return await get_facets(db, approved_only=False, limit=limit)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 # ==================== USER MANAGEMENT ====================
 @router.get("/users", response_model=dict)
 async def get_all_users(
@@ -167,6 +189,7 @@ async def update_user(
 @router.delete("/users/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_user(
     user_id: str,
+    background_tasks: BackgroundTasks,
     current_admin: UserInDB = Depends(get_current_superuser),
     db = Depends(get_db)
 ):
@@ -184,8 +207,12 @@ async def delete_user(
         await db[settings.users_collection].delete_one({"_id": ObjectId(user_id)})
         
         # Also delete user's articles and comments
-        await db[settings.articles_collection].delete_many({"authorId": user_id})
+        articles = await db[settings.articles_collection].find({"authorId": user_id}, TAXONOMY_FIELDS).to_list(length=None)
+        res = await db[settings.articles_collection].delete_many({"_id": {"$in": [doc["_id"] for doc in articles]}})
+        await record_guarded_changes(db, [(doc, None) for doc in articles], len(articles), res.deleted_count)
         await db[settings.comments_collection].delete_many({"author_id": user_id})
+        # Sitemap/feeds, the homepage bundle and related lists drop the slugs
+        background_tasks.add_task(events.article_changed, db, [doc["slug"] for doc in articles], events.DELETED)
         
         return None
     except HTTPException:
@@ -238,22 +265,180 @@ async def get_all_articles_admin(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/articles/import")
+async def import_articles_admin(
+    request: Request,
+    background_tasks: BackgroundTasks,
+    batch_size: int = Query(default=DEFAULT_BATCH_SIZE, ge=1, le=5000),
+    current_admin: UserInDB = Depends(get_current_superuser),
+    db = Depends(get_db)
+):
+    """Bulk import articles from an NDJSON body (one article per line)"""
+    try:
+        body = (await request.body()).decode("utf-8")
+        default_author = {
+            "id": current_admin.id,
+            "email": current_admin.email,
+            "name": current_admin.full_name,
+        }
+        summary = await import_articles(
+            db[settings.articles_collection],
+            body.splitlines(),
+            default_author,
+            batch_size=batch_size,
+        )
+        background_tasks.add_task(
+            events.article_changed, db, [r["slug"] for r in summary["results"] if r["ok"]], events.IMPORTED
+        )
+        return summary
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="Body must be UTF-8 encoded NDJSON")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+async def bulk_update_articles(db, slugs: List[str], update: dict) -> dict:
+    """Apply one $set to many articles by slug and report per-slug results"""
+    slugs = list(dict.fromkeys(slugs))
+    cursor = db[settings.articles_collection].find({"slug": {"$in": slugs}}, TAXONOMY_FIELDS)
+    before = {doc["slug"]: doc async for doc in cursor}
+    found = set(before)
+
+    if "status" in update:
+        # Each write only applies if the status is still the one read above,
+        # so the recorded deltas match what actually changed
+        res = await db[settings.articles_collection].bulk_write([
+            UpdateOne({"_id": doc["_id"], "status": doc.get("status")}, {"$set": update})
+            for doc in before.values()
+        ], ordered=False) if before else None
+        matched = res.matched_count if res else 0
+        await record_guarded_changes(
+            db, [(doc, {**doc, **update}) for doc in before.values()], len(before), matched
+        )
+    else:
+        res = await db[settings.articles_collection].update_many(
+            {"slug": {"$in": list(found)}},
+            {"$set": update}
+        )
+        matched = res.matched_count
+    return {
+        "matched": matched,
+        "modified": res.modified_count if res else 0,
+        "results": [
+            {"slug": slug, "ok": slug in found, **({} if slug in found else {"error": "Article not found"})}
+            for slug in slugs
+        ]
+    }
+
+
+@router.put("/articles/bulk/approve")
+async def bulk_approve_articles(
+    payload: ArticleBulkAction,
+    background_tasks: BackgroundTasks,
+    current_admin: UserInDB = Depends(get_current_superuser),
+    db = Depends(get_db)
+):
+    """Approve many articles in one round trip"""
+    try:
+        result = await bulk_update_articles(
+            db, payload.slugs, {"status": "approved", "updatedAt": datetime.utcnow()}
+        )
+        background_tasks.add_task(
+            events.article_changed, db, [r["slug"] for r in result["results"] if r["ok"]], events.APPROVED
+        )
+        return result
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.put("/articles/bulk/reject")
+async def bulk_reject_articles(
+    payload: ArticleBulkAction,
+    background_tasks: BackgroundTasks,
+    current_admin: UserInDB = Depends(get_current_superuser),
+    db = Depends(get_db)
+):
+    """Reject many articles in one round trip"""
+    try:
+        update_data = {"status": "rejected", "updatedAt": datetime.utcnow()}
+        if payload.reason:
+            update_data["rejection_reason"] = payload.reason
+        result = await bulk_update_articles(db, payload.slugs, update_data)
+        background_tasks.add_task(
+            events.article_changed, db, [r["slug"] for r in result["results"] if r["ok"]], events.REJECTED
+        )
+        return result
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.put("/articles/bulk/feature")
+async def bulk_feature_articles(
+    payload: ArticleBulkAction,
+    background_tasks: BackgroundTasks,
+    current_admin: UserInDB = Depends(get_current_superuser),
+    db = Depends(get_db)
+):
+    """Feature or unfeature many articles in one round trip"""
+    try:
+        result = await bulk_update_articles(
+            db, payload.slugs, {"isFeatured": payload.is_featured, "updatedAt": datetime.utcnow()}
+        )
+        background_tasks.add_task(
+            events.article_changed, db, [r["slug"] for r in result["results"] if r["ok"]], events.FEATURED
+        )
+        return result
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/articles/bulk/delete")
+async def bulk_delete_articles(
+    payload: ArticleBulkAction,
+    background_tasks: BackgroundTasks,
+    current_admin: UserInDB = Depends(get_current_superuser),
+    db = Depends(get_db)
+):
+    """Delete many articles in one round trip"""
+    try:
+        slugs = list(dict.fromkeys(payload.slugs))
+        cursor = db[settings.articles_collection].find({"slug": {"$in": slugs}}, TAXONOMY_FIELDS)
+        before = {doc["slug"]: doc async for doc in cursor}
+        found = set(before)
+
+        res = await db[settings.articles_collection].delete_many({"_id": {"$in": [doc["_id"] for doc in before.values()]}})
+        await record_guarded_changes(db, [(doc, None) for doc in before.values()], len(before), res.deleted_count)
+        background_tasks.add_task(events.article_changed, db, list(found), events.DELETED)
+        return {
+            "deleted": res.deleted_count,
+            "results": [
+                {"slug": slug, "ok": slug in found, **({} if slug in found else {"error": "Article not found"})}
+                for slug in slugs
+            ]
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.put("/articles/{slug}/approve")
 async def approve_article(
     slug: str,
+    background_tasks: BackgroundTasks,
     current_admin: UserInDB = Depends(get_current_superuser),
     db = Depends(get_db)
 ):
     """Approve an article"""
     try:
-        article = await db[settings.articles_collection].find_one({"slug": slug})
-        if not article:
-            raise HTTPException(status_code=404, detail="Article not found")
-        
-        await db[settings.articles_collection].update_one(
+        update_data = {"status": "approved", "updatedAt": datetime.utcnow()}
+        before = await db[settings.articles_collection].find_one_and_update(
             {"slug": slug},
-            {"$set": {"status": "approved", "updatedAt": datetime.utcnow()}}
+            {"$set": update_data},
+            return_document=ReturnDocument.BEFORE,
         )
+        if not before:
+            raise HTTPException(status_code=404, detail="Article not found")
+        await record_change(db, before, {**before, **update_data})
+        background_tasks.add_task(events.article_changed, db, [slug], events.APPROVED)
         
         return {"message": "Article approved successfully"}
     except Exception as e:
@@ -263,24 +448,26 @@ async def approve_article(
 @router.put("/articles/{slug}/reject")
 async def reject_article(
     slug: str,
+    background_tasks: BackgroundTasks,
     reason: Optional[str] = None,
     current_admin: UserInDB = Depends(get_current_superuser),
     db = Depends(get_db)
 ):
     """Reject an article"""
     try:
-        article = await db[settings.articles_collection].find_one({"slug": slug})
-        if not article:
-            raise HTTPException(status_code=404, detail="Article not found")
-        
         update_data = {"status": "rejected", "updatedAt": datetime.utcnow()}
         if reason:
             update_data["rejection_reason"] = reason
         
-        await db[settings.articles_collection].update_one(
+        before = await db[settings.articles_collection].find_one_and_update(
             {"slug": slug},
-            {"$set": update_data}
+            {"$set": update_data},
+            return_document=ReturnDocument.BEFORE,
         )
+        if not before:
+            raise HTTPException(status_code=404, detail="Article not found")
+        await record_change(db, before, {**before, **update_data})
+        background_tasks.add_task(events.article_changed, db, [slug], events.REJECTED)
         
         return {"message": "Article rejected successfully"}
     except Exception as e:
@@ -291,6 +478,7 @@ async def reject_article(
 async def toggle_feature_article(
     slug: str,
     is_featured: bool,
+    background_tasks: BackgroundTasks,
     current_admin: UserInDB = Depends(get_current_superuser),
     db = Depends(get_db)
 ):
@@ -304,6 +492,7 @@ async def toggle_feature_article(
             {"slug": slug},
             {"$set": {"isFeatured": is_featured, "updatedAt": datetime.utcnow()}}
         )
+        background_tasks.add_task(events.article_changed, db, [slug], events.FEATURED)
         
         return {"message": f"Article {'featured' if is_featured else 'unfeatured'} successfully"}
     except Exception as e:
@@ -342,6 +531,40 @@ async def get_all_comments_admin(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/comments/bulk/delete")
+async def bulk_delete_comments_admin(
+    payload: CommentBulkDelete,
+    current_admin: UserInDB = Depends(get_current_superuser),
+    db = Depends(get_db)
+):
+    """Delete many comments in one round trip (admin)"""
+    try:
+        ids = list(dict.fromkeys(payload.ids))
+        oids = {}
+        for comment_id in ids:
+            if ObjectId.is_valid(comment_id):
+                oids[comment_id] = ObjectId(comment_id)
+
+        cursor = db[settings.comments_collection].find({"_id": {"$in": list(oids.values())}}, {"_id": 1})
+        found = {str(doc["_id"]) async for doc in cursor}
+
+        res = await db[settings.comments_collection].delete_many(
+            {"_id": {"$in": [oids[comment_id] for comment_id in found]}}
+        )
+
+        results = []
+        for comment_id in ids:
+            if comment_id not in oids:
+                results.append({"id": comment_id, "ok": False, "error": "Invalid comment id"})
+            elif comment_id not in found:
+                results.append({"id": comment_id, "ok": False, "error": "Comment not found"})
+            else:
+                results.append({"id": comment_id, "ok": True})
+        return {"deleted": res.deleted_count, "results": results}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.delete("/comments/{comment_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_comment_admin(
     comment_id: str,
@@ -412,6 +635,165 @@ async def get_database_stats(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+# ==================== RATE LIMITING ====================
+@router.get("/rate-limits")
+async def get_rate_limit_stats(
+    current_admin: UserInDB = Depends(get_current_superuser)
+):
+    """Rate limit policies and allowed/rejected counters for this worker"""
+    return limiter.stats()
+
+
+# ==================== PROFILING ====================
+@router.get("/profiles")
+async def get_request_profiles(
+    limit: int = Query(default=50, ge=1, le=200),
+    current_admin: UserInDB = Depends(get_current_superuser),
+    db = Depends(get_db)
+):
+    """Recent request profiles (send X-Profile: sample|cprofile to record one)"""
+    try:
+        return {"items": await list_profiles(db, limit)}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/profiles/{profile_id}")
+async def get_request_profile(
+    profile_id: str,
+    format: str = Query(default="speedscope", pattern="^(speedscope|collapsed|raw)$"),
+    current_admin: UserInDB = Depends(get_current_superuser),
+    db = Depends(get_db)
+):
+    """Download a profile as speedscope JSON, collapsed stacks, or the stored document"""
+    profile = await get_profile(db, profile_id)
+    if not profile:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    if format == "raw":
+        return profile
+    if "stats" in profile:
+        # cProfile output is already a text report
+        return PlainTextResponse(profile["stats"])
+    if format == "collapsed":
+        return PlainTextResponse(to_collapsed(profile["stacks"]))
+    return to_speedscope(profile)
+
+
+# ==================== MEMORY DIAGNOSTICS ====================
+# Per worker: repeat calls may land on different workers (check "pid")
+@router.get("/memory")
+async def get_memory_status(
+    current_admin: UserInDB = Depends(get_current_superuser)
+):
+    """RSS, tracemalloc state and stored snapshot names for this worker"""
+    return memory_diagnostics.status()
+
+
+@router.post("/memory/tracemalloc/start")
+async def start_tracemalloc(
+    frames: int = Query(default=1, ge=1, le=50),
+    current_admin: UserInDB = Depends(get_current_superuser)
+):
+    """Start tracing allocations (more frames = more overhead)"""
+    memory_diagnostics.start_tracing(frames)
+    return memory_diagnostics.status()
+
+
+@router.post("/memory/tracemalloc/stop")
+async def stop_tracemalloc(
+    current_admin: UserInDB = Depends(get_current_superuser)
+):
+    """Stop tracing; stored snapshots can still be diffed"""
+    memory_diagnostics.stop_tracing()
+    return memory_diagnostics.status()
+
+
+@router.post("/memory/snapshots")
+async def take_memory_snapshot(
+    name: Optional[str] = Query(default=None, max_length=64),
+    group_by: str = Query(default="lineno", pattern="^(lineno|filename|traceback)$"),
+    limit: int = Query(default=20, ge=1, le=200),
+    current_admin: UserInDB = Depends(get_current_superuser)
+):
+    """Take a named tracemalloc snapshot and return its top allocation sites"""
+    try:
+        return await asyncio.to_thread(memory_diagnostics.take_snapshot, name, group_by, limit)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+
+@router.get("/memory/snapshots/diff")
+async def diff_memory_snapshots(
+    base: str,
+    compare: Optional[str] = Query(default=None, description="Defaults to a fresh snapshot"),
+    group_by: str = Query(default="lineno", pattern="^(lineno|filename|traceback)$"),
+    limit: int = Query(default=20, ge=1, le=200),
+    current_admin: UserInDB = Depends(get_current_superuser)
+):
+    """Allocation growth between two snapshots, largest first"""
+    try:
+        return await asyncio.to_thread(memory_diagnostics.diff, base, compare, group_by, limit)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=f"Snapshot not found: {e.args[0]}")
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+
+@router.get("/memory/gc")
+async def get_gc_stats(
+    current_admin: UserInDB = Depends(get_current_superuser)
+):
+    """GC thresholds, per-generation counts and collection stats"""
+    return memory_diagnostics.gc_stats()
+
+
+@router.post("/memory/gc/collect")
+async def run_gc_collect(
+    generation: int = Query(default=2, ge=0, le=2),
+    current_admin: UserInDB = Depends(get_current_superuser)
+):
+    """Force a collection and report objects collected / RSS released"""
+    return await asyncio.to_thread(memory_diagnostics.collect, generation)
+
+
+@router.get("/memory/objects")
+async def get_object_counts(
+    limit: int = Query(default=30, ge=1, le=500),
+    current_admin: UserInDB = Depends(get_current_superuser)
+):
+    """Live objects by type (walks the heap; takes a moment on big workers)"""
+    items = await asyncio.to_thread(memory_diagnostics.object_counts, limit)
+    return {"pid": memory_diagnostics.status()["pid"], "items": items}
+
+
+# ==================== SLOW QUERIES ====================
+@router.get("/slow-queries")
+async def get_slow_queries(
+    sort: str = Query(default="max_ms", pattern="^(max_ms|total_ms|count|last_seen)$"),
+    limit: int = Query(default=50, ge=1, le=500),
+    current_admin: UserInDB = Depends(get_current_superuser),
+    db = Depends(get_db)
+):
+    """Mongo commands over SLOW_QUERY_MS by shape, with routes, plan and index suggestions"""
+    try:
+        return {"threshold_ms": settings.slow_query_ms, "items": await list_slow_queries(db, sort, limit)}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.delete("/slow-queries")
+async def clear_slow_queries(
+    current_admin: UserInDB = Depends(get_current_superuser),
+    db = Depends(get_db)
+):
+    """Forget recorded shapes (e.g. after adding indexes) so they are explained again"""
+    try:
+        result = await SLOW_QUERIES(db).delete_many({})
+        return {"deleted": result.deleted_count}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 # ==================== SETTINGS ====================
 @router.get("/settings")
 async def get_admin_settings(
@@ -420,51 +802,22 @@ async def get_admin_settings(
 ):
     """Get admin settings"""
     try:
-        # Check if settings collection exists, if not create default
-        settings_doc = await db["settings"].find_one({"type": "admin"})
-        
-        if not settings_doc:
-            # Create default settings
-            default_settings = {
-                "type": "admin",
-                "site_name": "IAS UWU Blog",
-                "site_description": "IEEE Industry Applications Society - Uva Wellassa University Student Branch Chapter",
-                "allow_registration": True,
-                "require_email_verification": False,
-                "auto_approve_articles": False,
-                "featured_articles_limit": 5,
-                "articles_per_page": 10,
-                "enable_comments": True,
-                "updated_at": datetime.utcnow()
-            }
-            await db["settings"].insert_one(default_settings)
-            settings_doc = default_settings
-        
-        settings_doc["id"] = str(settings_doc.pop("_id", ""))
-        return settings_doc
+        # Version check only, so an edit made on another worker shows up at once
+        await site_settings.refresh(db)
+        return site_settings.snapshot()
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.put("/settings")
 async def update_admin_settings(
-    settings_update: dict,
+    settings_update: SiteSettingsUpdate,
     current_admin: UserInDB = Depends(get_current_superuser),
     db = Depends(get_db)
 ):
-    """Update admin settings"""
+    """Update admin settings (other workers pick them up within SITE_SETTINGS_REFRESH_SECONDS)"""
     try:
-        # Remove _id if present
-        settings_update.pop("_id", None)
-        settings_update.pop("id", None)
-        settings_update["updated_at"] = datetime.utcnow()
-        
-        await db["settings"].update_one(
-            {"type": "admin"},
-            {"$set": settings_update},
-            upsert=True
-        )
-        
-        return {"message": "Settings updated successfully"}
+        snapshot = await site_settings.update(db, settings_update.model_dump(exclude_none=True))
+        return {"message": "Settings updated successfully", "version": snapshot["version"]}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
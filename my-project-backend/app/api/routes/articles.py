@@ -1,17 +1,31 @@
 from typing import Optional, List
-from fastapi import APIRouter, HTTPException, Query, Depends
-from app.db.mongo import get_db
+from fastapi import APIRouter, HTTPException, Query, Depends, Request, BackgroundTasks
+from app.db.mongo import get_db, get_read_db
 from app.core.config import settings
-from app.schemas.article import ArticleCreate, ArticleUpdate, ArticleOut
-from app.api.dependencies import get_current_active_user, get_current_superuser
+from app.schemas.article import ArticleCreate, ArticleUpdate, ArticleOut, ArticleStatsRequest
+from app.api.dependencies import get_current_active_user, get_current_superuser, rate_limit
 from app.schemas.user import UserInDB
+from app.core.responses import FastJSONResponse, dumps, etag_json_response
+from app.services.article_text import generate_slug, calculate_reading_time
+from app.services.related import get_related
+from app.services import events
+from app.services.taxonomy import record_change
+from app.services.trending import trending, record_view, record_like
+from app.services.site_settings import MAX_ARTICLES_PER_PAGE, site_settings
 from bson import ObjectId
+from pymongo import ReturnDocument
 from datetime import datetime
-import re
+import logging
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
 
 COLLECTION = lambda: get_db()[settings.articles_collection]
+# Public listings tolerate replica lag; writes and read-after-write use COLLECTION
+READ_COLLECTION = lambda: get_read_db()[settings.articles_collection]
+STATS_PROJECTION = {"slug": 1, "viewCount": 1, "likesCount": 1}
+# Longer lists go through POST /articles/stats
+MAX_STATS_SLUGS_GET = 100
 
 
 def serialize(doc: dict) -> dict:
@@ -20,28 +34,17 @@ def serialize(doc: dict) -> dict:
     doc["_id"] = str(doc.get("_id"))
     return doc
 
-def generate_slug(title: str) -> str:
-    """Generate URL-friendly slug from title"""
-    slug = title.lower()
-    slug = re.sub(r'[^a-z0-9\s-]', '', slug)
-    slug = re.sub(r'\s+', '-', slug)
-    return slug
-
-def calculate_reading_time(content: str) -> str:
-    """Calculate estimated reading time (200 words per minute)"""
-    word_count = len(content.split())
-    minutes = max(1, round(word_count / 200))
-    return f"{minutes} min read"
-
 @router.get("/", response_model=dict)
 async def list_articles(
+    request: Request,
     category: Optional[str] = Query(default=None),
     featured: Optional[bool] = Query(default=None),
     status: Optional[str] = Query(default="approved"),  # Default show only approved
     skip: int = Query(default=0, ge=0),
-    limit: int = Query(default=20, ge=1, le=100),
+    limit: Optional[int] = Query(default=None, ge=1, le=MAX_ARTICLES_PER_PAGE, description="Defaults to the articles_per_page setting"),
 ):
     """List articles (public sees approved only, admins can see all)"""
+    limit = limit or site_settings.articles_per_page()
     filt = {}
     if category and category != "All":
         filt["category"] = category
@@ -50,22 +53,92 @@ async def list_articles(
     if status:
         filt["status"] = status
 
-    cursor = COLLECTION().find(filt).skip(skip).limit(limit).sort("createdAt", -1)
+    cursor = READ_COLLECTION().find(filt).skip(skip).limit(limit).sort("createdAt", -1)
     items = [serialize(doc) async for doc in cursor]
-    return {"items": items, "count": len(items)}
+    return etag_json_response(request, dumps({"items": items, "count": len(items)}))
+
+
+@router.get("/trending")
+async def list_trending_articles(limit: int = Query(default=10, ge=1, le=50)):
+    """Trending approved articles ranked by time-decayed views and likes"""
+    ranked = trending.top(limit * 2)
+    if not ranked:
+        return FastJSONResponse({"items": [], "count": 0})
+    cursor = READ_COLLECTION().find(
+        {"slug": {"$in": [slug for slug, _ in ranked]}, "status": "approved"},
+        {"content": 0, "likes": 0},
+    )
+    docs = {doc["slug"]: serialize(doc) async for doc in cursor}
+    items = [
+        {**docs[slug], "trendingScore": round(score, 4)}
+        for slug, score in ranked if slug in docs
+    ][:limit]
+    return FastJSONResponse({"items": items, "count": len(items)})
+
+
+async def batch_stats(request: Request, slugs: List[str]):
+    """Stats keyed by slug from one $in query plus one grouped comment count"""
+    slugs = list(dict.fromkeys(s.strip() for s in slugs if s.strip()))
+    docs = {
+        doc["slug"]: doc
+        async for doc in READ_COLLECTION().find({"slug": {"$in": slugs}}, STATS_PROJECTION)
+    }
+    comments = {}
+    if docs:
+        rows = await get_read_db()[settings.comments_collection].aggregate([
+            {"$match": {"article_id": {"$in": [str(doc["_id"]) for doc in docs.values()]}}},
+            {"$group": {"_id": "$article_id", "count": {"$sum": 1}}},
+        ]).to_list(length=None)
+        comments = {row["_id"]: row["count"] for row in rows}
+    items = {
+        slug: {
+            "viewCount": docs[slug].get("viewCount", 0),
+            "likesCount": docs[slug].get("likesCount", 0),
+            "commentsCount": comments.get(str(docs[slug]["_id"]), 0),
+        }
+        for slug in slugs if slug in docs
+    }
+    body = {"items": items, "missing": [slug for slug in slugs if slug not in docs]}
+    return etag_json_response(request, dumps(body))
+
+
+@router.get("/stats")
+async def get_articles_stats(
+    request: Request,
+    slugs: str = Query(..., description=f"Comma-separated slugs (up to {MAX_STATS_SLUGS_GET})"),
+):
+    """Views, likes and comment counts for many articles in one call"""
+    requested = slugs.split(",")
+    if len(requested) > MAX_STATS_SLUGS_GET:
+        raise HTTPException(status_code=400, detail=f"Too many slugs; use POST /articles/stats for more than {MAX_STATS_SLUGS_GET}")
+    return await batch_stats(request, requested)
+
+
+@router.post("/stats")
+async def post_articles_stats(payload: ArticleStatsRequest, request: Request):
+    """Batch stats for long slug lists"""
+    return await batch_stats(request, payload.slugs)
 
 
 @router.get("/{slug}")
-async def get_article(slug: str):
+async def get_article(slug: str, request: Request):
     doc = await COLLECTION().find_one({"slug": slug})
     if not doc:
         raise HTTPException(status_code=404, detail="Article not found")
-    return serialize(doc)
+    return etag_json_response(request, dumps(serialize(doc)))
+
+
+@router.get("/{slug}/related")
+async def get_related_articles(slug: str, limit: int = Query(default=6, ge=1, le=20)):
+    """Related articles from the precomputed top-k neighbours"""
+    related = await get_related(get_read_db(), slug, limit)
+    return FastJSONResponse({"slug": slug, "items": related or [], "count": len(related or [])})
 
 
 @router.post("/", response_model=ArticleOut, status_code=201)
 async def create_article(
     payload: ArticleCreate,
+    background_tasks: BackgroundTasks,
     current_user: UserInDB = Depends(get_current_active_user)
 ):
     """Create a new article (requires authentication)"""
@@ -84,6 +157,7 @@ async def create_article(
     
     # Create article document
     now = datetime.utcnow()
+    auto_approve = site_settings.get("auto_approve_articles", False)
     article_dict = {
         "slug": slug,
         "title": payload.title,
@@ -96,7 +170,7 @@ async def create_article(
         "featuredImage": str(payload.featuredImage) if payload.featuredImage else None,
         "shortDescription": payload.shortDescription,
         "content": payload.content,
-        "status": "pending",  # All articles start as pending
+        "status": "approved" if auto_approve else "pending",  # Pending until an admin approves
         "isFeatured": False,
         "viewCount": 0,
         "likesCount": 0,
@@ -105,11 +179,14 @@ async def create_article(
         "updatedAt": now
     }
     
-    res = await COLLECTION().insert_one(article_dict)
-    created = await COLLECTION().find_one({"_id": res.inserted_id})
-    created["id"] = str(created.pop("_id"))
+    # insert_one sets _id on the dict, so no re-read or model round trip is needed
+    await COLLECTION().insert_one(article_dict)
+    await record_change(get_db(), None, article_dict)
+    if auto_approve:
+        background_tasks.add_task(events.article_changed, get_db(), [slug], events.APPROVED)
+    article_dict["id"] = str(article_dict.pop("_id"))
     
-    return ArticleOut(**created)
+    return FastJSONResponse(article_dict, status_code=201)
 
 
 @router.get("/my/articles", response_model=dict)
@@ -119,9 +196,6 @@ async def get_my_articles(
     limit: int = Query(default=20, ge=1, le=100),
 ):
     """Get current user's submitted articles"""
-    # Debug: print user info
-    print(f"DEBUG - Current user ID: {current_user.id}, Email: {current_user.email}")
-    
     # Try to find articles by authorId OR authorEmail as fallback
     filt = {
         "$or": [
@@ -131,11 +205,7 @@ async def get_my_articles(
     }
     cursor = COLLECTION().find(filt).skip(skip).limit(limit).sort("createdAt", -1)
     items = [serialize(doc) async for doc in cursor]
-    
-    # Debug: print articles found
-    print(f"DEBUG - Found {len(items)} articles")
-    if items:
-        print(f"DEBUG - First article authorId: {items[0].get('authorId')}, authorEmail: {items[0].get('authorEmail')}")
+    logger.debug("Listed own articles", extra={"user_id": current_user.id, "found": len(items)})
     
     return {"items": items, "count": len(items)}
 
@@ -143,6 +213,7 @@ async def get_my_articles(
 async def update_article(
     slug: str,
     payload: ArticleUpdate,
+    background_tasks: BackgroundTasks,
     current_user: UserInDB = Depends(get_current_active_user)
 ):
     """Update an article (author can edit own articles, admin can edit any)"""
@@ -164,16 +235,22 @@ async def update_article(
     
     update["updatedAt"] = datetime.utcnow()
     
-    res = await COLLECTION().find_one_and_update(
+    before = await COLLECTION().find_one_and_update(
         {"slug": slug},
         {"$set": update},
-        return_document=True,
+        return_document=ReturnDocument.BEFORE,
     )
+    if not before:
+        raise HTTPException(status_code=404, detail="Article not found")
+    res = {**before, **update}
+    await record_change(get_db(), before, res)
+    background_tasks.add_task(events.article_changed, get_db(), [slug], events.UPDATED)
     return serialize(res)
 
 @router.delete("/{slug}")
 async def delete_article(
     slug: str,
+    background_tasks: BackgroundTasks,
     current_user: UserInDB = Depends(get_current_active_user)
 ):
     """Delete an article (author can delete own articles, admin can delete any)"""
@@ -185,43 +262,55 @@ async def delete_article(
     if not current_user.is_superuser and article.get("authorId") != current_user.id:
         raise HTTPException(status_code=403, detail="Not authorized to delete this article")
     
-    res = await COLLECTION().delete_one({"slug": slug})
-    if res.deleted_count == 0:
+    deleted = await COLLECTION().find_one_and_delete({"slug": slug})
+    if not deleted:
         raise HTTPException(status_code=404, detail="Article not found")
+    await record_change(get_db(), deleted, None)
+    background_tasks.add_task(events.article_changed, get_db(), [slug], events.DELETED)
     return {"deleted": True}
 
 @router.patch("/{slug}/approve")
 async def approve_article(
     slug: str,
+    background_tasks: BackgroundTasks,
     current_user: UserInDB = Depends(get_current_superuser)
 ):
     """Approve an article (admin only)"""
-    res = await COLLECTION().find_one_and_update(
+    update = {"status": "approved", "updatedAt": datetime.utcnow()}
+    before = await COLLECTION().find_one_and_update(
         {"slug": slug},
-        {"$set": {"status": "approved", "updatedAt": datetime.utcnow()}},
-        return_document=True,
+        {"$set": update},
+        return_document=ReturnDocument.BEFORE,
     )
-    if not res:
+    if not before:
         raise HTTPException(status_code=404, detail="Article not found")
+    res = {**before, **update}
+    await record_change(get_db(), before, res)
+    background_tasks.add_task(events.article_changed, get_db(), [slug], events.APPROVED)
     return serialize(res)
 
 @router.patch("/{slug}/reject")
 async def reject_article(
     slug: str,
+    background_tasks: BackgroundTasks,
     current_user: UserInDB = Depends(get_current_superuser)
 ):
     """Reject an article (admin only)"""
-    res = await COLLECTION().find_one_and_update(
+    update = {"status": "rejected", "updatedAt": datetime.utcnow()}
+    before = await COLLECTION().find_one_and_update(
         {"slug": slug},
-        {"$set": {"status": "rejected", "updatedAt": datetime.utcnow()}},
-        return_document=True,
+        {"$set": update},
+        return_document=ReturnDocument.BEFORE,
     )
-    if not res:
+    if not before:
         raise HTTPException(status_code=404, detail="Article not found")
+    res = {**before, **update}
+    await record_change(get_db(), before, res)
+    background_tasks.add_task(events.article_changed, get_db(), [slug], events.REJECTED)
     return serialize(res)
 
 
-@router.post("/{slug}/view")
+@router.post("/{slug}/view", dependencies=[Depends(rate_limit("engagement"))])
 async def track_view(slug: str):
     """Track article view (increment view count)"""
     article = await COLLECTION().find_one({"slug": slug})
@@ -235,10 +324,11 @@ async def track_view(slug: str):
     )
     if not res:
         raise HTTPException(status_code=404, detail="Article not found")
+    record_view(slug)
     return {"viewCount": res.get("viewCount", 0)}
 
 
-@router.post("/{slug}/like")
+@router.post("/{slug}/like", dependencies=[Depends(rate_limit("engagement"))])
 async def toggle_like(slug: str, request_ip: str = None):
     """Toggle like on article (guest-friendly, tracked by IP/session)"""
     article = await COLLECTION().find_one({"slug": slug})
@@ -264,13 +354,14 @@ async def toggle_like(slug: str, request_ip: str = None):
             {"$push": {"likes": liker_id}, "$inc": {"likesCount": 1}},
             return_document=True,
         )
+        record_like(slug)
         return {"liked": True, "likesCount": article.get("likesCount", 0) + 1}
 
 
 @router.get("/{slug}/stats")
 async def get_article_stats(slug: str):
     """Get article stats (views, likes)"""
-    article = await COLLECTION().find_one({"slug": slug})
+    article = await COLLECTION().find_one({"slug": slug}, STATS_PROJECTION)
     if not article:
         raise HTTPException(status_code=404, detail="Article not found")
     
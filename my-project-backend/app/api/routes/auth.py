@@ -1,17 +1,27 @@
-from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi import APIRouter, HTTPException, status, Depends, Request
 from datetime import timedelta, datetime
 from app.schemas.user import UserCreate, UserLogin, UserOut
 from app.schemas.token import Token
 from app.core.security import get_password_hash, verify_password, create_access_token
 from app.core.config import settings
 from app.db.mongo import get_db
-from app.api.dependencies import get_current_active_user
+from app.api.dependencies import get_current_active_user, get_client_identifier, limiter, rate_limit, enforce_rate_limit
+from app.services.site_settings import site_settings
+import logging
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
 
-@router.post("/register", response_model=UserOut, status_code=status.HTTP_201_CREATED)
+@router.post(
+    "/register",
+    response_model=UserOut,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(rate_limit("register_ip"))],
+)
 async def register(user: UserCreate, db=Depends(get_db)):
     """Register a new user"""
+    if not site_settings.get("allow_registration", True):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Registration is disabled")
     try:
         # Check if user already exists
         existing_user = await db[settings.users_collection].find_one({"email": user.email})
@@ -45,19 +55,26 @@ async def register(user: UserCreate, db=Depends(get_db)):
     except HTTPException:
         raise
     except Exception as e:
-        print(f"Registration error: {e}")
+        # No email in the log line; the request id ties it to the request
+        logger.exception("Registration failed")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Registration failed: {str(e)}"
         )
 
-@router.post("/login", response_model=Token)
-async def login(user_credentials: UserLogin, db=Depends(get_db)):
+@router.post("/login", response_model=Token, dependencies=[Depends(rate_limit("login_ip"))])
+async def login(user_credentials: UserLogin, request: Request, db=Depends(get_db)):
     """Login and get access token"""
+    # Failed attempts are throttled per account *and* client, so guessing from
+    # one address is slowed down without letting others lock the owner out
+    failure_key = f"{user_credentials.email.lower()}|{get_client_identifier(request)}"
+    await enforce_rate_limit("login_email", failure_key, peek=True)
+
     # Find user by email
     user = await db[settings.users_collection].find_one({"email": user_credentials.email})
     
     if not user:
+        await limiter.hit("login_email", failure_key)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -66,6 +83,7 @@ async def login(user_credentials: UserLogin, db=Depends(get_db)):
     
     # Verify password
     if not verify_password(user_credentials.password, user["hashed_password"]):
+        await limiter.hit("login_email", failure_key)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -0,0 +1,36 @@
+from fastapi import APIRouter, HTTPException, Depends
+from app.db.mongo import get_read_db
+from app.core.config import settings
+from app.core.responses import FastJSONResponse
+from app.services.author_stats import get_author_stats
+from bson import ObjectId
+
+router = APIRouter()
+
+
+@router.get("/{author_id}")
+async def get_author(author_id: str, db=Depends(get_read_db)):
+    """Public author card: published article count, views and likes"""
+    # Stats are also keyed by legacy author emails; those are not public lookups
+    if "@" in author_id:
+        raise HTTPException(status_code=404, detail="Author not found")
+    try:
+        # Merge the legacy email-keyed stats the same way /profile/me/stats does
+        email = None
+        if ObjectId.is_valid(author_id):
+            user = await db[settings.users_collection].find_one({"_id": ObjectId(author_id)}, {"email": 1})
+            email = user.get("email") if user else None
+        stats = await get_author_stats(db, author_id, email)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    if not stats or not stats["articles"].get("approved"):
+        raise HTTPException(status_code=404, detail="Author not found")
+    return FastJSONResponse({
+        "authorId": stats.get("authorId") or author_id,
+        "author": stats.get("author"),
+        "articles": stats["articles"]["approved"],
+        "featured": stats["articles"].get("featured", 0),
+        "views": stats.get("views", 0),
+        "likes": stats.get("likes", 0),
+        "lastPublishedAt": stats.get("lastPublishedAt"),
+    })
@@ -6,6 +6,7 @@ from app.db.mongo import get_db
 from app.core.config import settings
 from app.api.dependencies import get_current_active_user
 from app.schemas.user import UserInDB
+from app.services.site_settings import site_settings
 from bson import ObjectId
 
 router = APIRouter()
@@ -17,6 +18,8 @@ async def create_comment(
     current_user: UserInDB = Depends(get_current_active_user)
 ):
     """Create a new comment on an article (guest-friendly or authenticated)."""
+    if not site_settings.get("enable_comments", True):
+        raise HTTPException(status_code=403, detail="Comments are disabled")
     try:
         # Check if article exists
         try:
@@ -3,21 +3,15 @@ from app.db.mongo import get_db
 from app.core.config import settings
 from datetime import datetime
 from pymongo import ReturnDocument
+from app.api.dependencies import get_client_identifier, rate_limit
+from app.services.trending import record_view as record_trending_view, record_like as record_trending_like
 
 router = APIRouter()
 
 ARTICLES = lambda db: db[settings.articles_collection]
 
 
-def get_client_identifier(request: Request) -> str:
-    """Get client IP for tracking likes/views without auth"""
-    forwarded = request.headers.get("X-Forwarded-For")
-    if forwarded:
-        return forwarded.split(",")[0].strip()
-    return request.client.host or "unknown"
-
-
-@router.post("/{slug}/like")
+@router.post("/{slug}/like", dependencies=[Depends(rate_limit("engagement"))])
 async def toggle_like(slug: str, request: Request, db=Depends(get_db)):
     """Toggle like on an article (guest-friendly, tracked by IP)"""
     try:
@@ -50,6 +44,8 @@ async def toggle_like(slug: str, request: Request, db=Depends(get_db)):
             },
             return_document=ReturnDocument.AFTER,
         )
+        if liked:
+            record_trending_like(slug)
         
         return {
             "liked": liked,
@@ -61,7 +57,7 @@ async def toggle_like(slug: str, request: Request, db=Depends(get_db)):
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.post("/{slug}/view")
+@router.post("/{slug}/view", dependencies=[Depends(rate_limit("engagement"))])
 async def record_view(slug: str, request: Request, db=Depends(get_db)):
     """Record a view on an article (guest-friendly). Increments on each hit for simplicity."""
     try:
@@ -81,6 +77,7 @@ async def record_view(slug: str, request: Request, db=Depends(get_db)):
             },
             return_document=ReturnDocument.AFTER,
         )
+        record_trending_view(slug)
         
         return {
             "viewCount": result.get("viewCount", view_count),
@@ -96,7 +93,7 @@ async def get_article_stats(slug: str, db=Depends(get_db)):
     """Get engagement stats for an article (likes, views)"""
     try:
         articles = ARTICLES(db)
-        article = await articles.find_one({"slug": slug})
+        article = await articles.find_one({"slug": slug}, {"likesCount": 1, "viewCount": 1})
         
         if not article:
             raise HTTPException(status_code=404, detail="Article not found")
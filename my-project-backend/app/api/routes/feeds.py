@@ -0,0 +1,52 @@
+from fastapi import APIRouter, HTTPException, Depends, Request, Response
+from app.db.mongo import get_db
+from app.core.compression import parse_accept_encoding
+from app.core.responses import not_modified
+from app.services.feeds import ATOM, RSS, SITEMAP, feed_store, shard_name
+import gzip
+
+router = APIRouter()
+
+
+async def serve_feed(request: Request, db, name: str) -> Response:
+    """Stored file in the best encoding the client accepts, or 304 for a current ETag"""
+    try:
+        feed = await feed_store.get(db, name)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    if feed is None:
+        raise HTTPException(status_code=404, detail="Not found")
+    headers = {"ETag": feed["etag"], "Vary": "Accept-Encoding"}
+    if not_modified(request, feed["etag"]):
+        return Response(status_code=304, headers=headers)
+    accepted = parse_accept_encoding(request.headers.get("accept-encoding", ""))
+    media_type = f"{feed['contentType']}; charset=utf-8"
+    if "br" in feed and accepted.get("br", 0) > 0:
+        return Response(feed["br"], media_type=media_type, headers={**headers, "Content-Encoding": "br"})
+    if accepted.get("gzip", 0) > 0:
+        return Response(feed["gzip"], media_type=media_type, headers={**headers, "Content-Encoding": "gzip"})
+    return Response(gzip.decompress(feed["gzip"]), media_type=media_type, headers=headers)
+
+
+@router.get("/sitemap.xml")
+async def get_sitemap(request: Request, db=Depends(get_db)):
+    """Sitemap of approved articles (a sitemap index once it needs shards)"""
+    return await serve_feed(request, db, SITEMAP)
+
+
+@router.get("/sitemap-{shard}.xml")
+async def get_sitemap_shard(shard: int, request: Request, db=Depends(get_db)):
+    """One shard of a sharded sitemap"""
+    return await serve_feed(request, db, shard_name(shard))
+
+
+@router.get("/rss.xml")
+async def get_rss_feed(request: Request, db=Depends(get_db)):
+    """RSS 2.0 feed of the latest approved articles"""
+    return await serve_feed(request, db, RSS)
+
+
+@router.get("/atom.xml")
+async def get_atom_feed(request: Request, db=Depends(get_db)):
+    """Atom feed of the latest approved articles"""
+    return await serve_feed(request, db, ATOM)
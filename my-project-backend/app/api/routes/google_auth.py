@@ -4,13 +4,18 @@ from app.db.mongo import get_db
 from app.schemas.user import UserOut
 from app.schemas.token import Token
 from app.core.security import create_access_token
+from app.api.dependencies import rate_limit
+from app.services.site_settings import site_settings
 from datetime import datetime, timedelta
-from google.oauth2 import id_token
-from google.auth.transport import requests as google_requests
+from app.core.lazy import lazy_module
+
+# Imported on first Google login, not at worker start
+id_token = lazy_module("google.oauth2.id_token")
+google_requests = lazy_module("google.auth.transport.requests")
 
 router = APIRouter()
 
-@router.post("/google", response_model=Token)
+@router.post("/google", response_model=Token, dependencies=[Depends(rate_limit("login_ip"))])
 async def google_login(request: Request, db=Depends(get_db)):
     """Login or register user with Google ID token"""
     data = await request.json()
@@ -26,6 +31,8 @@ async def google_login(request: Request, db=Depends(get_db)):
 
     user = await db[settings.users_collection].find_one({"email": email})
     if not user:
+        if not site_settings.get("allow_registration", True):
+            raise HTTPException(status_code=403, detail="Registration is disabled")
         # Register new user
         user_dict = {
             "email": email,
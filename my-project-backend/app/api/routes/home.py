@@ -0,0 +1,23 @@
+from fastapi import APIRouter, HTTPException, Depends, Request
+from app.db.mongo import get_read_db
+from app.core.responses import etag_json_response
+from app.services.homepage import home_cache
+
+router = APIRouter()
+
+
+@router.get("/home")
+async def get_home_bundle(request: Request, db=Depends(get_read_db)):
+    """Landing page bundle: metrics, featured, latest and per-category articles.
+
+    Served from a precomputed, versioned payload that is rebuilt only when an
+    article is approved, featured, updated or deleted.
+    """
+    try:
+        body = await home_cache.get(db)
+        # The cache hashed the body when it was stored
+        return etag_json_response(
+            request, body, headers={"X-Bundle-Version": str(home_cache.version)}, etag=home_cache.etag
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,21 @@
+from fastapi import APIRouter, Depends
+from fastapi.responses import PlainTextResponse
+from app.core.config import settings
+from app.core.instrumentation import route_metrics, render_prometheus
+from app.core.log import NonBlockingQueueHandler
+from app.api.dependencies import require_metrics_access
+
+router = APIRouter()
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@router.get(settings.internal_metrics_path, dependencies=[Depends(require_metrics_access)], include_in_schema=False)
+async def get_internal_metrics():
+    """Per-route latency/size histograms and in-flight gauges for Prometheus"""
+    merged = route_metrics.collect(settings.metrics_dir, stale_seconds=settings.metrics_export_seconds * 3)
+    body = render_prometheus(merged, {
+        "log_records_dropped_total": ("Log records dropped because the log queue was full (this worker)",
+                                      NonBlockingQueueHandler.dropped),
+    })
+    return PlainTextResponse(body, media_type=PROMETHEUS_CONTENT_TYPE)
@@ -5,6 +5,8 @@ from app.schemas.user import UserInDB
 from app.core.security import get_password_hash, verify_password
 from app.db.mongo import get_db
 from app.core.config import settings
+from app.core.responses import FastJSONResponse
+from app.services.author_stats import get_author_stats
 from bson import ObjectId
 
 router = APIRouter()
@@ -22,6 +24,23 @@ async def get_my_profile(
         "is_superuser": current_user.is_superuser
     }
 
+@router.get("/me/stats")
+async def get_my_stats(
+    current_user: UserInDB = Depends(get_current_active_user),
+    db = Depends(get_db)
+):
+    """Dashboard totals for the current user's articles (all statuses)"""
+    try:
+        # Legacy articles without authorId are counted under the author's email
+        stats = await get_author_stats(db, current_user.id, current_user.email)
+        if stats is None:
+            stats = {"articles": {"total": 0, "approved": 0, "pending": 0, "rejected": 0, "featured": 0},
+                     "views": 0, "likes": 0, "lastPublishedAt": None}
+        stats.pop("updatedAt", None)
+        return FastJSONResponse(stats)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.put("/me", response_model=UserProfileOut)
 async def update_my_profile(
     profile_update: UserProfileUpdate,
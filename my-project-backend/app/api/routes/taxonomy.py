@@ -0,0 +1,18 @@
+from fastapi import APIRouter, HTTPException, Depends, Query
+from app.db.mongo import get_read_db
+from app.core.responses import FastJSONResponse
+from app.services.taxonomy import get_facets
+
+router = APIRouter()
+
+
+@router.get("/taxonomy")
+async def get_taxonomy(
+    limit: int = Query(default=50, ge=1, le=500),
+    db=Depends(get_read_db),
+):
+    """Tag cloud and category facets with approved-article counts"""
+    try:
+        return FastJSONResponse(await get_facets(db, approved_only=True, limit=limit))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
@@ -1,8 +1,11 @@
 from fastapi import APIRouter, UploadFile, File, HTTPException, status
 from fastapi.responses import JSONResponse
 from app.core.config import settings
-import cloudinary
-import cloudinary.uploader
+from app.core.lazy import lazy_module
+
+# Imported on first upload, not at worker start
+cloudinary = lazy_module("cloudinary")
+cloudinary_uploader = lazy_module("cloudinary.uploader")
 
 router = APIRouter()
 
@@ -28,7 +31,7 @@ async def upload_image(file: UploadFile = File(...)):
     # Upload to Cloudinary
     try:
         contents = await file.read()
-        upload_result = cloudinary.uploader.upload(
+        upload_result = cloudinary_uploader.upload(
             contents,
             folder="ias-uploads",
             resource_type="image",
@@ -0,0 +1,164 @@
+from collections import OrderedDict
+from typing import Iterable, Optional
+import gzip
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+
+def parse_accept_encoding(header: str) -> dict:
+    """Parse an Accept-Encoding header into {coding: q}"""
+    codings = {}
+    for part in header.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        coding, _, params = part.partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        codings[coding.strip().lower()] = q
+    return codings
+
+
+class CompressedCache:
+    """Bounded LRU of compressed bodies keyed by (ETag, encoding)"""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[tuple, bytes]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: tuple) -> Optional[bytes]:
+        value = self._entries.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key: tuple, value: bytes):
+        if self.max_entries <= 0:
+            return
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+class CompressionMiddleware:
+    """ASGI middleware negotiating br/gzip for complete, allowlisted responses.
+
+    Bodies below minimum_size, streamed bodies and already-encoded responses pass
+    through untouched. Responses carrying an ETag reuse cached compressed bytes.
+    """
+
+    def __init__(
+        self,
+        app,
+        minimum_size: int = 1024,
+        gzip_level: int = 5,
+        brotli_quality: int = 4,
+        content_types: Iterable[str] = ("application/json",),
+        cache_size: int = 256,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.content_types = {t.strip().lower() for t in content_types if t.strip()}
+        self.cache = CompressedCache(cache_size)
+
+    def negotiate(self, header: str) -> Optional[str]:
+        codings = parse_accept_encoding(header)
+        wildcard = codings.get("*", 0.0)
+        for coding in (("br", "gzip") if brotli is not None else ("gzip",)):
+            if codings.get(coding, wildcard) > 0:
+                return coding
+        return None
+
+    def compress(self, body: bytes, encoding: str) -> bytes:
+        if encoding == "br":
+            return brotli.compress(body, quality=self.brotli_quality)
+        return gzip.compress(body, compresslevel=self.gzip_level, mtime=0)
+
+    def compress_cached(self, body: bytes, encoding: str, etag: Optional[str]) -> bytes:
+        if not etag:
+            return self.compress(body, encoding)
+        key = (etag, encoding)
+        compressed = self.cache.get(key)
+        if compressed is None:
+            compressed = self.compress(body, encoding)
+            self.cache.put(key, compressed)
+        return compressed
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        accept = ""
+        for name, value in scope.get("headers", []):
+            if name == b"accept-encoding":
+                accept = value.decode("latin-1")
+                break
+        encoding = self.negotiate(accept) if accept else None
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        passthrough = False
+
+        async def send_wrapper(message):
+            nonlocal start_message, passthrough
+            if passthrough:
+                await send(message)
+                return
+
+            if message["type"] == "http.response.start":
+                headers = {k.lower(): v for k, v in message.get("headers", [])}
+                content_type = headers.get(b"content-type", b"").decode("latin-1").split(";")[0].strip().lower()
+                if b"content-encoding" in headers or content_type not in self.content_types:
+                    passthrough = True
+                    await send(message)
+                    return
+                start_message = message
+                return
+
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            if message.get("more_body", False) or len(body) < self.minimum_size:
+                # Streamed or small: send unchanged
+                passthrough = True
+                await send(start_message)
+                await send(message)
+                return
+
+            raw_headers = [(k, v) for k, v in start_message.get("headers", []) if k.lower() != b"content-length"]
+            etag = next((v.decode("latin-1") for k, v in raw_headers if k.lower() == b"etag"), None)
+            compressed = self.compress_cached(body, encoding, etag)
+
+            vary = [v for k, v in raw_headers if k.lower() == b"vary"]
+            raw_headers = [(k, v) for k, v in raw_headers if k.lower() != b"vary"]
+            vary_value = b", ".join(vary + [b"Accept-Encoding"]) if vary else b"Accept-Encoding"
+            raw_headers += [
+                (b"content-encoding", encoding.encode("latin-1")),
+                (b"content-length", str(len(compressed)).encode("latin-1")),
+                (b"vary", vary_value),
+            ]
+            await send({**start_message, "headers": raw_headers})
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, send_wrapper)
@@ -8,9 +8,27 @@ class Settings(BaseModel):
     # Database
     mongo_uri: str = os.getenv("MONGODB_URI", os.getenv("MONGO_URI", "mongodb://localhost:27017"))
     db_name: str = os.getenv("DB_NAME", "ias_blog")
+    mongo_min_pool_size: int = int(os.getenv("MONGO_MIN_POOL_SIZE", "0"))
+    mongo_max_pool_size: int = int(os.getenv("MONGO_MAX_POOL_SIZE", "100"))
+    mongo_max_idle_time_ms: int | None = int(os.getenv("MONGO_MAX_IDLE_TIME_MS")) if os.getenv("MONGO_MAX_IDLE_TIME_MS") else None
+    mongo_compressors: str = os.getenv("MONGO_COMPRESSORS", "")  # e.g. "zstd,snappy,zlib"
+    mongo_zlib_level: int = int(os.getenv("MONGO_ZLIB_LEVEL", "-1"))
+    mongo_server_selection_timeout_ms: int = int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", "30000"))
+    mongo_connect_timeout_ms: int = int(os.getenv("MONGO_CONNECT_TIMEOUT_MS", "20000"))
+    mongo_socket_timeout_ms: int | None = int(os.getenv("MONGO_SOCKET_TIMEOUT_MS")) if os.getenv("MONGO_SOCKET_TIMEOUT_MS") else None
+    # Read preference for public list/metrics routes; writes and read-after-write stay on the primary
+    mongo_public_read_preference: str = os.getenv("MONGO_PUBLIC_READ_PREFERENCE", "secondaryPreferred")
+    mongo_warmup_connections: int = int(os.getenv("MONGO_WARMUP_CONNECTIONS", "0"))
+    index_mode: str = os.getenv("INDEX_MODE", "apply")  # apply | off
     articles_collection: str = "articles"
     users_collection: str = "users"
     comments_collection: str = "comments"
+    related_collection: str = "related_articles"
+    taxonomy_collection: str = "taxonomy_stats"
+    rate_limit_collection: str = "rate_limits"
+    profile_collection: str = "request_profiles"
+    slow_query_collection: str = "slow_queries"
+    feeds_collection: str = "feeds"
 
     # Security (JWT)
     secret_key: str = os.getenv("JWT_SECRET", "your-secret-key-change-in-production")
@@ -21,6 +39,107 @@ class Settings(BaseModel):
     # Frontend / CORS
     frontend_url: str = os.getenv("FRONTEND_URL", "http://localhost:5173")
 
+    # Production server (serve.py)
+    server_host: str = os.getenv("HOST", "0.0.0.0")
+    server_port: int = int(os.getenv("PORT", "8000"))
+    web_concurrency: int = int(os.getenv("WEB_CONCURRENCY", "0"))  # 0 = one worker per CPU
+    server_keep_alive: int = int(os.getenv("SERVER_KEEP_ALIVE", "5"))
+    server_backlog: int = int(os.getenv("SERVER_BACKLOG", "2048"))
+    server_graceful_timeout: int = int(os.getenv("SERVER_GRACEFUL_TIMEOUT", "30"))
+    server_limit_concurrency: int | None = int(os.getenv("SERVER_LIMIT_CONCURRENCY")) if os.getenv("SERVER_LIMIT_CONCURRENCY") else None
+    server_forwarded_allow_ips: str = os.getenv("FORWARDED_ALLOW_IPS", "127.0.0.1")
+    server_access_log: bool = os.getenv("SERVER_ACCESS_LOG", "false").lower() == "true"
+
+    # Logging (LOG_LEVELS / LOG_SAMPLING are "logger=value" lists)
+    log_level: str = os.getenv("LOG_LEVEL", "INFO")
+    log_levels: str = os.getenv("LOG_LEVELS", "")
+    log_format: str = os.getenv("LOG_FORMAT", "json")  # json | text
+    log_sampling: str = os.getenv("LOG_SAMPLING", "")
+    log_queue_size: int = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+
+    # Operational metrics (Prometheus text at a protected path, separate from the public /metrics)
+    internal_metrics_path: str = os.getenv("INTERNAL_METRICS_PATH", "/internal/metrics")
+    metrics_token: str | None = os.getenv("METRICS_TOKEN")
+    metrics_dir: str | None = os.getenv("METRICS_DIR")  # shared by workers to merge their counters
+    metrics_export_seconds: float = float(os.getenv("METRICS_EXPORT_SECONDS", "5"))
+
+    # Request profiling (admins send X-Profile: sample|cprofile; PROFILE_SAMPLE_RATE profiles a random fraction)
+    profiling_enabled: bool = os.getenv("PROFILING_ENABLED", "true").lower() == "true"
+    profile_sample_rate: float = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+    profile_interval_ms: float = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+    profile_ttl_hours: int = int(os.getenv("PROFILE_TTL_HOURS", "24"))
+
+    # Memory diagnostics (/admin/memory); MEMORY_LOG_SECONDS=0 disables periodic top-allocator logs
+    tracemalloc_at_start: bool = os.getenv("TRACEMALLOC_AT_START", "false").lower() == "true"
+    tracemalloc_frames: int = int(os.getenv("TRACEMALLOC_FRAMES", "1"))
+    memory_log_seconds: float = float(os.getenv("MEMORY_LOG_SECONDS", "0"))
+    memory_log_top: int = int(os.getenv("MEMORY_LOG_TOP", "10"))
+
+    # Slow Mongo commands grouped by query shape (/admin/slow-queries); SLOW_QUERY_MS=0 disables
+    slow_query_ms: float = float(os.getenv("SLOW_QUERY_MS", "100"))
+    slow_query_explain: bool = os.getenv("SLOW_QUERY_EXPLAIN", "true").lower() == "true"
+    slow_query_ttl_days: int = int(os.getenv("SLOW_QUERY_TTL_DAYS", "14"))
+
+    # Response compression
+    compression_enabled: bool = os.getenv("COMPRESSION_ENABLED", "true").lower() == "true"
+    compression_min_size: int = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+    compression_gzip_level: int = int(os.getenv("COMPRESSION_GZIP_LEVEL", "5"))
+    compression_brotli_quality: int = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4"))
+    compression_content_types: str = os.getenv(
+        "COMPRESSION_CONTENT_TYPES",
+        "application/json,text/html,text/plain,text/css,text/xml,application/xml,application/rss+xml,application/atom+xml",
+    )
+    compression_cache_size: int = int(os.getenv("COMPRESSION_CACHE_SIZE", "256"))
+
+    # Related articles
+    related_top_k: int = int(os.getenv("RELATED_TOP_K", "6"))
+    related_dimensions: int = int(os.getenv("RELATED_DIMENSIONS", "2048"))
+    related_vector_terms: int = int(os.getenv("RELATED_VECTOR_TERMS", "64"))
+    # Incremental updates score only articles sharing one of the new article's top terms
+    related_candidate_terms: int = int(os.getenv("RELATED_CANDIDATE_TERMS", "16"))
+    related_max_candidates: int = int(os.getenv("RELATED_MAX_CANDIDATES", "5000"))
+
+    # Trending articles
+    trending_half_life_hours: float = float(os.getenv("TRENDING_HALF_LIFE_HOURS", "24"))
+    trending_capacity: int = int(os.getenv("TRENDING_CAPACITY", "500"))
+    trending_flush_seconds: float = float(os.getenv("TRENDING_FLUSH_SECONDS", "30"))
+    trending_view_weight: float = float(os.getenv("TRENDING_VIEW_WEIGHT", "1"))
+    trending_like_weight: float = float(os.getenv("TRENDING_LIKE_WEIGHT", "5"))
+
+    # Author stats (auto = change stream, falling back to polling on a standalone server)
+    author_stats_collection: str = os.getenv("AUTHOR_STATS_COLLECTION", "author_stats")
+    author_stats_sync: str = os.getenv("AUTHOR_STATS_SYNC", "auto")  # auto | stream | poll | off
+    author_stats_batch_seconds: float = float(os.getenv("AUTHOR_STATS_BATCH_SECONDS", "2"))
+    author_stats_poll_seconds: float = float(os.getenv("AUTHOR_STATS_POLL_SECONDS", "60"))
+    author_stats_lease_seconds: float = float(os.getenv("AUTHOR_STATS_LEASE_SECONDS", "30"))
+
+    # Admin site settings snapshot; workers poll its version this often
+    site_settings_refresh_seconds: float = float(os.getenv("SITE_SETTINGS_REFRESH_SECONDS", "5"))
+
+    # Homepage bundle
+    home_refresh_seconds: float = float(os.getenv("HOME_REFRESH_SECONDS", "5"))
+    home_section_size: int = int(os.getenv("HOME_SECTION_SIZE", "6"))
+    home_max_categories: int = int(os.getenv("HOME_MAX_CATEGORIES", "8"))
+
+    # Sitemap and RSS/Atom feeds (regenerated on approve/reject/update/delete)
+    site_url: str = os.getenv("SITE_URL", os.getenv("FRONTEND_URL", "http://localhost:5173").split(",")[0].strip())
+    site_name: str = os.getenv("SITE_NAME", "IAS UWU Blog")
+    feeds_base_url: str | None = os.getenv("FEEDS_BASE_URL")  # public URL serving /sitemap-N.xml (default SITE_URL)
+    feed_article_path: str = os.getenv("FEED_ARTICLE_PATH", "/articles/{slug}")
+    feed_size: int = int(os.getenv("FEED_SIZE", "50"))
+    sitemap_shard_size: int = int(os.getenv("SITEMAP_SHARD_SIZE", "50000"))
+    feeds_refresh_seconds: float = float(os.getenv("FEEDS_REFRESH_SECONDS", "5"))
+
+    # Rate limiting ("capacity/seconds" per client or email)
+    rate_limit_enabled: bool = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+    rate_limit_backend: str = os.getenv("RATE_LIMIT_BACKEND", "memory")  # memory | mongo
+    rate_limit_shards: int = int(os.getenv("RATE_LIMIT_SHARDS", "16"))
+    rate_limit_max_keys_per_shard: int = int(os.getenv("RATE_LIMIT_MAX_KEYS_PER_SHARD", "10000"))
+    rate_limit_engagement: str = os.getenv("RATE_LIMIT_ENGAGEMENT", "60/60")
+    rate_limit_login_ip: str = os.getenv("RATE_LIMIT_LOGIN_IP", "20/60")
+    rate_limit_login_email: str = os.getenv("RATE_LIMIT_LOGIN_EMAIL", "5/300")
+    rate_limit_register_ip: str = os.getenv("RATE_LIMIT_REGISTER_IP", "5/300")
+
     # Third-party services
     google_client_id: str | None = os.getenv("GOOGLE_CLIENT_ID")
     stripe_secret_key: str | None = os.getenv("STRIPE_SECRET_KEY")
@@ -0,0 +1,224 @@
+"""
+Operational HTTP metrics in Prometheus text format.
+
+MetricsMiddleware records, per (route template, method, status), a latency
+histogram and a response-size histogram with fixed buckets, plus in-flight
+request gauges. Observing is a bisect and a few integer increments, with no
+locks (one event loop per worker).
+
+Every worker keeps its own counters. When METRICS_DIR is set each worker also
+writes a snapshot there every few seconds and the scrape endpoint merges all
+of them, so a scrape that lands on any worker sees the whole server.
+"""
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Optional, Tuple
+import asyncio
+import logging
+import os
+import time
+import orjson
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576)
+UNMATCHED = "unmatched"
+
+Key = Tuple[str, str, str]  # (route, method, status)
+
+
+class Histogram:
+    """Fixed-bucket histogram; counts[i] is the (non-cumulative) count for bucket i, last is +Inf"""
+
+    __slots__ = ("bounds", "counts", "sum")
+
+    def __init__(self, bounds: Tuple[float, ...], counts: Optional[List[int]] = None, total: float = 0.0):
+        self.bounds = bounds
+        self.counts = counts or [0] * (len(bounds) + 1)
+        self.sum = total
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+    @property
+    def count(self) -> int:
+        return sum(self.counts)
+
+    def merge(self, counts: List[int], total: float):
+        for i, c in enumerate(counts):
+            self.counts[i] += c
+        self.sum += total
+
+
+class RouteMetrics:
+    def __init__(self):
+        self.latency: Dict[Key, Histogram] = {}
+        self.sizes: Dict[Key, Histogram] = {}
+        self.in_flight: Dict[str, int] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def observe(self, route: str, method: str, status: int, seconds: float, size: int):
+        key = (route, method, str(status))
+        latency = self.latency.get(key)
+        if latency is None:
+            latency = self.latency[key] = Histogram(LATENCY_BUCKETS)
+            self.sizes[key] = Histogram(SIZE_BUCKETS)
+        latency.observe(seconds)
+        self.sizes[key].observe(size)
+
+    def snapshot(self) -> dict:
+        return {
+            "written_at": time.time(),
+            "latency": [[*k, h.counts, h.sum] for k, h in self.latency.items()],
+            "sizes": [[*k, h.counts, h.sum] for k, h in self.sizes.items()],
+            "in_flight": dict(self.in_flight),
+        }
+
+    # Multi-worker export
+
+    def snapshot_path(self, directory: str, pid: Optional[int] = None) -> str:
+        return os.path.join(directory, f"http-{pid or os.getpid()}.json")
+
+    def write_snapshot(self, directory: str):
+        path = self.snapshot_path(directory)
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(orjson.dumps(self.snapshot()))
+        os.replace(tmp, path)
+
+    def collect(self, directory: Optional[str], stale_seconds: float) -> dict:
+        """This worker's live numbers merged with the other workers' snapshots"""
+        snapshots = [self.snapshot()]
+        if directory and os.path.isdir(directory):
+            own = self.snapshot_path(directory)
+            for name in os.listdir(directory):
+                path = os.path.join(directory, name)
+                if path == own or not name.endswith(".json"):
+                    continue
+                try:
+                    with open(path, "rb") as f:
+                        snapshots.append(orjson.loads(f.read()))
+                except (OSError, ValueError):
+                    continue
+        return merge_snapshots(snapshots, stale_seconds)
+
+    async def export(self, directory: str, interval: float):
+        os.makedirs(directory, exist_ok=True)
+        while True:
+            try:
+                self.write_snapshot(directory)
+            except OSError:
+                logger.exception("Failed to write metrics snapshot")
+            await asyncio.sleep(interval)
+
+    def start(self, directory: Optional[str], interval: float):
+        if directory and self._task is None:
+            self._task = asyncio.create_task(self.export(directory, interval))
+
+    async def stop(self, directory: Optional[str]):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if directory:
+            # Final counters stay on disk so totals do not go backwards
+            self.write_snapshot(directory)
+
+
+def merge_snapshots(snapshots: Iterable[dict], stale_seconds: float) -> dict:
+    latency: Dict[Key, Histogram] = {}
+    sizes: Dict[Key, Histogram] = {}
+    in_flight: Dict[str, int] = {}
+    now = time.time()
+    for snap in snapshots:
+        for target, bounds, rows in ((latency, LATENCY_BUCKETS, snap["latency"]), (sizes, SIZE_BUCKETS, snap["sizes"])):
+            for route, method, status, counts, total in rows:
+                key = (route, method, status)
+                target.setdefault(key, Histogram(bounds)).merge(counts, total)
+        # Gauges of workers that stopped reporting are dropped; their counters are kept
+        if now - snap.get("written_at", now) <= stale_seconds:
+            for method, value in snap["in_flight"].items():
+                in_flight[method] = in_flight.get(method, 0) + value
+    return {"latency": latency, "sizes": sizes, "in_flight": in_flight}
+
+
+def _labels(route: str, method: str, status: Optional[str] = None, le: Optional[str] = None) -> str:
+    parts = [f'route="{route}"', f'method="{method}"']
+    if status is not None:
+        parts.append(f'status="{status}"')
+    if le is not None:
+        parts.append(f'le="{le}"')
+    return "{" + ",".join(parts) + "}"
+
+
+def _render_histogram(name: str, help_text: str, histograms: Dict[Key, Histogram]) -> List[str]:
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+    for (route, method, status), h in sorted(histograms.items()):
+        cumulative = 0
+        for bound, count in zip(h.bounds, h.counts):
+            cumulative += count
+            lines.append(f"{name}_bucket{_labels(route, method, status, f'{bound:g}')} {cumulative}")
+        cumulative += h.counts[-1]
+        lines.append(f"{name}_bucket{_labels(route, method, status, '+Inf')} {cumulative}")
+        lines.append(f"{name}_sum{_labels(route, method, status)} {h.sum:.6f}")
+        lines.append(f"{name}_count{_labels(route, method, status)} {cumulative}")
+    return lines
+
+
+def render_prometheus(merged: dict, extra_counters: Optional[Dict[str, Tuple[str, float]]] = None) -> str:
+    lines = _render_histogram(
+        "http_request_duration_seconds", "Request latency by route template, method and status", merged["latency"]
+    )
+    lines += _render_histogram(
+        "http_response_size_bytes", "Response body size (after compression) by route", merged["sizes"]
+    )
+    lines += ["# HELP http_requests_in_flight Requests currently being served", "# TYPE http_requests_in_flight gauge"]
+    for method, value in sorted(merged["in_flight"].items()):
+        lines.append(f'http_requests_in_flight{{method="{method}"}} {value}')
+    for name, (help_text, value) in (extra_counters or {}).items():
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter", f"{name} {value}"]
+    return "\n".join(lines) + "\n"
+
+
+class MetricsMiddleware:
+    """ASGI middleware timing each request until its last body chunk is sent"""
+
+    def __init__(self, app, metrics: RouteMetrics):
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        metrics = self.metrics
+        method = scope["method"]
+        metrics.in_flight[method] = metrics.in_flight.get(method, 0) + 1
+        start = time.perf_counter()
+        status = 500
+        size = 0
+
+        async def send_wrapper(message):
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            metrics.in_flight[method] -= 1
+            # The router stores the matched route on the shared scope
+            route = scope.get("route")
+            template = getattr(route, "path", None) or UNMATCHED
+            metrics.observe(template, method, status, time.perf_counter() - start, size)
+
+
+route_metrics = RouteMetrics()
@@ -0,0 +1,28 @@
+"""
+Deferred imports for heavy optional integrations.
+
+`lazy_module("cloudinary.uploader")` returns a placeholder module that
+imports the real one on first attribute access, so rarely used routes
+(uploads, Google login, ...) do not pay their import cost at worker start.
+"""
+import importlib
+import sys
+import types
+
+
+class LazyModule(types.ModuleType):
+    """Module placeholder that imports the real module on first attribute access"""
+
+    def __getattr__(self, attr: str):
+        module = importlib.import_module(self.__name__)
+        # Later lookups on this placeholder hit the real module's namespace directly
+        self.__dict__.update(module.__dict__)
+        return getattr(module, attr)
+
+
+def lazy_module(name: str) -> types.ModuleType:
+    """Return the module if already imported, otherwise a lazy placeholder"""
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    return LazyModule(name)
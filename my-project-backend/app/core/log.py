@@ -0,0 +1,227 @@
+"""
+Structured, non-blocking logging.
+
+configure_logging() routes every logger through a bounded queue: request
+handlers only enqueue the record, and a background QueueListener thread
+formats (JSON or text) and writes it. When the queue is full records are
+dropped and counted instead of blocking the event loop.
+
+LOG_LEVELS sets per-logger levels ("app.services=DEBUG,pymongo=WARNING") and
+LOG_SAMPLING keeps a fraction of DEBUG records per logger prefix
+("app.api.routes.articles=0.01"). Sampling is decided per request id, so a
+sampled request keeps all of its debug lines. RequestIdMiddleware assigns
+(or propagates) X-Request-ID, every record carries it as request_id, and it
+logs one app.access line per completed request.
+"""
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Dict, Optional
+import atexit
+import copy
+import logging
+import logging.handlers
+import queue
+import random
+import re
+import sys
+import time
+import uuid
+import zlib
+import orjson
+
+request_id_var: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+# The live ASGI scope; routing fills in scope["route"], so readers (e.g. the
+# slow-query recorder) can tell which route template issued a call
+request_scope_var: ContextVar[Optional[dict]] = ContextVar("request_scope", default=None)
+
+REQUEST_ID_HEADER = b"x-request-id"
+REQUEST_ID_RE = re.compile(r"^[A-Za-z0-9._:-]{1,64}$")
+
+# Attributes every LogRecord has; anything else was passed via extra=
+RESERVED_ATTRS = frozenset(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "request_id"}
+
+_listener: Optional[logging.handlers.QueueListener] = None
+# One line per completed request; LOG_LEVELS="app.access=WARNING" silences it
+access_logger = logging.getLogger("app.access")
+
+
+def parse_mapping(value: str) -> Dict[str, str]:
+    """Parse "a=1,b=2" into {"a": "1", "b": "2"}"""
+    mapping = {}
+    for part in (value or "").split(","):
+        name, sep, setting = part.partition("=")
+        if sep and name.strip():
+            mapping[name.strip()] = setting.strip()
+    return mapping
+
+
+class RequestIdFilter(logging.Filter):
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """Keep a fraction of DEBUG records for the configured logger prefixes"""
+
+    def __init__(self, rates: Dict[str, float]):
+        super().__init__()
+        # Longest prefix wins
+        self.rates = sorted(rates.items(), key=lambda item: len(item[0]), reverse=True)
+
+    def rate_for(self, name: str) -> float:
+        for prefix, rate in self.rates:
+            if name == prefix or name.startswith(prefix + "."):
+                return rate
+        return 1.0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.DEBUG:
+            return True
+        rate = self.rate_for(record.name)
+        if rate >= 1.0:
+            return True
+        request_id = getattr(record, "request_id", None)
+        if request_id:
+            return zlib.crc32(request_id.encode()) % 10000 < rate * 10000
+        return random.random() < rate
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        if getattr(record, "request_id", None):
+            entry["request_id"] = record.request_id
+        for key, value in record.__dict__.items():
+            if key not in RESERVED_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc"] = record.exc_text
+        return orjson.dumps(entry, default=str).decode()
+
+
+class TextFormatter(logging.Formatter):
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)s %(name)s [%(request_id)s] %(message)s")
+
+    def format(self, record: logging.LogRecord) -> str:
+        if not hasattr(record, "request_id"):
+            record.request_id = None
+        return super().format(record)
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """Enqueue records unformatted; drop (and count) them when the queue is full"""
+
+    dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Formatting happens on the listener thread; a shallow copy keeps
+        # later attribute changes by other handlers from leaking across
+        return copy.copy(record)
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            NonBlockingQueueHandler.dropped += 1
+
+
+def configure_logging(
+    level: str = "INFO",
+    levels: str = "",
+    fmt: str = "json",
+    sampling: str = "",
+    queue_size: int = 10000,
+):
+    """Install the queue handler on the root logger and start the writer thread"""
+    global _listener
+    if _listener is not None:
+        return
+
+    stream = logging.StreamHandler(sys.stdout)
+    stream.setFormatter(JsonFormatter() if fmt == "json" else TextFormatter())
+    records: queue.Queue = queue.Queue(maxsize=queue_size)
+    handler = NonBlockingQueueHandler(records)
+    handler.addFilter(RequestIdFilter())
+    rates = {name: float(rate) for name, rate in parse_mapping(sampling).items()}
+    if rates:
+        handler.addFilter(SamplingFilter(rates))
+
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(level.upper())
+    for name, logger_level in parse_mapping(levels).items():
+        logging.getLogger(name).setLevel(logger_level.upper())
+    # Let uvicorn's loggers flow through the same pipeline
+    for name in ("uvicorn", "uvicorn.error", "uvicorn.access"):
+        uvicorn_logger = logging.getLogger(name)
+        uvicorn_logger.handlers = []
+        uvicorn_logger.propagate = True
+
+    _listener = logging.handlers.QueueListener(records, stream, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+
+def shutdown_logging():
+    """Flush queued records and stop the writer thread (runs at interpreter exit)"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+class RequestIdMiddleware:
+    """ASGI middleware that binds X-Request-ID (incoming or generated) to the request's logs
+    and logs the request when it completes"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = None
+        for name, value in scope.get("headers", []):
+            if name == REQUEST_ID_HEADER:
+                candidate = value.decode("latin-1")
+                if REQUEST_ID_RE.match(candidate):
+                    request_id = candidate
+                break
+        request_id = request_id or uuid.uuid4().hex
+        token = request_id_var.set(request_id)
+        scope_token = request_scope_var.set(scope)
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_id(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                message.setdefault("headers", [])
+                message["headers"] = list(message["headers"]) + [(REQUEST_ID_HEADER, request_id.encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            access_logger.info("%s %s %s", scope["method"], scope["path"], status, extra={
+                "method": scope["method"],
+                "route": getattr(scope.get("route"), "path", None) or scope["path"],
+                "status": status,
+                "duration_ms": round((time.perf_counter() - started) * 1000, 2),
+            })
+            request_id_var.reset(token)
+            request_scope_var.reset(scope_token)
@@ -0,0 +1,185 @@
+"""
+Heap diagnostics for a running worker.
+
+tracemalloc can be started and stopped at runtime (TRACEMALLOC_AT_START
+starts it with the worker). Named snapshots are kept in a small LRU so two
+points in time can be diffed grouped by line, file or traceback. GC
+generation stats and live object counts by type need no tracing. With
+MEMORY_LOG_SECONDS set, the top allocation growth since the previous
+interval is logged periodically while tracing is on.
+
+Everything here is per worker process; responses include the pid.
+"""
+from collections import Counter, OrderedDict
+from datetime import datetime
+from typing import List, Optional
+import asyncio
+import gc
+import logging
+import os
+import resource
+import tracemalloc
+
+logger = logging.getLogger(__name__)
+
+MAX_SNAPSHOTS = 8
+NOISE_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+
+def current_rss_bytes() -> Optional[int]:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def stat_entry(stat, group_by: str) -> dict:
+    location = stat.traceback.format() if group_by == "traceback" else str(stat.traceback[0])
+    entry = {"location": location, "size_kib": round(stat.size / 1024, 1), "count": stat.count}
+    if hasattr(stat, "size_diff"):
+        entry["size_diff_kib"] = round(stat.size_diff / 1024, 1)
+        entry["count_diff"] = stat.count_diff
+    return entry
+
+
+class MemoryDiagnostics:
+    def __init__(self):
+        self.snapshots: "OrderedDict[str, tracemalloc.Snapshot]" = OrderedDict()
+        self._task: Optional[asyncio.Task] = None
+
+    def status(self) -> dict:
+        traced, peak = tracemalloc.get_traced_memory() if tracemalloc.is_tracing() else (0, 0)
+        return {
+            "pid": os.getpid(),
+            "rss_mib": round((current_rss_bytes() or 0) / 2**20, 1),
+            "max_rss_mib": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+            "tracing": tracemalloc.is_tracing(),
+            "traceback_frames": tracemalloc.get_traceback_limit(),
+            "traced_mib": round(traced / 2**20, 2),
+            "traced_peak_mib": round(peak / 2**20, 2),
+            "snapshots": list(self.snapshots),
+        }
+
+    def start_tracing(self, frames: int = 1):
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+        tracemalloc.start(frames)
+
+    def stop_tracing(self):
+        # Snapshots stay readable; new ones need tracing again
+        tracemalloc.stop()
+
+    def _take(self, name: str) -> tracemalloc.Snapshot:
+        snapshot = tracemalloc.take_snapshot().filter_traces(NOISE_FILTERS)
+        self.snapshots[name] = snapshot
+        self.snapshots.move_to_end(name)
+        while len(self.snapshots) > MAX_SNAPSHOTS:
+            self.snapshots.popitem(last=False)
+        return snapshot
+
+    def take_snapshot(self, name: Optional[str] = None, group_by: str = "lineno", limit: int = 20) -> dict:
+        if not tracemalloc.is_tracing():
+            raise RuntimeError("tracemalloc is not tracing; start it first")
+        name = name or datetime.utcnow().strftime("%Y%m%dT%H%M%S")
+        snapshot = self._take(name)
+        stats = snapshot.statistics(group_by)
+        return {
+            "name": name,
+            "total_kib": round(sum(s.size for s in stats) / 1024, 1),
+            "top": [stat_entry(s, group_by) for s in stats[:limit]],
+        }
+
+    def diff(self, base: str, compare: Optional[str] = None, group_by: str = "lineno", limit: int = 20) -> dict:
+        """Allocation growth from `base` to `compare` (a fresh snapshot when omitted)"""
+        if base not in self.snapshots:
+            raise KeyError(base)
+        if compare is None:
+            if not tracemalloc.is_tracing():
+                raise RuntimeError("tracemalloc is not tracing; pass two existing snapshots")
+            compare = datetime.utcnow().strftime("%Y%m%dT%H%M%S")
+            self._take(compare)
+        elif compare not in self.snapshots:
+            raise KeyError(compare)
+        stats = self.snapshots[compare].compare_to(self.snapshots[base], group_by)
+        return {
+            "base": base,
+            "compare": compare,
+            "size_diff_kib": round(sum(s.size_diff for s in stats) / 1024, 1),
+            "top": [stat_entry(s, group_by) for s in stats[:limit]],
+        }
+
+    def gc_stats(self) -> dict:
+        return {
+            "pid": os.getpid(),
+            "enabled": gc.isenabled(),
+            "thresholds": gc.get_threshold(),
+            "counts": gc.get_count(),
+            "generations": gc.get_stats(),
+            "frozen": gc.get_freeze_count(),
+            "uncollectable": len(gc.garbage),
+        }
+
+    def collect(self, generation: int = 2) -> dict:
+        before = current_rss_bytes()
+        collected = gc.collect(generation)
+        after = current_rss_bytes()
+        return {
+            "collected": collected,
+            "rss_freed_mib": round(((before or 0) - (after or 0)) / 2**20, 2),
+        }
+
+    def object_counts(self, limit: int = 30) -> List[dict]:
+        """Live GC-tracked objects by type (walks the whole heap; admin use only)"""
+        counts = Counter(type(obj).__qualname__ for obj in gc.get_objects())
+        return [{"type": name, "count": count} for name, count in counts.most_common(limit)]
+
+    async def log_top_allocators(self, interval: float, limit: int):
+        previous: Optional[tracemalloc.Snapshot] = None
+        while True:
+            await asyncio.sleep(interval)
+            if not tracemalloc.is_tracing():
+                previous = None
+                continue
+            try:
+                def measure(previous=previous):
+                    snapshot = tracemalloc.take_snapshot().filter_traces(NOISE_FILTERS)
+                    stats = snapshot.compare_to(previous, "lineno") if previous else snapshot.statistics("lineno")
+                    return snapshot, stats
+
+                snapshot, stats = await asyncio.to_thread(measure)
+                traced, _ = tracemalloc.get_traced_memory()
+                logger.info(
+                    "Top allocators",
+                    extra={
+                        "traced_mib": round(traced / 2**20, 2),
+                        "rss_mib": round((current_rss_bytes() or 0) / 2**20, 1),
+                        "top": [stat_entry(s, "lineno") for s in stats[:limit]],
+                    },
+                )
+                previous = snapshot
+            except Exception:
+                logger.exception("Failed to log top allocators")
+
+    def start(self, trace_at_start: bool, frames: int, log_seconds: float, log_top: int):
+        if trace_at_start and not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+        if log_seconds > 0 and self._task is None:
+            self._task = asyncio.create_task(self.log_top_allocators(log_seconds, log_top))
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+memory_diagnostics = MemoryDiagnostics()
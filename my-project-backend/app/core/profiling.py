@@ -0,0 +1,233 @@
+"""
+On-demand request profiling.
+
+A request is profiled when an admin sends `X-Profile: sample` (or
+`cprofile`) with their bearer token, or when it is picked by
+PROFILE_SAMPLE_RATE. Everything else pays one header scan.
+
+`sample` runs a background thread that captures the event-loop thread's
+stack every PROFILE_INTERVAL_MS and aggregates collapsed stacks; it can be
+exported as collapsed text (flamegraph.pl, speedscope) or speedscope JSON.
+`cprofile` runs the deterministic profiler (one at a time per worker) and
+stores pstats text. Both observe the whole event loop thread, so requests
+running concurrently on the same worker show up too.
+
+Profiles are stored in Mongo (TTL-expired) after the response is sent and
+the response carries X-Profile-Id; fetch them from /admin/profiles/{id}.
+"""
+from collections import Counter
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, List, Optional
+import asyncio
+import cProfile
+import io
+import logging
+import os
+import pstats
+import random
+import sys
+import threading
+import time
+import uuid
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = b"x-profile"
+PROFILE_ID_HEADER = b"x-profile-id"
+MODES = ("sample", "cprofile")
+
+PROFILES = lambda db: db[settings.profile_collection]
+
+# cProfile allows a single active profiler per thread
+_cprofile_lock = threading.Lock()
+
+
+def frame_name(code) -> str:
+    name = getattr(code, "co_qualname", code.co_name)
+    return f"{name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def collapse(frame) -> str:
+    """Root-first, semicolon-separated stack (collapsed/folded format)"""
+    names = []
+    while frame is not None:
+        names.append(frame_name(frame.f_code))
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+class StackSampler:
+    """Samples one thread's stack from a background thread"""
+
+    def __init__(self, thread_id: int, interval: float):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.counts: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                self.counts[collapse(frame)] += 1
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+
+def to_collapsed(stacks: List[list]) -> str:
+    return "".join(f"{stack} {count}\n" for stack, count in stacks)
+
+
+def to_speedscope(profile: dict) -> dict:
+    """Speedscope file (sampled profile) from stored collapsed stacks"""
+    frames: List[dict] = []
+    index: Dict[str, int] = {}
+    samples, weights = [], []
+    interval_ms = profile.get("interval_ms", 1)
+    for stack, count in profile.get("stacks", []):
+        ids = []
+        for name in stack.split(";"):
+            if name not in index:
+                index[name] = len(frames)
+                frames.append({"name": name})
+            ids.append(index[name])
+        samples.append(ids)
+        weights.append(count * interval_ms)
+    title = f"{profile.get('method')} {profile.get('path')}"
+    return {
+        "$schema": "https://www.speedscope.app/file-format-schema.json",
+        "name": title,
+        "exporter": "ias-blog-api",
+        "shared": {"frames": frames},
+        "profiles": [{
+            "type": "sampled",
+            "name": title,
+            "unit": "milliseconds",
+            "startValue": 0,
+            "endValue": sum(weights),
+            "samples": samples,
+            "weights": weights,
+        }],
+    }
+
+
+class ProfilingMiddleware:
+    """ASGI middleware profiling admin-requested or randomly sampled requests"""
+
+    def __init__(
+        self,
+        app,
+        get_db: Callable,
+        authorize: Callable[[str], Awaitable[bool]],
+        sample_rate: float = 0.0,
+        interval_ms: float = 5.0,
+    ):
+        self.app = app
+        self.get_db = get_db
+        self.authorize = authorize
+        self.sample_rate = sample_rate
+        self.interval = interval_ms / 1000
+        self._pending: set = set()
+
+    async def requested_mode(self, scope) -> Optional[str]:
+        mode = token = None
+        for name, value in scope.get("headers", []):
+            if name == PROFILE_HEADER:
+                mode = value.decode("latin-1").strip().lower() or "sample"
+            elif name == b"authorization":
+                scheme, _, token = value.decode("latin-1").partition(" ")
+                if scheme.lower() != "bearer":
+                    token = None
+        if mode is None:
+            return None
+        if mode not in MODES:
+            mode = "sample"
+        if not token or not await self.authorize(token):
+            return None
+        return mode
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        mode = await self.requested_mode(scope)
+        trigger = "header"
+        if mode is None and self.sample_rate > 0 and random.random() < self.sample_rate:
+            mode, trigger = "sample", "rate"
+        if mode is None:
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = uuid.uuid4().hex
+        status = 500
+
+        async def send_with_id(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                message["headers"] = list(message.get("headers", [])) + [(PROFILE_ID_HEADER, profile_id.encode())]
+            await send(message)
+
+        sampler = profiler = None
+        if mode == "cprofile" and _cprofile_lock.acquire(blocking=False):
+            profiler = cProfile.Profile()
+            profiler.enable()
+        else:
+            mode = "sample"
+            sampler = StackSampler(threading.get_ident(), self.interval)
+            sampler.start()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            duration_ms = (time.perf_counter() - start) * 1000
+            doc = {
+                "_id": profile_id,
+                "mode": mode,
+                "trigger": trigger,
+                "method": scope["method"],
+                "path": scope["path"],
+                "route": getattr(scope.get("route"), "path", None),
+                "status": status,
+                "duration_ms": round(duration_ms, 2),
+                "pid": os.getpid(),
+                "createdAt": datetime.utcnow(),
+            }
+            if profiler is not None:
+                profiler.disable()
+                _cprofile_lock.release()
+                out = io.StringIO()
+                pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(80)
+                doc["stats"] = out.getvalue()
+            else:
+                sampler.stop()
+                doc["interval_ms"] = self.interval * 1000
+                doc["samples"] = sum(sampler.counts.values())
+                doc["stacks"] = [[stack, count] for stack, count in sampler.counts.most_common()]
+            # Stored after the response so profiling does not add a round trip to it
+            task = asyncio.create_task(self.store(doc))
+            self._pending.add(task)
+            task.add_done_callback(self._pending.discard)
+
+    async def store(self, doc: dict):
+        try:
+            await PROFILES(self.get_db()).insert_one(doc)
+        except Exception:
+            logger.exception("Failed to store request profile", extra={"profile_id": doc["_id"]})
+
+
+async def list_profiles(db, limit: int = 50) -> List[dict]:
+    cursor = PROFILES(db).find({}, {"stacks": 0, "stats": 0}).sort("createdAt", -1).limit(limit)
+    return [doc async for doc in cursor]
+
+
+async def get_profile(db, profile_id: str) -> Optional[dict]:
+    return await PROFILES(db).find_one({"_id": profile_id})
@@ -0,0 +1,171 @@
+"""
+Token-bucket rate limiting with pluggable backends.
+
+Policies are "capacity/seconds" strings: a bucket holds `capacity` tokens and
+refills at capacity/seconds tokens per second. The memory backend is sharded
+and bounded per worker; the mongo backend keeps buckets in a shared
+collection (atomic pipeline update) so limits hold across workers.
+"""
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Optional
+import logging
+import time
+import zlib
+from pymongo import ReturnDocument
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class RateLimitPolicy:
+    name: str
+    capacity: float
+    refill_per_second: float
+
+    @classmethod
+    def parse(cls, name: str, spec: str) -> "RateLimitPolicy":
+        """Parse "30/60" as 30 requests per 60 seconds"""
+        capacity, _, seconds = spec.partition("/")
+        capacity = float(capacity)
+        return cls(name, capacity, capacity / float(seconds or 1))
+
+
+@dataclass
+class RateLimitResult:
+    allowed: bool
+    remaining: float
+    retry_after: float
+
+
+class MemoryBackend:
+    """Per-worker buckets in LRU-bounded shards"""
+
+    def __init__(self, shards: int = 16, max_keys_per_shard: int = 10000):
+        self.max_keys_per_shard = max_keys_per_shard
+        self._shards = [OrderedDict() for _ in range(shards)]
+
+    def _shard(self, key: str) -> OrderedDict:
+        return self._shards[zlib.crc32(key.encode("utf-8")) % len(self._shards)]
+
+    async def consume(self, key: str, policy: RateLimitPolicy, cost: float = 1.0, peek: bool = False) -> RateLimitResult:
+        now = time.monotonic()
+        shard = self._shard(key)
+        tokens, last = shard.get(key, (policy.capacity, now))
+        tokens = min(policy.capacity, tokens + (now - last) * policy.refill_per_second)
+        allowed = tokens >= cost
+        if allowed and not peek:
+            tokens -= cost
+        shard[key] = (tokens, now)
+        shard.move_to_end(key)
+        if len(shard) > self.max_keys_per_shard:
+            # Evicting the least recently seen key only ever resets it to a full bucket
+            shard.popitem(last=False)
+        retry_after = 0.0 if allowed else (cost - tokens) / policy.refill_per_second
+        return RateLimitResult(allowed, tokens, retry_after)
+
+
+class MongoBackend:
+    """Buckets shared by all workers, one atomic round trip per check"""
+
+    def __init__(self, get_db: Callable, collection: str):
+        self.get_db = get_db
+        self.collection = collection
+
+    async def consume(self, key: str, policy: RateLimitPolicy, cost: float = 1.0, peek: bool = False) -> RateLimitResult:
+        now = time.time()
+        refilled = {
+            "$min": [
+                policy.capacity,
+                {"$add": [
+                    {"$ifNull": ["$tokens", policy.capacity]},
+                    {"$multiply": [{"$subtract": [now, {"$ifNull": ["$ts", now]}]}, policy.refill_per_second]},
+                ]},
+            ]
+        }
+        idle_seconds = policy.capacity / policy.refill_per_second
+        doc = await self.get_db()[self.collection].find_one_and_update(
+            {"_id": key},
+            [
+                {"$set": {"tokens": refilled, "ts": now}},
+                {"$set": {"allowed": {"$gte": ["$tokens", cost]}}},
+                {"$set": {
+                    "tokens": {"$cond": [{"$and": ["$allowed", not peek]}, {"$subtract": ["$tokens", cost]}, "$tokens"]},
+                    # TTL index removes buckets that would be full again anyway
+                    "expiresAt": datetime.utcnow() + timedelta(seconds=idle_seconds),
+                }},
+            ],
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+        tokens = doc["tokens"]
+        allowed = doc["allowed"]
+        retry_after = 0.0 if allowed else (cost - tokens) / policy.refill_per_second
+        return RateLimitResult(allowed, tokens, retry_after)
+
+
+class RateLimiter:
+    """Applies named policies to identifiers and counts outcomes per policy"""
+
+    def __init__(self, backend, policies: Dict[str, RateLimitPolicy], enabled: bool = True):
+        self.backend = backend
+        self.policies = policies
+        self.enabled = enabled
+        self.counters: Dict[str, Dict[str, int]] = {
+            name: {"allowed": 0, "rejected": 0, "errors": 0} for name in policies
+        }
+
+    async def hit(
+        self, policy_name: str, identifier: str, cost: float = 1.0, peek: bool = False
+    ) -> Optional[RateLimitResult]:
+        """Consume from the identifier's bucket; None when limiting is disabled.
+
+        With peek=True only report whether `cost` tokens are available, so a
+        policy can count failures alone. Backend failures fail open so an
+        unavailable store never blocks requests.
+        """
+        policy = self.policies.get(policy_name)
+        if not self.enabled or policy is None:
+            return None
+        counters = self.counters[policy_name]
+        try:
+            result = await self.backend.consume(f"{policy_name}:{identifier}", policy, cost, peek)
+        except Exception:
+            counters["errors"] += 1
+            logger.exception("Rate limit backend failed for policy %s", policy_name)
+            return None
+        counters["allowed" if result.allowed else "rejected"] += 1
+        return result
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "backend": type(self.backend).__name__,
+            "policies": {
+                name: {
+                    "capacity": policy.capacity,
+                    "refill_per_second": round(policy.refill_per_second, 4),
+                    **self.counters[name],
+                }
+                for name, policy in self.policies.items()
+            },
+        }
+
+
+def build_limiter(get_db: Callable) -> RateLimiter:
+    if settings.rate_limit_backend == "mongo":
+        backend = MongoBackend(get_db, settings.rate_limit_collection)
+    else:
+        backend = MemoryBackend(settings.rate_limit_shards, settings.rate_limit_max_keys_per_shard)
+    policies = {
+        name: RateLimitPolicy.parse(name, spec)
+        for name, spec in (
+            ("engagement", settings.rate_limit_engagement),
+            ("login_ip", settings.rate_limit_login_ip),
+            ("login_email", settings.rate_limit_login_email),
+            ("register_ip", settings.rate_limit_register_ip),
+        )
+    }
+    return RateLimiter(backend, policies, enabled=settings.rate_limit_enabled)
@@ -0,0 +1,72 @@
+from typing import Any, Optional
+from bson import ObjectId
+from fastapi import Request
+from fastapi.responses import Response
+import hashlib
+import orjson
+
+# orjson serializes datetime natively in the same isoformat jsonable_encoder produces;
+# _default covers the Mongo/pydantic types it does not know
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+
+def _default(obj: Any):
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if hasattr(obj, "model_dump"):
+        return obj.model_dump(mode="json")
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    """Serialize to JSON bytes with the C encoder (handles datetime and ObjectId)"""
+    return orjson.dumps(content, default=_default, option=ORJSON_OPTIONS)
+
+
+class FastJSONResponse(Response):
+    """JSON response rendered by orjson, skipping FastAPI's jsonable_encoder pass.
+
+    Return it directly from a route so response_model validation is bypassed too.
+    """
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+class RawJSONResponse(Response):
+    """JSON response for bytes that were already serialized (e.g. read from a cache)"""
+    media_type = "application/json"
+
+    def render(self, content: bytes) -> bytes:
+        return content
+
+
+def etag_for(body: bytes) -> str:
+    """Weak ETag derived from the serialized body (stable across workers)"""
+    return f'W/"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+
+def not_modified(request: Request, etag: str) -> bool:
+    """Whether the client's If-None-Match already covers this ETag"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    return header.strip() == "*" or etag in [tag.strip() for tag in header.split(",")]
+
+
+def etag_json_response(
+    request: Request, body: bytes, headers: Optional[dict] = None, status_code: int = 200, etag: Optional[str] = None
+) -> Response:
+    """Serve pre-serialized JSON with an ETag, answering 304 when the client is current.
+
+    Pass `etag` when the caller already stored one for `body`. The ETag also
+    lets the compression middleware reuse compressed bytes.
+    """
+    etag = etag or etag_for(body)
+    response_headers = {"ETag": etag, **(headers or {})}
+    if not_modified(request, etag):
+        return Response(status_code=304, headers=response_headers)
+    return RawJSONResponse(body, status_code=status_code, headers=response_headers)
@@ -1,21 +1,27 @@
 from datetime import datetime, timedelta
 from typing import Optional
-from jose import JWTError, jwt
-from passlib.context import CryptContext
+from functools import lru_cache
 from app.core.config import settings
+from app.core.lazy import lazy_module
 
-# Password hashing context
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# jose and passlib/bcrypt are imported on first use, not at worker start
+jwt = lazy_module("jose.jwt")
+
+@lru_cache(maxsize=1)
+def get_pwd_context():
+    """Password hashing context"""
+    from passlib.context import CryptContext
+    return CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a plain password against a hashed password"""
-    return pwd_context.verify(plain_password, hashed_password)
+    return get_pwd_context().verify(plain_password, hashed_password)
 
 def get_password_hash(password: str) -> str:
     """Hash a password (truncate to 72 characters for bcrypt compatibility)"""
     # Bcrypt has a 72 byte limit, truncate password if needed
     truncated_password = password[:72]
-    return pwd_context.hash(truncated_password)
+    return get_pwd_context().hash(truncated_password)
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create a JWT access token"""
@@ -38,5 +44,5 @@ def verify_token(token: str) -> Optional[str]:
         if email is None:
             return None
         return email
-    except JWTError:
+    except jwt.JWTError:
         return None
@@ -0,0 +1,144 @@
+"""
+Declarative index registry.
+
+INDEXES lists the indexes every collection should have. apply_indexes()
+creates only the missing ones, one createIndexes command per collection with
+all collections in flight at once, so running it repeatedly is cheap and
+safe. check_indexes() reports missing, conflicting, unexpected and unused
+($indexStats) indexes. Run it standalone with manage_indexes.py.
+"""
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple
+import asyncio
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from app.core.config import settings
+
+
+@dataclass(frozen=True)
+class IndexSpec:
+    keys: Tuple[Tuple[str, int], ...]
+    options: Dict = field(default_factory=dict, hash=False, compare=False)
+
+    @property
+    def name(self) -> str:
+        # Same default name the server/driver generates, so existing indexes match
+        return self.options.get("name") or "_".join(f"{k}_{d}" for k, d in self.keys)
+
+    def model(self) -> IndexModel:
+        return IndexModel(list(self.keys), **self.options)
+
+
+def index(*keys, **options) -> IndexSpec:
+    return IndexSpec(tuple((k, ASCENDING) if isinstance(k, str) else k for k in keys), options)
+
+
+def registry() -> Dict[str, List[IndexSpec]]:
+    """Indexes per collection, keyed by collection name"""
+    return {
+        settings.articles_collection: [
+            index("slug", unique=True),
+            index("category"),
+            index("isFeatured"),
+            index(("createdAt", DESCENDING)),
+            index("status", ("createdAt", DESCENDING)),
+            # Category / featured listings (list_articles, homepage sections)
+            index("status", "category", ("createdAt", DESCENDING)),
+            index("status", "isFeatured", ("createdAt", DESCENDING)),
+            index("status", ("trendingScore", DESCENDING)),
+            index("authorId", ("createdAt", DESCENDING)),
+            index("authorEmail", ("createdAt", DESCENDING)),
+        ],
+        settings.comments_collection: [
+            index(("created_at", DESCENDING)),
+            index("article_id", ("created_at", DESCENDING)),
+            index("author_id", ("created_at", DESCENDING)),
+        ],
+        settings.users_collection: [
+            index("email", unique=True),
+            index(("created_at", DESCENDING)),
+        ],
+        settings.related_collection: [
+            index("related.slug"),
+            # Inverted index for incremental updates (term bucket -> articles)
+            index("vector.idx"),
+        ],
+        settings.taxonomy_collection: [
+            index("kind", ("approved", DESCENDING)),
+        ],
+        settings.rate_limit_collection: [
+            index("expiresAt", expireAfterSeconds=0),
+        ],
+        settings.profile_collection: [
+            index(("createdAt", DESCENDING), expireAfterSeconds=settings.profile_ttl_hours * 3600),
+        ],
+        # Shapes not seen again for SLOW_QUERY_TTL_DAYS expire
+        settings.slow_query_collection: [
+            index("last_seen", expireAfterSeconds=settings.slow_query_ttl_days * 86400),
+        ],
+        "settings": [
+            index("type"),
+        ],
+    }
+
+
+def _options_match(spec: IndexSpec, info: dict) -> bool:
+    for option in ("unique", "expireAfterSeconds", "sparse"):
+        if spec.options.get(option) != info.get(option):
+            return False
+    return True
+
+
+async def _collection_report(db, name: str, specs: List[IndexSpec], with_usage: bool) -> dict:
+    collection = db[name]
+    existing = await collection.index_information()
+    by_keys = {tuple((k, int(d)) for k, d in info["key"]): (index_name, info) for index_name, info in existing.items()}
+
+    missing, conflicts = [], []
+    for spec in specs:
+        match = by_keys.get(spec.keys)
+        if match is None:
+            missing.append(spec)
+        elif not _options_match(spec, match[1]):
+            conflicts.append({"name": match[0], "expected": spec.options, "actual": {
+                k: match[1].get(k) for k in ("unique", "expireAfterSeconds", "sparse") if k in match[1]
+            }})
+
+    declared = {spec.keys for spec in specs}
+    unexpected = [
+        index_name for keys, (index_name, _) in by_keys.items()
+        if keys not in declared and index_name != "_id_"
+    ]
+
+    unused = []
+    if with_usage and existing:
+        try:
+            async for stat in collection.aggregate([{"$indexStats": {}}]):
+                if stat["name"] != "_id_" and stat.get("accesses", {}).get("ops", 0) == 0:
+                    unused.append({"name": stat["name"], "since": stat.get("accesses", {}).get("since")})
+        except Exception as e:
+            unused.append({"error": str(e)})
+
+    return {"missing": missing, "conflicts": conflicts, "unexpected": unexpected, "unused": unused}
+
+
+async def check_indexes(db, with_usage: bool = True) -> Dict[str, dict]:
+    """Compare the registry with the server, all collections concurrently"""
+    specs = registry()
+    reports = await asyncio.gather(*[
+        _collection_report(db, name, collection_specs, with_usage)
+        for name, collection_specs in specs.items()
+    ])
+    return dict(zip(specs.keys(), reports))
+
+
+async def apply_indexes(db) -> Dict[str, List[str]]:
+    """Create missing registry indexes; returns created index names per collection"""
+    reports = await check_indexes(db, with_usage=False)
+
+    async def create(name: str, missing: List[IndexSpec]) -> List[str]:
+        if not missing:
+            return []
+        return await db[name].create_indexes([spec.model() for spec in missing])
+
+    created = await asyncio.gather(*[create(name, report["missing"]) for name, report in reports.items()])
+    return {name: names for name, names in zip(reports.keys(), created) if names}
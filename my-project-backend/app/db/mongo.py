@@ -1,13 +1,50 @@
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo.read_preferences import make_read_preference, read_pref_mode_from_name
 from app.core.config import settings
+from app.db.slow_queries import slow_query_recorder
+import asyncio
 
 _client: AsyncIOMotorClient | None = None
 _db = None
+_read_db = None
+
+def client_options() -> dict:
+    """Pool, timeout and wire-compression options from settings"""
+    options = {
+        "minPoolSize": settings.mongo_min_pool_size,
+        "maxPoolSize": settings.mongo_max_pool_size,
+        "serverSelectionTimeoutMS": settings.mongo_server_selection_timeout_ms,
+        "connectTimeoutMS": settings.mongo_connect_timeout_ms,
+    }
+    if settings.mongo_max_idle_time_ms is not None:
+        options["maxIdleTimeMS"] = settings.mongo_max_idle_time_ms
+    if settings.mongo_socket_timeout_ms is not None:
+        options["socketTimeoutMS"] = settings.mongo_socket_timeout_ms
+    if settings.mongo_compressors:
+        options["compressors"] = settings.mongo_compressors
+        options["zlibCompressionLevel"] = settings.mongo_zlib_level
+    if slow_query_recorder.enabled:
+        options["event_listeners"] = [slow_query_recorder]
+    return options
+
+def read_preference(name: str):
+    """Read preference object from its mode name (e.g. secondaryPreferred)"""
+    return make_read_preference(read_pref_mode_from_name(name), None)
 
 async def connect_to_mongo():
-    global _client, _db
-    _client = AsyncIOMotorClient(settings.mongo_uri)
+    global _client, _db, _read_db
+    _client = AsyncIOMotorClient(settings.mongo_uri, **client_options())
     _db = _client[settings.db_name]
+    _read_db = _client.get_database(
+        settings.db_name,
+        read_preference=read_preference(settings.mongo_public_read_preference),
+    )
+
+async def warm_up_pool(connections: int):
+    """Open pool connections up front with concurrent pings"""
+    if _client is None or connections <= 0:
+        return
+    await asyncio.gather(*[_client.admin.command("ping") for _ in range(connections)])
 
 async def close_mongo_connection():
     global _client
@@ -16,3 +53,7 @@ async def close_mongo_connection():
 
 def get_db():
     return _db
+
+def get_read_db():
+    """Database for public reads that tolerate replica lag (secondaryPreferred by default)"""
+    return _read_db if _read_db is not None else _db
@@ -0,0 +1,38 @@
+"""
+Guards for the tools that drop and re-seed a database (benchmarks, the
+synthetic dataset generator, the query-plan check).
+
+They never take their target from MONGODB_URI/DB_NAME in .env, which point
+at the real deployment: the URI is passed explicitly (default: a local
+mongod) and the database name has to look disposable.
+"""
+import os
+import re
+import sys
+
+LOCAL_URI = "mongodb://localhost:27017"
+SCRATCH_NAME_RE = re.compile(r"(^|[_-])(bench|scratch|test|tmp|plans|synthetic|scale)([_-]|$)", re.IGNORECASE)
+
+
+def is_scratch_db(name: str) -> bool:
+    """Whether a database name is marked as disposable (e.g. ias_blog_bench)"""
+    return bool(name and SCRATCH_NAME_RE.search(name))
+
+
+def require_scratch_db(name: str):
+    if not is_scratch_db(name):
+        sys.exit(
+            f"Refusing to use database {name!r}: it would be dropped and re-seeded. "
+            "Use a name containing bench, scratch, test, tmp, plans, synthetic or scale."
+        )
+
+
+def pin_scratch_database(uri: str, db_name: str):
+    """Point the app settings at a scratch database; call before app.core.config is imported"""
+    if "app.core.config" in sys.modules:
+        raise RuntimeError("pin_scratch_database() must run before app settings are loaded")
+    require_scratch_db(db_name)
+    # Real environment variables take precedence over .env in load_dotenv()
+    os.environ["MONGODB_URI"] = uri
+    os.environ["MONGO_URI"] = uri
+    os.environ["DB_NAME"] = db_name
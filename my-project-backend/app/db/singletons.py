@@ -0,0 +1,30 @@
+"""
+Singleton documents in the settings collection.
+
+Admin settings and the feeds, homepage, taxonomy, related-articles and
+author-stats metadata each live in one document whose _id is its type, so
+workers upserting it at the same time on a fresh database converge on a
+single document. Earlier releases looked these up by the non-unique "type"
+field instead; adopt_legacy() moves such a document to its fixed _id once
+and drops the duplicates.
+"""
+from typing import Iterable
+from pymongo.errors import DuplicateKeyError
+
+
+async def adopt_legacy(db, types: Iterable[str]):
+    """Give legacy {"type": ...} documents their fixed _id; the highest version wins"""
+    collection = db["settings"]
+    for doc_type in types:
+        if await collection.find_one({"_id": doc_type}, {"_id": 1}) is None:
+            legacy = await collection.find_one(
+                {"type": doc_type, "_id": {"$ne": doc_type}}, sort=[("version", -1)]
+            )
+            if legacy is None:
+                continue
+            try:
+                await collection.insert_one({**legacy, "_id": doc_type})
+            except DuplicateKeyError:
+                # Another worker adopted it first
+                pass
+        await collection.delete_many({"type": doc_type, "_id": {"$ne": doc_type}})
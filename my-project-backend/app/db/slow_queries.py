@@ -0,0 +1,286 @@
+"""
+Slow-operation recorder.
+
+A pymongo CommandListener registered on the client times every
+find/aggregate/count/distinct/findAndModify/update/delete. Commands slower
+than SLOW_QUERY_MS are grouped by shape (command, collection, filter with
+values replaced by "?", sort) and counted in the slow_queries collection
+together with the API routes that issued them.
+
+The first time a worker sees a shape that has no plan stored yet, it
+re-runs the command as explain("executionStats") in the background and
+stores the winning plan stages, keys/docs examined vs returned and, when
+the plan scans far more documents than it returns, an index suggestion
+following the equality-sort-range rule.
+
+Listener callbacks run on Motor's executor threads (with the request's
+context copied), so they only record under a lock and hand work to the
+event loop.
+"""
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+import asyncio
+import hashlib
+import logging
+import threading
+import orjson
+from pymongo import ReturnDocument, monitoring
+from app.core.config import settings
+from app.core.log import request_id_var, request_scope_var
+
+logger = logging.getLogger(__name__)
+
+SHAPED_COMMANDS = frozenset({"find", "aggregate", "count", "distinct", "findAndModify", "update", "delete"})
+# Session/transport fields that must not be replayed inside explain
+EXPLAIN_STRIP = frozenset({
+    "lsid", "$db", "$clusterTime", "$readPreference", "txnNumber", "autocommit",
+    "startTransaction", "writeConcern", "readConcern", "apiVersion", "apiStrict", "apiDeprecationErrors",
+})
+EQUALITY_OPS = frozenset({"$eq", "$in"})
+RANGE_OPS = frozenset({"$gt", "$gte", "$lt", "$lte", "$ne", "$nin", "$exists", "$regex", "$type"})
+LOGICAL_OPS = frozenset({"$and", "$or", "$nor"})
+# Plans examining more than this many documents per returned document get a suggestion
+SCAN_RATIO_LIMIT = 10
+MAX_PENDING = 10000
+
+SLOW_QUERIES = lambda db: db[settings.slow_query_collection]
+
+
+def shape(value):
+    """Filter/pipeline structure with literal values replaced by "?" """
+    if isinstance(value, dict):
+        return {k: shape(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)) and value and all(isinstance(v, dict) for v in value):
+        return [shape(v) for v in value]
+    return "?"
+
+
+def command_parts(name: str, command: dict) -> Tuple[dict, dict]:
+    """(filter, sort) of a command"""
+    if name == "find":
+        return command.get("filter") or {}, command.get("sort") or {}
+    if name in ("count", "distinct", "findAndModify"):
+        return command.get("query") or {}, command.get("sort") or {}
+    if name == "update":
+        return (command.get("updates") or [{}])[0].get("q") or {}, {}
+    if name == "delete":
+        return (command.get("deletes") or [{}])[0].get("q") or {}, {}
+    if name == "aggregate":
+        filt, sort = {}, {}
+        for stage in command.get("pipeline") or []:
+            if "$match" in stage and not filt:
+                filt = stage["$match"]
+            elif "$sort" in stage and not sort:
+                sort = stage["$sort"]
+        return filt, sort
+    return {}, {}
+
+
+def shape_key(name: str, collection: str, command: dict) -> Tuple[str, str]:
+    filt, sort = command_parts(name, command)
+    described = {"op": name, "ns": collection, "filter": shape(filt), "sort": dict(sort)}
+    if name == "aggregate":
+        described["stages"] = [next(iter(stage)) for stage in command.get("pipeline") or [] if stage]
+    text = orjson.dumps(described, option=orjson.OPT_SORT_KEYS, default=str).decode()
+    return hashlib.blake2b(text.encode(), digest_size=12).hexdigest(), text
+
+
+def _field_ops(filt: dict, prefix_equality: List[str], ranges: List[str]):
+    for field, condition in filt.items():
+        if field in LOGICAL_OPS or field.startswith("$"):
+            continue
+        if isinstance(condition, dict) and any(k.startswith("$") for k in condition):
+            ops = set(condition)
+            if ops & RANGE_OPS:
+                ranges.append(field)
+            elif ops & EQUALITY_OPS:
+                prefix_equality.append(field)
+        else:
+            prefix_equality.append(field)
+
+
+def suggest_indexes(filt: dict, sort: dict) -> List[dict]:
+    """Equality, then sort, then range fields; one suggestion per $or branch"""
+    branches = filt.get("$or") if isinstance(filt.get("$or"), list) else None
+    base = {k: v for k, v in filt.items() if k != "$or"}
+    suggestions = []
+    for branch in branches or [{}]:
+        equality, ranges = [], []
+        combined = {**base, **branch}
+        for clause in combined.get("$and", []) if isinstance(combined.get("$and"), list) else []:
+            _field_ops(clause, equality, ranges)
+        _field_ops(combined, equality, ranges)
+        keys = [[f, 1] for f in dict.fromkeys(equality)]
+        keys += [[f, int(d) if isinstance(d, (int, float)) else 1] for f, d in sort.items() if f not in equality]
+        keys += [[f, 1] for f in dict.fromkeys(ranges) if f not in equality and f not in sort]
+        if not keys:
+            continue
+        suggestion = {"keys": keys}
+        regexes = [f for f, c in combined.items() if isinstance(c, dict) and "$regex" in c]
+        if regexes:
+            suggestion["note"] = (
+                f"$regex on {', '.join(regexes)} only uses an index when anchored (^prefix) and "
+                "case-sensitive; consider a text index for substring search"
+            )
+        suggestions.append(suggestion)
+    return suggestions
+
+
+def _find_key(doc, key: str):
+    if isinstance(doc, dict):
+        if key in doc:
+            return doc[key]
+        for value in doc.values():
+            found = _find_key(value, key)
+            if found is not None:
+                return found
+    elif isinstance(doc, list):
+        for value in doc:
+            found = _find_key(value, key)
+            if found is not None:
+                return found
+    return None
+
+
+def plan_stages(plan) -> List[str]:
+    """Winning plan stages root-first, e.g. ["FETCH", "IXSCAN status_1_createdAt_-1"]"""
+    stages = []
+    stack = [plan] if plan else []
+    while stack:
+        node = stack.pop(0)
+        if not isinstance(node, dict):
+            continue
+        if "stage" in node:
+            stages.append(f"{node['stage']} {node['indexName']}" if node.get("indexName") else node["stage"])
+        for child in ("queryPlan", "inputStage", "outerStage", "innerStage"):
+            if child in node:
+                stack.append(node[child])
+        stack.extend(node.get("inputStages", []))
+    return stages
+
+
+def summarize_explain(explain: dict) -> dict:
+    stats = _find_key(explain, "executionStats") or {}
+    stages = plan_stages(_find_key(explain, "winningPlan"))
+    examined = stats.get("totalDocsExamined", 0)
+    returned = stats.get("nReturned", 0)
+    return {
+        "stages": stages,
+        "collscan": any(s.startswith("COLLSCAN") for s in stages),
+        "nReturned": returned,
+        "totalDocsExamined": examined,
+        "totalKeysExamined": stats.get("totalKeysExamined", 0),
+        "executionTimeMillis": stats.get("executionTimeMillis"),
+        "docsExaminedPerReturned": round(examined / max(returned, 1), 1),
+    }
+
+
+class SlowQueryRecorder(monitoring.CommandListener):
+    def __init__(self, threshold_ms: float, explain: bool = True):
+        self.threshold_us = threshold_ms * 1000
+        self.explain = explain
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.get_db = None
+        self._pending: Dict[tuple, tuple] = {}
+        self._lock = threading.Lock()
+        self._explained: set = set()
+        self._tasks: set = set()
+
+    @property
+    def enabled(self) -> bool:
+        return self.threshold_us > 0
+
+    def start(self, get_db):
+        self.loop = asyncio.get_running_loop()
+        self.get_db = get_db
+
+    def stop(self):
+        self.loop = None
+
+    # CommandListener callbacks (any thread)
+
+    def started(self, event):
+        if self.loop is None or event.command_name not in SHAPED_COMMANDS:
+            return
+        collection = event.command.get(event.command_name)
+        if collection == settings.slow_query_collection:
+            return
+        scope = request_scope_var.get()
+        route = getattr(scope.get("route"), "path", None) if scope else None
+        method = scope.get("method") if scope else None
+        entry = (event.database_name, collection, event.command, method, route, request_id_var.get())
+        with self._lock:
+            if len(self._pending) >= MAX_PENDING:
+                self._pending.clear()
+            self._pending[(event.connection_id, event.request_id)] = entry
+
+    def _finished(self, event, failed: bool):
+        with self._lock:
+            entry = self._pending.pop((event.connection_id, event.request_id), None)
+        if entry is None or event.duration_micros < self.threshold_us:
+            return
+        loop = self.loop
+        if loop is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(self._schedule, event.command_name, entry, event.duration_micros / 1000, failed)
+
+    def succeeded(self, event):
+        self._finished(event, failed=False)
+
+    def failed(self, event):
+        self._finished(event, failed=True)
+
+    # Event loop side
+
+    def _schedule(self, name: str, entry: tuple, duration_ms: float, failed: bool):
+        task = asyncio.ensure_future(self.record(name, entry, duration_ms, failed))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def record(self, name: str, entry: tuple, duration_ms: float, failed: bool):
+        database, collection, command, method, route, request_id = entry
+        key, described = shape_key(name, collection, command)
+        now = datetime.utcnow()
+        update = {
+            "$inc": {"count": 1, "total_ms": duration_ms, "failed": 1 if failed else 0},
+            "$max": {"max_ms": duration_ms},
+            "$set": {"last_ms": duration_ms, "last_seen": now, "last_request_id": request_id},
+            "$setOnInsert": {"op": name, "ns": f"{database}.{collection}", "shape": described, "first_seen": now},
+        }
+        if route:
+            update["$addToSet"] = {"routes": f"{method} {route}"}
+        try:
+            doc = await SLOW_QUERIES(self.get_db()).find_one_and_update(
+                {"_id": key}, update, upsert=True,
+                projection={"plan": 1}, return_document=ReturnDocument.AFTER,
+            )
+            if self.explain and key not in self._explained and not doc.get("plan"):
+                self._explained.add(key)
+                await self.explain_shape(key, database, name, command)
+        except Exception:
+            logger.exception("Failed to record slow query", extra={"shape": described})
+
+    async def explain_shape(self, key: str, database: str, name: str, command: dict):
+        if name == "aggregate" and any(("$out" in s or "$merge" in s) for s in command.get("pipeline") or []):
+            return
+        replay = {k: v for k, v in command.items() if k not in EXPLAIN_STRIP}
+        db = self.get_db().client[database]
+        try:
+            explain = await db.command({"explain": replay, "verbosity": "executionStats"})
+        except Exception as e:
+            logger.warning("Could not explain slow query", extra={"shape_id": key, "error": str(e)})
+            return
+        plan = summarize_explain(explain)
+        update = {"plan": plan, "explained_at": datetime.utcnow()}
+        if plan["collscan"] or plan["docsExaminedPerReturned"] > SCAN_RATIO_LIMIT:
+            update["suggested_indexes"] = suggest_indexes(*command_parts(name, command))
+        await SLOW_QUERIES(self.get_db()).update_one({"_id": key}, {"$set": update})
+        if update.get("suggested_indexes"):
+            logger.warning("Slow query without a fitting index", extra={"shape_id": key, "plan": plan["stages"]})
+
+
+async def list_slow_queries(db, sort: str = "max_ms", limit: int = 50) -> List[dict]:
+    cursor = SLOW_QUERIES(db).find({}).sort(sort, -1).limit(limit)
+    return [doc async for doc in cursor]
+
+
+slow_query_recorder = SlowQueryRecorder(settings.slow_query_ms, settings.slow_query_explain)
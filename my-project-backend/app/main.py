@@ -2,6 +2,12 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from app.core.config import settings
+from app.core.compression import CompressionMiddleware
+from app.core.log import configure_logging, RequestIdMiddleware
+from app.core.instrumentation import MetricsMiddleware, route_metrics
+from app.core.profiling import ProfilingMiddleware
+from app.core.memory import memory_diagnostics
+from app.api.dependencies import authorize_superuser_token
 from app.api.routes.articles import router as articles_router
 from app.api.routes.auth import router as auth_router
 from app.api.routes.health import router as health_router
@@ -12,10 +18,69 @@ from app.api.routes.uploads import router as uploads_router
 from app.api.routes.metrics import router as metrics_router
 from app.api.routes.google_auth import router as google_auth_router
 from app.api.routes.engagement import router as engagement_router
-from app.db.mongo import connect_to_mongo, close_mongo_connection, get_db
+from app.api.routes.home import router as home_router
+from app.api.routes.taxonomy import router as taxonomy_router
+from app.api.routes.authors import router as authors_router
+from app.api.routes.internal import router as internal_router
+from app.api.routes.feeds import router as feeds_router
+from app.db.mongo import connect_to_mongo, close_mongo_connection, get_db, warm_up_pool
+from app.db.indexes import apply_indexes
+from app.db.singletons import adopt_legacy
+from app.db.slow_queries import slow_query_recorder
+from app.services.trending import trending
+from app.services.author_stats import STREAM_TYPE, author_stats
+from app.services.feeds import FEEDS_TYPE
+from app.services.homepage import BUNDLE_TYPE
+from app.services.related import MODEL_TYPE
+from app.services.site_settings import ADMIN_TYPE, site_settings
+from app.services.taxonomy import MARKER_TYPE, ensure_taxonomy
+from contextlib import asynccontextmanager
 import os
 
-app = FastAPI(title="IAS UWU Blog API", version="0.1.0")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Here rather than at import so scripts importing the app keep their own logging
+    configure_logging(
+        settings.log_level,
+        settings.log_levels,
+        settings.log_format,
+        settings.log_sampling,
+        settings.log_queue_size,
+    )
+    await connect_to_mongo()
+    slow_query_recorder.start(get_db)
+    await warm_up_pool(settings.mongo_warmup_connections or settings.mongo_min_pool_size)
+    # Declared in app/db/indexes.py; set INDEX_MODE=off and run manage_indexes.py in deployments
+    if settings.index_mode == "apply":
+        await apply_indexes(get_db())
+    # Settings singletons written by earlier releases move to their fixed _id
+    await adopt_legacy(get_db(), (ADMIN_TYPE, FEEDS_TYPE, BUNDLE_TYPE, MODEL_TYPE, MARKER_TYPE, STREAM_TYPE))
+    await site_settings.load(get_db())
+    # First deploy (or a new counter layout): build tag/category counts once
+    await ensure_taxonomy(get_db())
+    site_settings.start(get_db, settings.site_settings_refresh_seconds)
+    trending.start(get_db(), settings.trending_flush_seconds)
+    author_stats.start(get_db())
+    route_metrics.start(settings.metrics_dir, settings.metrics_export_seconds)
+    memory_diagnostics.start(
+        settings.tracemalloc_at_start,
+        settings.tracemalloc_frames,
+        settings.memory_log_seconds,
+        settings.memory_log_top,
+    )
+
+    yield
+
+    # Runs after the server has drained in-flight requests (e.g. on SIGTERM)
+    await site_settings.stop()
+    await trending.stop(get_db())
+    await author_stats.stop(get_db())
+    await route_metrics.stop(settings.metrics_dir)
+    await memory_diagnostics.stop()
+    slow_query_recorder.stop()
+    await close_mongo_connection()
+
+app = FastAPI(title="IAS UWU Blog API", version="0.1.0", lifespan=lifespan)
 
 origins_env = settings.frontend_url
 origins = [o.strip() for o in origins_env.split(",") if o.strip()] or [
@@ -31,19 +96,30 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-@app.on_event("startup")
-async def on_startup():
-    await connect_to_mongo()
-    # Indexes for articles
-    await get_db()[settings.articles_collection].create_index("slug", unique=True)
-    await get_db()[settings.articles_collection].create_index("category")
-    await get_db()[settings.articles_collection].create_index("isFeatured")
-    # Indexes for users
-    await get_db()[settings.users_collection].create_index("email", unique=True)
+if settings.compression_enabled:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.compression_min_size,
+        gzip_level=settings.compression_gzip_level,
+        brotli_quality=settings.compression_brotli_quality,
+        content_types=settings.compression_content_types.split(","),
+        cache_size=settings.compression_cache_size,
+    )
 
-@app.on_event("shutdown")
-async def on_shutdown():
-    await close_mongo_connection()
+if settings.profiling_enabled:
+    app.add_middleware(
+        ProfilingMiddleware,
+        get_db=get_db,
+        authorize=authorize_superuser_token,
+        sample_rate=settings.profile_sample_rate,
+        interval_ms=settings.profile_interval_ms,
+    )
+
+# Measures what goes on the wire (after compression)
+app.add_middleware(MetricsMiddleware, metrics=route_metrics)
+
+# Outermost, so every log line of the request (middleware included) carries the id
+app.add_middleware(RequestIdMiddleware)
 
 app.include_router(health_router, prefix="/health")
 app.include_router(auth_router, prefix="/api/auth", tags=["auth"])
@@ -54,6 +130,11 @@ app.include_router(profile_router, prefix="/profile", tags=["profile"])
 app.include_router(admin_router, prefix="/admin", tags=["admin"])
 app.include_router(uploads_router, prefix="/upload", tags=["upload"])
 app.include_router(metrics_router, prefix="", tags=["metrics"])  # public metrics at /metrics
+app.include_router(home_router, prefix="", tags=["home"])  # landing page bundle at /home
+app.include_router(taxonomy_router, prefix="", tags=["taxonomy"])  # tag cloud / category facets at /taxonomy
+app.include_router(authors_router, prefix="/authors", tags=["authors"])
+app.include_router(internal_router, prefix="", tags=["internal"])  # Prometheus metrics at INTERNAL_METRICS_PATH
+app.include_router(feeds_router, prefix="", tags=["feeds"])  # sitemap.xml, rss.xml, atom.xml
 app.include_router(engagement_router, prefix="/articles", tags=["engagement"])  # likes/views at /articles/{slug}/like
 
 # Serve uploaded files
@@ -63,5 +144,6 @@ if not os.path.exists(UPLOADS_PATH):
 app.mount("/uploads", StaticFiles(directory=UPLOADS_PATH), name="uploads")
 
 if __name__ == "__main__":
-    import uvicorn
-    uvicorn.run("app.main:app", host="0.0.0.0", port=8000, reload=True)
+    # Same server settings as serve.py (for auto-reload use uvicorn --reload)
+    from serve import main as serve
+    serve()
@@ -14,6 +14,17 @@ class ArticleCreate(ArticleBase):
     """Schema for creating a new article (user submits)"""
     pass
 
+class ArticleImport(ArticleBase):
+    """Schema for one NDJSON line of a bulk import (legacy posts keep their metadata)"""
+    author: Optional[str] = None
+    authorEmail: Optional[str] = None
+    authorId: Optional[str] = None
+    status: str = "approved"
+    isFeatured: bool = False
+    viewCount: int = 0
+    createdAt: Optional[datetime] = None
+    updatedAt: Optional[datetime] = None
+
 class ArticleUpdate(BaseModel):
     title: Optional[str] = None
     category: Optional[str] = None
@@ -24,6 +35,16 @@ class ArticleUpdate(BaseModel):
     isFeatured: Optional[bool] = None
     status: Optional[str] = None  # For admin to approve/reject
 
+class ArticleBulkAction(BaseModel):
+    """Schema for admin bulk moderation of articles by slug"""
+    slugs: List[str] = Field(..., min_length=1, max_length=1000)
+    reason: Optional[str] = None  # Rejection reason
+    is_featured: bool = True  # Feature / unfeature
+
+class ArticleStatsRequest(BaseModel):
+    """Schema for batch engagement stats (POST variant for long slug lists)"""
+    slugs: List[str] = Field(..., min_length=1, max_length=500)
+
 class ArticleOut(BaseModel):
     id: str
     slug: str
@@ -1,6 +1,6 @@
 from pydantic import BaseModel, Field
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 
 class CommentBase(BaseModel):
     content: str = Field(..., min_length=1, max_length=1000)
@@ -14,6 +14,10 @@ class CommentCreate(CommentBase):
 class CommentUpdate(BaseModel):
     content: str = Field(..., min_length=1, max_length=1000)
 
+class CommentBulkDelete(BaseModel):
+    """Schema for admin bulk deletion of comments by id"""
+    ids: List[str] = Field(..., min_length=1, max_length=1000)
+
 class CommentOut(CommentBase):
     id: str
     author_id: Optional[str] = None
@@ -0,0 +1,18 @@
+from typing import Optional
+from pydantic import BaseModel, Field
+from app.services.site_settings import MAX_ARTICLES_PER_PAGE
+
+class SiteSettingsUpdate(BaseModel):
+    """Admin-editable site settings; unknown keys are rejected, so nothing else reaches $set"""
+    site_name: Optional[str] = Field(default=None, min_length=1, max_length=200)
+    site_description: Optional[str] = Field(default=None, max_length=1000)
+    allow_registration: Optional[bool] = None
+    require_email_verification: Optional[bool] = None
+    auto_approve_articles: Optional[bool] = None
+    featured_articles_limit: Optional[int] = Field(default=None, ge=1, le=50)
+    articles_per_page: Optional[int] = Field(default=None, ge=1, le=MAX_ARTICLES_PER_PAGE)
+    enable_comments: Optional[bool] = None
+
+    class Config:
+        extra = "forbid"
+        strict = True
@@ -0,0 +1,147 @@
+"""
+Bulk article import shared by the admin endpoint and import_articles.py
+
+Input is NDJSON (one article object per line). Each batch resolves slug
+collisions with a single query and is written with an unordered insert_many,
+so one bad line never aborts the rest of the batch.
+"""
+import json
+import re
+from datetime import datetime
+from typing import Iterable, List, Optional, Tuple
+from pydantic import ValidationError
+from pymongo.errors import BulkWriteError
+from app.schemas.article import ArticleImport
+from app.services.article_text import generate_slug, calculate_reading_time
+from app.services.taxonomy import record_changes
+
+DEFAULT_BATCH_SIZE = 500
+
+
+def parse_ndjson(lines: Iterable[str]) -> List[Tuple[int, Optional[ArticleImport], Optional[str]]]:
+    """Parse NDJSON lines into (line number, article, error) tuples, skipping blank lines"""
+    parsed = []
+    for line_no, line in enumerate(lines, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            parsed.append((line_no, ArticleImport(**json.loads(line)), None))
+        except json.JSONDecodeError as e:
+            parsed.append((line_no, None, f"Invalid JSON: {e.msg}"))
+        except ValidationError as e:
+            parsed.append((line_no, None, f"Invalid article: {e.errors()[0].get('msg')}"))
+        except TypeError:
+            parsed.append((line_no, None, "Invalid article: expected a JSON object"))
+    return parsed
+
+
+async def allocate_slugs(collection, titles: List[str]) -> List[str]:
+    """Allocate unique slugs for a batch of titles with one query against existing slugs"""
+    bases = [generate_slug(title) or "article" for title in titles]
+    unique_bases = sorted(set(bases))
+
+    # Anchored prefix regexes can still walk the unique slug index
+    clauses = []
+    for base in unique_bases:
+        clauses.append({"slug": base})
+        clauses.append({"slug": {"$regex": f"^{re.escape(base)}-\\d+$"}})
+    taken = set()
+    if clauses:
+        cursor = collection.find({"$or": clauses}, {"slug": 1, "_id": 0})
+        taken = {doc["slug"] async for doc in cursor}
+
+    slugs = []
+    for base in bases:
+        slug = base
+        counter = 1
+        while slug in taken:
+            slug = f"{base}-{counter}"
+            counter += 1
+        taken.add(slug)
+        slugs.append(slug)
+    return slugs
+
+
+def build_article_document(item: ArticleImport, slug: str, default_author: dict, now: datetime) -> dict:
+    """Build the stored article document, matching the shape written by create_article"""
+    author_email = item.authorEmail or default_author.get("email")
+    created_at = item.createdAt or now
+    return {
+        "slug": slug,
+        "title": item.title,
+        "author": item.author or default_author.get("name") or (author_email or "").split("@")[0],
+        "authorEmail": author_email,
+        "authorId": item.authorId or default_author.get("id"),
+        "category": item.category,
+        "tags": item.tags,
+        "readingTime": calculate_reading_time(item.content),
+        "featuredImage": str(item.featuredImage) if item.featuredImage else None,
+        "shortDescription": item.shortDescription,
+        "content": item.content,
+        "status": item.status,
+        "isFeatured": item.isFeatured,
+        "viewCount": item.viewCount,
+        "likesCount": 0,
+        "likes": [],
+        "createdAt": created_at,
+        "updatedAt": item.updatedAt or created_at,
+    }
+
+
+async def import_batch(collection, batch: List[Tuple[int, ArticleImport]], default_author: dict) -> List[dict]:
+    """Insert one batch of parsed articles and return per-line results"""
+    if not batch:
+        return []
+    now = datetime.utcnow()
+    slugs = await allocate_slugs(collection, [item.title for _, item in batch])
+    docs = [
+        build_article_document(item, slug, default_author, now)
+        for (_, item), slug in zip(batch, slugs)
+    ]
+
+    errors = {}
+    try:
+        await collection.insert_many(docs, ordered=False)
+    except BulkWriteError as e:
+        for err in e.details.get("writeErrors", []):
+            errors[err["index"]] = err.get("errmsg", "Write failed")
+
+    inserted = [doc for index, doc in enumerate(docs) if index not in errors]
+    await record_changes(collection.database, [(None, doc) for doc in inserted])
+
+    results = []
+    for index, ((line_no, _), doc) in enumerate(zip(batch, docs)):
+        if index in errors:
+            results.append({"line": line_no, "ok": False, "error": errors[index]})
+        else:
+            results.append({"line": line_no, "ok": True, "slug": doc["slug"], "id": str(doc["_id"])})
+    return results
+
+
+async def import_articles(
+    collection,
+    lines: Iterable[str],
+    default_author: dict,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> dict:
+    """Import NDJSON articles in batches, reporting per-line errors without aborting"""
+    results = []
+    batch = []
+    for line_no, item, error in parse_ndjson(lines):
+        if error:
+            results.append({"line": line_no, "ok": False, "error": error})
+            continue
+        batch.append((line_no, item))
+        if len(batch) >= batch_size:
+            results.extend(await import_batch(collection, batch, default_author))
+            batch = []
+    results.extend(await import_batch(collection, batch, default_author))
+
+    results.sort(key=lambda r: r["line"])
+    inserted = sum(1 for r in results if r["ok"])
+    return {
+        "inserted": inserted,
+        "failed": len(results) - inserted,
+        "results": results,
+    }
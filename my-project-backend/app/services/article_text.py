@@ -0,0 +1,19 @@
+"""
+Slug and reading-time helpers shared by the article routes and the bulk import
+"""
+import re
+
+
+def generate_slug(title: str) -> str:
+    """Generate URL-friendly slug from title"""
+    slug = title.lower()
+    slug = re.sub(r'[^a-z0-9\s-]', '', slug)
+    slug = re.sub(r'\s+', '-', slug)
+    return slug
+
+
+def calculate_reading_time(content: str) -> str:
+    """Calculate estimated reading time (200 words per minute)"""
+    word_count = len(content.split())
+    minutes = max(1, round(word_count / 200))
+    return f"{minutes} min read"
@@ -0,0 +1,317 @@
+"""
+Materialized per-author statistics (article counts, views, likes).
+
+One document per author in the author_stats collection, keyed by authorId
+(or authorEmail for legacy articles without one), so author pages and the
+user's own dashboard are a single _id lookup.
+
+The documents are kept current by a change-stream consumer on the articles
+collection: events are collected for AUTHOR_STATS_BATCH_SECONDS, then each
+touched author is recomputed with one aggregation over the (authorId,
+createdAt) index. Updates that only touch fields we do not aggregate
+(trendingScore, content, ...) are filtered out server-side. The resume
+token is stored in the settings collection so restarts continue where they
+left off. Deletes need the pre-image to know the author; when the articles
+collection does not have changeStreamPreAndPostImages enabled a delete
+triggers a full rebuild instead.
+
+Change streams require a replica set. On a standalone server (or with
+AUTHOR_STATS_SYNC=poll) the consumer falls back to a periodic full rebuild.
+With several workers only the holder of a short lease in the settings
+collection runs the consumer.
+"""
+from datetime import datetime, timedelta
+from typing import Iterable, List, Optional, Set
+import asyncio
+import logging
+import os
+import socket
+from pymongo import ReplaceOne, ReturnDocument
+from pymongo.errors import DuplicateKeyError, OperationFailure
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+STREAM_TYPE = "author_stats_stream"
+LEASE_ID = "author_stats_lease"
+STATS_FIELDS = ("status", "viewCount", "likesCount", "isFeatured", "author", "authorId", "authorEmail", "createdAt")
+AUTHOR_FIELDS = ("authorId", "authorEmail")
+STATUSES = ("approved", "pending", "rejected")
+
+# Server error codes
+NOT_REPLICA_SET = 40573
+CHANGE_STREAM_HISTORY_LOST = 286
+CHANGE_STREAM_FATAL = 280
+
+AUTHOR_STATS = lambda db: db[settings.author_stats_collection]
+
+
+def author_key(doc: Optional[dict]) -> Optional[str]:
+    if not doc:
+        return None
+    return doc.get("authorId") or doc.get("authorEmail")
+
+
+def _approved(expr):
+    return {"$cond": [{"$eq": ["$status", "approved"]}, expr, 0]}
+
+
+def stats_pipeline(match: Optional[dict] = None) -> List[dict]:
+    group = {
+        "_id": {"$ifNull": ["$authorId", "$authorEmail"]},
+        "authorId": {"$max": "$authorId"},
+        "authorEmail": {"$max": "$authorEmail"},
+        "author": {"$max": "$author"},
+        "total": {"$sum": 1},
+        "featured": {"$sum": _approved({"$cond": [{"$eq": ["$isFeatured", True]}, 1, 0]})},
+        "views": {"$sum": _approved({"$ifNull": ["$viewCount", 0]})},
+        "likes": {"$sum": _approved({"$ifNull": ["$likesCount", 0]})},
+        "lastPublishedAt": {"$max": {"$cond": [{"$eq": ["$status", "approved"]}, "$createdAt", None]}},
+    }
+    for status in STATUSES:
+        group[status] = {"$sum": {"$cond": [{"$eq": ["$status", status]}, 1, 0]}}
+    pipeline = [{"$match": match}] if match else []
+    pipeline += [
+        {"$project": {field: 1 for field in STATS_FIELDS}},
+        {"$group": group},
+    ]
+    return pipeline
+
+
+def stats_document(row: dict, now: datetime) -> dict:
+    return {
+        "authorId": row.get("authorId"),
+        "authorEmail": row.get("authorEmail"),
+        "author": row.get("author"),
+        "articles": {
+            "total": row["total"],
+            **{status: row[status] for status in STATUSES},
+            "featured": row["featured"],
+        },
+        "views": row["views"],
+        "likes": row["likes"],
+        "lastPublishedAt": row.get("lastPublishedAt"),
+        "updatedAt": now,
+    }
+
+
+async def refresh_authors(db, keys: Iterable[str]):
+    """Recompute stats for the given author keys from the articles collection"""
+    keys = [k for k in set(keys) if k]
+    if not keys:
+        return
+    emails = [k for k in keys if "@" in k]
+    ids = [k for k in keys if "@" not in k]
+    clauses = []
+    if ids:
+        clauses.append({"authorId": {"$in": ids}})
+    if emails:
+        clauses.append({"authorId": None, "authorEmail": {"$in": emails}})
+    match = clauses[0] if len(clauses) == 1 else {"$or": clauses}
+
+    rows = await db[settings.articles_collection].aggregate(stats_pipeline(match)).to_list(length=None)
+    now = datetime.utcnow()
+    found = {row["_id"] for row in rows}
+    ops = [ReplaceOne({"_id": row["_id"]}, stats_document(row, now), upsert=True) for row in rows]
+    if ops:
+        await AUTHOR_STATS(db).bulk_write(ops, ordered=False)
+    gone = [k for k in keys if k not in found]
+    if gone:
+        await AUTHOR_STATS(db).delete_many({"_id": {"$in": gone}})
+
+
+async def rebuild_author_stats(db) -> dict:
+    """Recompute every author's stats; authors with no articles left are removed"""
+    rows = await db[settings.articles_collection].aggregate(stats_pipeline()).to_list(length=None)
+    now = datetime.utcnow()
+    ops = [ReplaceOne({"_id": row["_id"]}, stats_document(row, now), upsert=True) for row in rows if row["_id"]]
+    for start in range(0, len(ops), 1000):
+        await AUTHOR_STATS(db).bulk_write(ops[start:start + 1000], ordered=False)
+    await AUTHOR_STATS(db).delete_many({"updatedAt": {"$lt": now}})
+    return {"authors": len(ops)}
+
+
+async def get_author_stats(db, *keys: str) -> Optional[dict]:
+    """Stats for one author, merging the authorId and legacy authorEmail documents"""
+    docs = await AUTHOR_STATS(db).find({"_id": {"$in": [k for k in keys if k]}}).to_list(length=None)
+    if not docs:
+        return None
+    merged = docs[0]
+    for doc in docs[1:]:
+        for field, count in doc.get("articles", {}).items():
+            merged["articles"][field] = merged["articles"].get(field, 0) + count
+        merged["views"] = merged.get("views", 0) + doc.get("views", 0)
+        merged["likes"] = merged.get("likes", 0) + doc.get("likes", 0)
+        published = [d for d in (merged.get("lastPublishedAt"), doc.get("lastPublishedAt")) if d]
+        merged["lastPublishedAt"] = max(published) if published else None
+        merged["authorId"] = merged.get("authorId") or doc.get("authorId")
+    merged.pop("_id", None)
+    return merged
+
+
+def change_pipeline() -> List[dict]:
+    """Only events that can change an author's aggregated numbers"""
+    relevant_update = {"$or": [
+        {f"updateDescription.updatedFields.{field}": {"$exists": True}} for field in STATS_FIELDS
+    ]}
+    return [
+        {"$match": {"$or": [
+            {"operationType": {"$in": ["insert", "replace", "delete"]}},
+            {"operationType": "update", **relevant_update},
+        ]}},
+        {"$project": {
+            "operationType": 1,
+            **{f"fullDocument.{f}": 1 for f in AUTHOR_FIELDS},
+            **{f"fullDocumentBeforeChange.{f}": 1 for f in AUTHOR_FIELDS},
+        }},
+    ]
+
+
+class AuthorStatsSync:
+    """Background consumer keeping author_stats in step with articles"""
+
+    def __init__(self, mode: str, batch_seconds: float, poll_seconds: float, lease_seconds: float):
+        self.mode = mode
+        self.batch_seconds = batch_seconds
+        self.poll_seconds = poll_seconds
+        self.lease_seconds = lease_seconds
+        self.owner = f"{socket.gethostname()}:{os.getpid()}"
+        self.dirty: Set[str] = set()
+        self.full_rebuild = False
+        self._task: Optional[asyncio.Task] = None
+
+    def collect(self, change: dict):
+        keys = [author_key(change.get("fullDocument")), author_key(change.get("fullDocumentBeforeChange"))]
+        keys = [k for k in keys if k]
+        if keys:
+            self.dirty.update(keys)
+        else:
+            # Delete without a pre-image (or a document deleted before lookup)
+            self.full_rebuild = True
+
+    async def flush(self, db):
+        dirty, self.dirty = self.dirty, set()
+        full, self.full_rebuild = self.full_rebuild, False
+        try:
+            if full:
+                await rebuild_author_stats(db)
+            elif dirty:
+                await refresh_authors(db, dirty)
+        except Exception:
+            self.dirty |= dirty
+            self.full_rebuild = self.full_rebuild or full
+            raise
+
+    async def acquire_lease(self, db, seconds: Optional[float] = None) -> bool:
+        now = datetime.utcnow()
+        try:
+            await db["settings"].find_one_and_update(
+                {"_id": LEASE_ID, "$or": [{"owner": self.owner}, {"expiresAt": {"$lt": now}}]},
+                {"$set": {"type": LEASE_ID, "owner": self.owner,
+                          "expiresAt": now + timedelta(seconds=seconds or self.lease_seconds)}},
+                upsert=True,
+                return_document=ReturnDocument.AFTER,
+            )
+            return True
+        except DuplicateKeyError:
+            # Another worker holds an unexpired lease
+            return False
+
+    async def release_lease(self, db):
+        await db["settings"].delete_one({"_id": LEASE_ID, "owner": self.owner})
+
+    async def load_token(self, db) -> Optional[dict]:
+        doc = await db["settings"].find_one({"_id": STREAM_TYPE}, {"token": 1})
+        return doc.get("token") if doc else None
+
+    async def save_token(self, db, token: Optional[dict]):
+        if token is not None:
+            await db["settings"].update_one(
+                {"_id": STREAM_TYPE},
+                {"$set": {"type": STREAM_TYPE, "token": token, "updated_at": datetime.utcnow()}},
+                upsert=True,
+            )
+
+    async def stream(self, db):
+        """Consume article changes while holding the lease; returns when it is lost"""
+        token = await self.load_token(db)
+        async with db[settings.articles_collection].watch(
+            change_pipeline(),
+            full_document="updateLookup",
+            full_document_before_change="whenAvailable",
+            resume_after=token,
+            max_await_time_ms=int(self.batch_seconds * 1000),
+        ) as stream:
+            if token is None:
+                # First run: the stream is open, so nothing written from here on is missed
+                await rebuild_author_stats(db)
+            renew_at = asyncio.get_running_loop().time() + self.lease_seconds / 3
+            flush_at = None
+            while stream.alive:
+                change = await stream.try_next()
+                now = asyncio.get_running_loop().time()
+                if change is not None:
+                    self.collect(change)
+                    flush_at = flush_at or now + self.batch_seconds
+                if flush_at is not None and now >= flush_at:
+                    await self.flush(db)
+                    await self.save_token(db, stream.resume_token)
+                    flush_at = None
+                if now >= renew_at:
+                    if not await self.acquire_lease(db):
+                        return
+                    renew_at = now + self.lease_seconds / 3
+
+    async def poll(self, db):
+        while await self.acquire_lease(db, self.poll_seconds + self.lease_seconds):
+            await rebuild_author_stats(db)
+            await asyncio.sleep(self.poll_seconds)
+
+    async def run(self, db):
+        mode = self.mode
+        while True:
+            try:
+                if await self.acquire_lease(db):
+                    if mode == "poll":
+                        await self.poll(db)
+                    else:
+                        await self.stream(db)
+            except asyncio.CancelledError:
+                raise
+            except OperationFailure as e:
+                if e.code == NOT_REPLICA_SET and mode == "auto":
+                    logger.info("Change streams unavailable (standalone server); polling author stats")
+                    mode = "poll"
+                    continue
+                if e.code in (CHANGE_STREAM_HISTORY_LOST, CHANGE_STREAM_FATAL):
+                    logger.warning("Author stats resume token is no longer valid; rebuilding")
+                    await db["settings"].delete_one({"_id": STREAM_TYPE})
+                    continue
+                logger.exception("Author stats consumer failed")
+            except Exception:
+                logger.exception("Author stats consumer failed")
+            await asyncio.sleep(self.lease_seconds / 3)
+
+    def start(self, db):
+        if self._task is None and self.mode != "off":
+            self._task = asyncio.create_task(self.run(db))
+
+    async def stop(self, db):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            if self.dirty or self.full_rebuild:
+                await self.flush(db)
+            await self.release_lease(db)
+
+
+author_stats = AuthorStatsSync(
+    settings.author_stats_sync,
+    settings.author_stats_batch_seconds,
+    settings.author_stats_poll_seconds,
+    settings.author_stats_lease_seconds,
+)
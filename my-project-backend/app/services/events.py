@@ -0,0 +1,43 @@
+"""
+Fan-out for article lifecycle changes.
+
+Routes schedule article_changed() as a background task after a write; each
+derived view (related articles, homepage bundle, sitemap/feeds, ...)
+refreshes only for the kinds of change that affect it.
+"""
+from typing import List
+import logging
+from app.services.feeds import feed_store
+from app.services.homepage import home_cache
+from app.services.related import refresh_related
+
+logger = logging.getLogger(__name__)
+
+APPROVED = "approved"
+REJECTED = "rejected"
+UPDATED = "updated"
+FEATURED = "featured"
+DELETED = "deleted"
+IMPORTED = "imported"
+
+HOME_EVENTS = {APPROVED, REJECTED, UPDATED, FEATURED, DELETED, IMPORTED}
+RELATED_EVENTS = {APPROVED, REJECTED, UPDATED, DELETED}
+FEED_EVENTS = {APPROVED, REJECTED, UPDATED, DELETED, IMPORTED}
+
+
+async def article_changed(db, slugs: List[str], kind: str):
+    """Refresh derived data after articles change; never raises"""
+    if not slugs:
+        return
+    if kind in RELATED_EVENTS:
+        await refresh_related(db, slugs)
+    if kind in HOME_EVENTS:
+        try:
+            await home_cache.rebuild(db)
+        except Exception:
+            logger.exception("Failed to rebuild homepage bundle")
+    if kind in FEED_EVENTS:
+        try:
+            await feed_store.regenerate(db, slugs)
+        except Exception:
+            logger.exception("Failed to regenerate sitemap and feeds")
@@ -0,0 +1,376 @@
+"""
+Precomputed sitemap and RSS/Atom feeds.
+
+Files are rendered from approved articles with projection-only cursors,
+compressed once (gzip, plus brotli when installed) and stored in the feeds
+collection with their ETag. A version counter in the settings collection
+tells workers when to drop their in-memory copies, so serving a feed is a
+dictionary lookup. Approve/reject/update/delete events update them.
+
+sitemap.xml is a plain urlset up to SITEMAP_SHARD_SIZE URLs (50,000 is the
+protocol limit) and becomes a sitemap index of sitemap-N.xml shards past
+that. Shards cover createdAt ranges, so newly approved articles land in the
+last shard. An article change re-renders only the shard whose range holds
+it (found through the slugs each shard document lists) plus RSS/Atom, and
+is skipped when the article is neither approved nor listed; a full build
+runs on first start or when a shard outgrows the limit. Rendering and
+compression run in worker threads.
+"""
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from typing import Dict, Iterable, List, Optional, Set
+from bisect import bisect_right
+from xml.sax.saxutils import escape, quoteattr
+import asyncio
+import gzip
+import time
+from bson import Binary
+from app.core.config import settings
+from app.core.compression import brotli
+from app.core.responses import etag_for
+
+FEEDS_TYPE = "feeds"
+SITEMAP = "sitemap.xml"
+RSS = "rss.xml"
+ATOM = "atom.xml"
+# Shard documents carry the slugs they list, so a change can be traced to its shard
+FEEDS_FORMAT = 2
+CONTENT_TYPES = {
+    SITEMAP: "application/xml",
+    RSS: "application/rss+xml",
+    ATOM: "application/atom+xml",
+}
+FEED_PROJECTION = {
+    "_id": 0, "slug": 1, "title": 1, "author": 1, "category": 1,
+    "shortDescription": 1, "createdAt": 1, "updatedAt": 1,
+}
+
+FEEDS = lambda db: db[settings.feeds_collection]
+ARTICLES = lambda db: db[settings.articles_collection]
+
+
+def shard_name(n: int) -> str:
+    return f"sitemap-{n}.xml"
+
+
+def article_url(slug: str) -> str:
+    return settings.site_url.rstrip("/") + settings.feed_article_path.format(slug=slug)
+
+
+def w3c_date(dt: Optional[datetime]) -> str:
+    return (dt or datetime.utcnow()).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def rfc822_date(dt: Optional[datetime]) -> str:
+    return format_datetime((dt or datetime.utcnow()).replace(tzinfo=timezone.utc), usegmt=True)
+
+
+def render_urlset(entries: List[tuple]) -> bytes:
+    parts = ['<?xml version="1.0" encoding="UTF-8"?>\n<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n']
+    for slug, updated in entries:
+        parts.append(f"<url><loc>{escape(article_url(slug))}</loc><lastmod>{w3c_date(updated)}</lastmod></url>\n")
+    parts.append("</urlset>\n")
+    return "".join(parts).encode()
+
+
+def render_sitemap_index(shards: List[tuple]) -> bytes:
+    base = (settings.feeds_base_url or settings.site_url).rstrip("/")
+    parts = ['<?xml version="1.0" encoding="UTF-8"?>\n<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n']
+    for name, lastmod in shards:
+        parts.append(f"<sitemap><loc>{escape(f'{base}/{name}')}</loc><lastmod>{w3c_date(lastmod)}</lastmod></sitemap>\n")
+    parts.append("</sitemapindex>\n")
+    return "".join(parts).encode()
+
+
+def render_rss(docs: List[dict]) -> bytes:
+    site = escape(settings.site_url)
+    parts = [
+        '<?xml version="1.0" encoding="UTF-8"?>\n<rss version="2.0"><channel>\n',
+        f"<title>{escape(settings.site_name)}</title><link>{site}</link>"
+        f"<description>{escape(settings.site_name)} latest articles</description>\n",
+    ]
+    if docs:
+        parts.append(f"<lastBuildDate>{rfc822_date(max(d.get('updatedAt') or d.get('createdAt') for d in docs))}</lastBuildDate>\n")
+    for doc in docs:
+        url = escape(article_url(doc["slug"]))
+        parts.append(
+            f"<item><title>{escape(doc.get('title') or '')}</title><link>{url}</link>"
+            f"<guid isPermaLink=\"true\">{url}</guid><pubDate>{rfc822_date(doc.get('createdAt'))}</pubDate>"
+            f"<category>{escape(doc.get('category') or '')}</category>"
+            f"<description>{escape(doc.get('shortDescription') or '')}</description></item>\n"
+        )
+    parts.append("</channel></rss>\n")
+    return "".join(parts).encode()
+
+
+def render_atom(docs: List[dict]) -> bytes:
+    site = settings.site_url
+    updated = max((d.get("updatedAt") or d.get("createdAt") for d in docs), default=None)
+    parts = [
+        '<?xml version="1.0" encoding="UTF-8"?>\n<feed xmlns="http://www.w3.org/2005/Atom">\n',
+        f"<title>{escape(settings.site_name)}</title><id>{escape(site)}/</id><link href={quoteattr(site)}/>"
+        f"<updated>{w3c_date(updated)}</updated>\n",
+    ]
+    for doc in docs:
+        url = article_url(doc["slug"])
+        parts.append(
+            f"<entry><title>{escape(doc.get('title') or '')}</title><id>{escape(url)}</id><link href={quoteattr(url)}/>"
+            f"<published>{w3c_date(doc.get('createdAt'))}</published>"
+            f"<updated>{w3c_date(doc.get('updatedAt') or doc.get('createdAt'))}</updated>"
+            f"<author><name>{escape(doc.get('author') or '')}</name></author>"
+            f"<category term={quoteattr(doc.get('category') or '')}/>"
+            f"<summary>{escape(doc.get('shortDescription') or '')}</summary></entry>\n"
+        )
+    parts.append("</feed>\n")
+    return "".join(parts).encode()
+
+
+def encode_file(name: str, body: bytes) -> dict:
+    """Stored form: ETag of the XML plus its precompressed encodings"""
+    doc = {
+        "_id": name,
+        "etag": etag_for(body),
+        "contentType": CONTENT_TYPES[SITEMAP if name.startswith("sitemap") else name],
+        "gzip": Binary(gzip.compress(body, compresslevel=9, mtime=0)),
+        "updatedAt": datetime.utcnow(),
+    }
+    if brotli is not None:
+        doc["br"] = Binary(brotli.compress(body, quality=11))
+    return doc
+
+
+def shard_size() -> int:
+    return min(settings.sitemap_shard_size, 50000)
+
+
+def shard_for(shards: List[dict], created: Optional[datetime]) -> int:
+    """Index of the shard whose createdAt range holds an article"""
+    if created is None:
+        return 0
+    return bisect_right([shard["start"] for shard in shards[1:]], created)
+
+
+def shard_filter(shards: List[dict], i: int) -> dict:
+    """Approved articles in shard i's createdAt range"""
+    created = {}
+    if shards[i]["start"] is not None:
+        created["$gte"] = shards[i]["start"]
+    if i + 1 < len(shards):
+        created["$lt"] = shards[i + 1]["start"]
+    return {"status": "approved", "createdAt": created} if created else {"status": "approved"}
+
+
+async def sitemap_shards(db):
+    """(entries, lastmod, start) per shard of at most SITEMAP_SHARD_SIZE URLs, oldest articles first"""
+    size = shard_size()
+    cursor = ARTICLES(db).find(
+        {"status": "approved"}, {"_id": 0, "slug": 1, "createdAt": 1, "updatedAt": 1}
+    ).sort("createdAt", 1).batch_size(5000)
+    entries, lastmod, start = [], None, None
+    async for doc in cursor:
+        updated = doc.get("updatedAt")
+        if not entries:
+            start = doc.get("createdAt")
+        entries.append((doc["slug"], updated))
+        if updated and (lastmod is None or updated > lastmod):
+            lastmod = updated
+        if len(entries) == size:
+            yield entries, lastmod, start
+            entries, lastmod = [], None
+    if entries:
+        yield entries, lastmod, start
+
+
+async def store_file(db, name: str, body: bytes, stored_etag: Optional[str] = None,
+                     slugs: Optional[List[str]] = None) -> bool:
+    """Encode and store one file unless its ETag is unchanged; True when written"""
+    if stored_etag is not None and stored_etag == await asyncio.to_thread(etag_for, body):
+        return False
+    doc = await asyncio.to_thread(encode_file, name, body)
+    if slugs is not None:
+        doc["slugs"] = slugs
+    await FEEDS(db).replace_one({"_id": name}, doc, upsert=True)
+    return True
+
+
+async def store_latest(db, stored: Dict[str, str], written: List[str]):
+    latest = await ARTICLES(db).find(
+        {"status": "approved"}, FEED_PROJECTION
+    ).sort("createdAt", -1).limit(settings.feed_size).to_list(length=settings.feed_size)
+    for name, render in ((RSS, render_rss), (ATOM, render_atom)):
+        body = await asyncio.to_thread(render, latest)
+        if await store_file(db, name, body, stored.get(name)):
+            written.append(name)
+
+
+async def build_feeds(db) -> dict:
+    """Render every file, store the changed ones and bump the shared version"""
+    meta = await db["settings"].find_one({"_id": FEEDS_TYPE}, {"format": 1})
+    stored = {doc["_id"]: doc["etag"] async for doc in FEEDS(db).find({}, {"etag": 1})}
+    # Files stored before shards carried their slugs are all rewritten once
+    current = stored if meta and meta.get("format") == FEEDS_FORMAT else {}
+    names, written = [], []
+
+    async def store(name: str, body: bytes, slugs: Optional[List[str]] = None):
+        names.append(name)
+        if await store_file(db, name, body, current.get(name), slugs):
+            written.append(name)
+
+    # Shards are stored as they are rendered; only the first is held back
+    # in case the whole sitemap fits in sitemap.xml itself
+    shards, first = [], None
+    async for entries, lastmod, start in sitemap_shards(db):
+        shards.append({"name": shard_name(len(shards) + 1), "start": start if shards else None, "lastmod": lastmod})
+        body = await asyncio.to_thread(render_urlset, entries)
+        slugs = [slug for slug, _ in entries]
+        if first is None:
+            first = (body, slugs)
+            continue
+        if len(shards) == 2:
+            await store(shards[0]["name"], *first)
+        await store(shards[-1]["name"], body, slugs)
+    if len(shards) <= 1:
+        shards = [{"name": SITEMAP, "start": None, "lastmod": shards[0]["lastmod"] if shards else None}]
+        await store(SITEMAP, *(first or (render_urlset([]), [])))
+    else:
+        await store(SITEMAP, render_sitemap_index([(shard["name"], shard["lastmod"]) for shard in shards]))
+
+    names.extend((RSS, ATOM))
+    await store_latest(db, current, written)
+
+    removed = [name for name in stored if name not in names]
+    if removed:
+        await FEEDS(db).delete_many({"_id": {"$in": removed}})
+    update = {"$set": {"type": FEEDS_TYPE, "files": sorted(names), "shards": shards, "format": FEEDS_FORMAT, "updated_at": datetime.utcnow()}}
+    if written or removed:
+        update["$inc"] = {"version": 1}
+    await db["settings"].update_one({"_id": FEEDS_TYPE}, update, upsert=True)
+    return {"files": len(names), "shards": len(shards) if len(shards) > 1 else 0, "written": written, "removed": removed}
+
+
+async def update_feeds(db, slugs: Iterable[str]) -> dict:
+    """Re-render only the shards holding the changed articles, plus RSS/Atom
+
+    An article that is neither approved nor listed in a shard (an edit to a
+    pending draft, say) cannot change any file and is skipped.
+    """
+    meta = await db["settings"].find_one({"_id": FEEDS_TYPE}, {"format": 1, "shards": 1})
+    if not meta or meta.get("format") != FEEDS_FORMAT or not meta.get("shards"):
+        return await build_feeds(db)
+    shards = meta["shards"]
+    positions = {shard["name"]: i for i, shard in enumerate(shards)}
+    slugs = list(set(slugs))
+
+    affected, published = set(), set()
+    async for doc in ARTICLES(db).find(
+        {"slug": {"$in": slugs}, "status": "approved"}, {"_id": 0, "slug": 1, "createdAt": 1}
+    ):
+        published.add(doc["slug"])
+        affected.add(shard_for(shards, doc.get("createdAt")))
+    unpublished = [slug for slug in slugs if slug not in published]
+    if unpublished:
+        async for doc in FEEDS(db).find({"slugs": {"$in": unpublished}}, {"_id": 1}):
+            if doc["_id"] in positions:
+                affected.add(positions[doc["_id"]])
+    if not affected:
+        return {"shards": [], "written": []}
+
+    stored = {doc["_id"]: doc["etag"] async for doc in FEEDS(db).find({}, {"etag": 1})}
+    written, lastmods = [], {}
+    for i in sorted(affected):
+        entries, lastmod = [], None
+        cursor = ARTICLES(db).find(
+            shard_filter(shards, i), {"_id": 0, "slug": 1, "updatedAt": 1}
+        ).sort("createdAt", 1).batch_size(5000)
+        async for doc in cursor:
+            updated = doc.get("updatedAt")
+            entries.append((doc["slug"], updated))
+            if updated and (lastmod is None or updated > lastmod):
+                lastmod = updated
+            if len(entries) > shard_size():
+                # The shard outgrew the limit; cut new boundaries
+                return await build_feeds(db)
+        name = shards[i]["name"]
+        body = await asyncio.to_thread(render_urlset, entries)
+        if await store_file(db, name, body, stored.get(name), [slug for slug, _ in entries]):
+            written.append(name)
+            shards[i]["lastmod"] = lastmod
+            lastmods[f"shards.{i}.lastmod"] = lastmod
+    if lastmods and len(shards) > 1:
+        body = await asyncio.to_thread(render_sitemap_index, [(shard["name"], shard["lastmod"]) for shard in shards])
+        if await store_file(db, SITEMAP, body, stored.get(SITEMAP)):
+            written.append(SITEMAP)
+    await store_latest(db, stored, written)
+
+    if written:
+        await db["settings"].update_one(
+            {"_id": FEEDS_TYPE},
+            {"$inc": {"version": 1}, "$set": {**lastmods, "updated_at": datetime.utcnow()}},
+        )
+    return {"shards": [shards[i]["name"] for i in sorted(affected)], "written": written}
+
+
+class FeedStore:
+    """Per-worker copies of the stored feed files, validated against the shared version"""
+
+    def __init__(self, refresh_seconds: float):
+        self.refresh_seconds = refresh_seconds
+        self.version: Optional[int] = None
+        self.files: Dict[str, dict] = {}
+        self.checked_at = 0.0
+        self._lock = asyncio.Lock()
+        self._build_lock = asyncio.Lock()
+        self._full = False
+        self._pending: Set[str] = set()
+
+    async def regenerate(self, db, slugs: Optional[Iterable[str]] = None):
+        """Update after article changes (everything without slugs); calls arriving mid-build coalesce into one more pass"""
+        if slugs is None:
+            self._full = True
+        else:
+            self._pending.update(slugs)
+        if self._build_lock.locked():
+            return
+        async with self._build_lock:
+            while self._full or self._pending:
+                full, pending = self._full, self._pending
+                self._full, self._pending = False, set()
+                if full:
+                    await build_feeds(db)
+                else:
+                    await update_feeds(db, pending)
+        self.checked_at = 0.0
+
+    async def _current_version(self, db) -> Optional[int]:
+        meta = await db["settings"].find_one({"_id": FEEDS_TYPE}, {"version": 1})
+        if meta is None:
+            if self._build_lock.locked():
+                # Wait for the build already running instead of answering 404
+                async with self._build_lock:
+                    pass
+            else:
+                await self.regenerate(db)
+            meta = await db["settings"].find_one({"_id": FEEDS_TYPE}, {"version": 1})
+        return meta.get("version") if meta else None
+
+    async def get(self, db, name: str) -> Optional[dict]:
+        if time.monotonic() - self.checked_at >= self.refresh_seconds:
+            async with self._lock:
+                if time.monotonic() - self.checked_at >= self.refresh_seconds:
+                    version = await self._current_version(db)
+                    if version != self.version:
+                        self.version = version
+                        self.files = {}
+                    self.checked_at = time.monotonic()
+        if name not in self.files:
+            doc = await FEEDS(db).find_one({"_id": name}, {"slugs": 0})
+            if doc is None:
+                return None
+            doc["gzip"] = bytes(doc["gzip"])
+            if "br" in doc:
+                doc["br"] = bytes(doc["br"])
+            self.files[name] = doc
+        return self.files[name]
+
+
+feed_store = FeedStore(settings.feeds_refresh_seconds)
@@ -0,0 +1,111 @@
+"""
+Precomputed landing-page bundle served at /home.
+
+The bundle (public metrics, featured, latest and per-category articles) is
+assembled with concurrent queries, serialized once and stored in the
+settings collection under a version counter. Workers keep the bytes in
+memory and only check the shared version every HOME_REFRESH_SECONDS, so a
+typical /home request does no database work. Approve/feature/delete events
+rebuild the bundle and bump the version.
+"""
+from datetime import datetime
+from typing import Optional
+import asyncio
+import time
+from bson import Binary
+from app.core.config import settings
+from app.core.responses import dumps, etag_for
+from app.services.public_metrics import compute_public_metrics
+
+BUNDLE_TYPE = "home_bundle"
+CARD_PROJECTION = {"content": 0, "likes": 0}
+
+
+def _card(doc: dict) -> dict:
+    doc["_id"] = str(doc["_id"])
+    return doc
+
+
+async def _articles(db, filt: dict, limit: int) -> list:
+    cursor = db[settings.articles_collection].find(
+        {"status": "approved", **filt}, CARD_PROJECTION
+    ).sort("createdAt", -1).limit(limit)
+    return [_card(doc) async for doc in cursor]
+
+
+async def build_home_payload(db) -> dict:
+    """Assemble the bundle with all queries in flight at once"""
+    limit = settings.home_section_size
+    categories = await db[settings.articles_collection].distinct(
+        "category", {"status": "approved", "category": {"$ne": None}}
+    )
+    categories = sorted(c for c in categories if c)[:settings.home_max_categories]
+
+    metrics, featured, latest, *per_category = await asyncio.gather(
+        compute_public_metrics(db),
+        _articles(db, {"isFeatured": True}, limit),
+        _articles(db, {}, limit),
+        *[_articles(db, {"category": c}, limit) for c in categories],
+    )
+    return {
+        "metrics": metrics,
+        "featured": featured,
+        "latest": latest,
+        "categories": [
+            {"category": c, "items": items} for c, items in zip(categories, per_category)
+        ],
+        "generatedAt": datetime.utcnow(),
+    }
+
+
+class HomeBundleCache:
+    """Per-worker copy of the serialized bundle, validated against the shared version"""
+
+    def __init__(self, refresh_seconds: float):
+        self.refresh_seconds = refresh_seconds
+        self.version: Optional[int] = None
+        self.body: Optional[bytes] = None
+        self.etag: Optional[str] = None
+        self.checked_at = 0.0
+        self._lock = asyncio.Lock()
+
+    def _set(self, version: int, body: bytes):
+        self.version = version
+        self.body = body
+        self.etag = etag_for(body)
+        self.checked_at = time.monotonic()
+
+    async def rebuild(self, db) -> bytes:
+        """Rebuild, store and bump the shared version"""
+        payload = await build_home_payload(db)
+        body = dumps(payload)
+        doc = await db["settings"].find_one_and_update(
+            {"_id": BUNDLE_TYPE},
+            {"$set": {"type": BUNDLE_TYPE, "body": Binary(body), "updated_at": datetime.utcnow()}, "$inc": {"version": 1}},
+            projection={"version": 1},
+            upsert=True,
+            return_document=True,
+        )
+        self._set(doc["version"], body)
+        return body
+
+    async def get(self, db) -> bytes:
+        if self.body is not None and time.monotonic() - self.checked_at < self.refresh_seconds:
+            return self.body
+        async with self._lock:
+            if self.body is not None and time.monotonic() - self.checked_at < self.refresh_seconds:
+                return self.body
+            meta = await db["settings"].find_one({"_id": BUNDLE_TYPE}, {"version": 1})
+            if meta is None:
+                return await self.rebuild(db)
+            if meta.get("version") == self.version and self.body is not None:
+                self.checked_at = time.monotonic()
+                return self.body
+            doc = await db["settings"].find_one({"_id": BUNDLE_TYPE}, {"version": 1, "body": 1})
+            if not doc or not doc.get("body"):
+                return await self.rebuild(db)
+            self._set(doc["version"], bytes(doc["body"]))
+            return self.body
+
+
+home_cache = HomeBundleCache(settings.home_refresh_seconds)
@@ -0,0 +1,300 @@
+"""
+Related-articles model: hashed TF-IDF over title/shortDescription/content plus
+tag and category features, with per-article top-k neighbours stored in Mongo.
+
+A full rebuild (rebuild_related.py) scores row blocks of a SciPy sparse
+matrix against the whole corpus. Approving or updating a single article only
+re-vectorizes that article and scores it against the stored vectors sharing
+one of its top terms (the multikey vector.idx index acts as the inverted
+index), so serving /articles/{slug}/related is one indexed read of the
+related collection. Vector maths runs in a worker thread, off the event loop.
+"""
+from __future__ import annotations
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+import asyncio
+import logging
+import math
+import re
+import zlib
+from pymongo import ReplaceOne, UpdateOne
+from app.core.config import settings
+from app.core.lazy import lazy_module
+
+# NumPy/SciPy are only needed when vectors are (re)computed, not to serve reads
+np = lazy_module("numpy")
+sparse = lazy_module("scipy.sparse")
+
+logger = logging.getLogger(__name__)
+
+MODEL_TYPE = "related_model"
+SOURCE_FIELDS = {"slug": 1, "title": 1, "shortDescription": 1, "content": 1, "tags": 1,
+                 "category": 1, "featuredImage": 1, "status": 1}
+CARD_FIELDS = ("slug", "title", "shortDescription", "featuredImage", "category")
+
+FIELD_WEIGHTS = {"title": 3.0, "shortDescription": 2.0, "content": 1.0}
+TAG_WEIGHT = 4.0
+CATEGORY_WEIGHT = 3.0
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+HTML_TAG_RE = re.compile(r"<[^>]+>")
+STOPWORDS = frozenset(
+    "the and for are but not you all any can had her was one our out his has how its may new now "
+    "see two way who did get let say she too use that with have this will your from they been "
+    "more when make like time just know take into year them some could than then look only come "
+    "over also back after most what which their there about would these other".split()
+)
+
+RELATED = lambda db: db[settings.related_collection]
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Lowercase alphanumeric tokens with HTML and stopwords removed"""
+    if not text:
+        return []
+    text = HTML_TAG_RE.sub(" ", text.lower())
+    return [t for t in TOKEN_RE.findall(text) if len(t) > 2 and t not in STOPWORDS]
+
+
+def bucket(feature: str, dimensions: int) -> int:
+    # crc32 is stable across processes, unlike hash()
+    return zlib.crc32(feature.encode("utf-8")) % dimensions
+
+
+def term_weights(doc: dict, dimensions: int) -> Dict[int, float]:
+    """Weighted term frequencies per hashed bucket"""
+    counts: Dict[int, float] = {}
+    for field, weight in FIELD_WEIGHTS.items():
+        for token in tokenize(doc.get(field)):
+            b = bucket(token, dimensions)
+            counts[b] = counts.get(b, 0.0) + weight
+    for tag in doc.get("tags") or []:
+        b = bucket(f"tag:{tag.strip().lower()}", dimensions)
+        counts[b] = counts.get(b, 0.0) + TAG_WEIGHT
+    if doc.get("category"):
+        b = bucket(f"cat:{doc['category'].strip().lower()}", dimensions)
+        counts[b] = counts.get(b, 0.0) + CATEGORY_WEIGHT
+    return counts
+
+
+def idf_vector(df: np.ndarray, n_docs: int) -> np.ndarray:
+    return (np.log((1.0 + n_docs) / (1.0 + df)) + 1.0).astype(np.float32)
+
+
+def sparse_vector(counts: Dict[int, float], idf: np.ndarray, max_terms: int) -> dict:
+    """Top max_terms TF-IDF weights, L2-normalized, in a Mongo-friendly shape"""
+    if not counts:
+        return {"idx": [], "val": []}
+    idx = np.fromiter(counts.keys(), dtype=np.int64, count=len(counts))
+    tf = np.fromiter(counts.values(), dtype=np.float32, count=len(counts))
+    val = (1.0 + np.log(tf)) * idf[idx]
+    if len(idx) > max_terms:
+        keep = np.argpartition(val, -max_terms)[-max_terms:]
+        idx, val = idx[keep], val[keep]
+    norm = float(np.linalg.norm(val))
+    if norm > 0:
+        val = val / norm
+    return {"idx": idx.tolist(), "val": [round(float(v), 6) for v in val]}
+
+
+def sparse_matrix(vectors: List[dict], dimensions: int):
+    """CSR matrix with one row per stored sparse vector"""
+    lengths = [len((vec or {}).get("idx") or []) for vec in vectors]
+    indptr = np.zeros(len(vectors) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=indptr[1:])
+    indices = np.fromiter(
+        (i for vec in vectors if vec for i in vec.get("idx") or []), dtype=np.int32, count=int(indptr[-1])
+    )
+    data = np.fromiter(
+        (v for vec in vectors if vec for v in vec.get("val") or []), dtype=np.float32, count=int(indptr[-1])
+    )
+    return sparse.csr_matrix((data, indices, indptr), shape=(len(vectors), dimensions))
+
+
+def sparse_scores(vector: dict, others: List[dict], dimensions: int) -> np.ndarray:
+    """Dot product of one sparse vector with each of the others"""
+    query = np.zeros(dimensions, dtype=np.float32)
+    if vector.get("idx"):
+        query[vector["idx"]] = vector["val"]
+    return sparse_matrix(others, dimensions) @ query
+
+
+def candidate_terms(vector: dict, n: int) -> List[int]:
+    """Buckets carrying the most weight in a vector, used to look up candidates"""
+    ranked = sorted(zip(vector.get("val", []), vector.get("idx", [])), reverse=True)
+    return [idx for _, idx in ranked[:n]]
+
+
+def card(doc: dict, score: float) -> dict:
+    entry = {field: doc.get(field) for field in CARD_FIELDS}
+    entry["score"] = round(float(score), 4)
+    return entry
+
+
+def score_all(vectors: List[dict], dimensions: int, k: int, batch_size: int) -> List[List[Tuple[int, float]]]:
+    """Top-k (row, score) neighbours of every row; blocking, run it in a thread"""
+    matrix = sparse_matrix(vectors, dimensions)
+    transposed = matrix.T.tocsc()
+    neighbours = []
+    for start in range(0, matrix.shape[0], batch_size):
+        block = (matrix[start:start + batch_size] @ transposed).tocsr()
+        for offset in range(block.shape[0]):
+            row = start + offset
+            cols = block.indices[block.indptr[offset]:block.indptr[offset + 1]]
+            scores = block.data[block.indptr[offset]:block.indptr[offset + 1]].copy()
+            scores[cols == row] = -1.0  # never related to itself
+            neighbours.append([(int(cols[i]), float(scores[i])) for i in top_k(scores, k)])
+    return neighbours
+
+
+def top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k highest positive scores, best first"""
+    k = min(k, len(scores))
+    if k <= 0:
+        return np.array([], dtype=np.int64)
+    candidates = np.argpartition(scores, -k)[-k:]
+    candidates = candidates[np.argsort(scores[candidates])[::-1]]
+    return candidates[scores[candidates] > 0]
+
+
+async def load_model(db) -> Optional[dict]:
+    return await db["settings"].find_one({"_id": MODEL_TYPE})
+
+
+async def rebuild_related(db, k: Optional[int] = None, batch_size: int = 256) -> dict:
+    """Recompute vectors and top-k neighbours for every approved article"""
+    k = k or settings.related_top_k
+    dimensions = settings.related_dimensions
+    articles = db[settings.articles_collection]
+
+    docs, counts = [], []
+    df = np.zeros(dimensions, dtype=np.float32)
+    async for doc in articles.find({"status": "approved"}, SOURCE_FIELDS):
+        weights = term_weights(doc, dimensions)
+        df[list(weights.keys())] += 1
+        docs.append(doc)
+        counts.append(weights)
+
+    n_docs = len(docs)
+    idf = idf_vector(df, n_docs)
+    vectors = [sparse_vector(c, idf, settings.related_vector_terms) for c in counts]
+    neighbours = await asyncio.to_thread(score_all, vectors, dimensions, k, batch_size)
+
+    now = datetime.utcnow()
+    ops = []
+    for row, doc in enumerate(docs):
+        related = [card(docs[i], score) for i, score in neighbours[row]]
+        ops.append(ReplaceOne(
+            {"_id": doc["slug"]},
+            {"articleId": str(doc["_id"]), "vector": vectors[row], "related": related, "updatedAt": now},
+            upsert=True,
+        ))
+        if len(ops) >= 1000:
+            await RELATED(db).bulk_write(ops, ordered=False)
+            ops = []
+    if ops:
+        await RELATED(db).bulk_write(ops, ordered=False)
+
+    await RELATED(db).delete_many({"updatedAt": {"$lt": now}})
+    await db["settings"].update_one(
+        {"_id": MODEL_TYPE},
+        {"$set": {"type": MODEL_TYPE, "n_docs": n_docs, "df": df.astype(int).tolist(), "dimensions": dimensions, "updated_at": now}},
+        upsert=True,
+    )
+    return {"articles": n_docs, "dimensions": dimensions, "k": k}
+
+
+async def remove_related(db, slug: str):
+    """Drop an article from the model (deleted, rejected or unpublished)"""
+    await RELATED(db).delete_one({"_id": slug})
+    await RELATED(db).update_many({"related.slug": slug}, {"$pull": {"related": {"slug": slug}}})
+
+
+async def update_related(db, slug: str, k: Optional[int] = None) -> bool:
+    """Recompute one article's neighbours and splice it into other articles' lists.
+
+    Returns False when the article could not be scored because there is no
+    compatible model yet."""
+    k = k or settings.related_top_k
+    doc = await db[settings.articles_collection].find_one({"slug": slug}, SOURCE_FIELDS)
+    if not doc or doc.get("status") != "approved":
+        await remove_related(db, slug)
+        return True
+
+    model = await load_model(db)
+    if not model or model.get("dimensions") != settings.related_dimensions:
+        return False
+    dimensions = model["dimensions"]
+    idf = idf_vector(np.asarray(model["df"], dtype=np.float32), model["n_docs"])
+    vector = await asyncio.to_thread(
+        lambda: sparse_vector(term_weights(doc, dimensions), idf, settings.related_vector_terms)
+    )
+
+    # Only articles sharing one of this article's strongest terms can rank
+    terms = candidate_terms(vector, settings.related_candidate_terms)
+    others = await RELATED(db).find(
+        {"_id": {"$ne": slug}, "vector.idx": {"$in": terms}},
+        {"vector": 1, "related.score": 1, "related.slug": 1},
+    ).limit(settings.related_max_candidates).to_list(length=None) if terms else []
+    if others:
+        scores = await asyncio.to_thread(sparse_scores, vector, [o.get("vector") for o in others], dimensions)
+    else:
+        scores = np.zeros(0, dtype=np.float32)
+
+    neighbour_idx = top_k(scores, k)
+    neighbour_docs = {}
+    if len(neighbour_idx):
+        cursor = db[settings.articles_collection].find(
+            {"slug": {"$in": [others[i]["_id"] for i in neighbour_idx]}}, {f: 1 for f in CARD_FIELDS}
+        )
+        neighbour_docs = {d["slug"]: d async for d in cursor}
+    related = [
+        card(neighbour_docs[others[i]["_id"]], scores[i])
+        for i in neighbour_idx if others[i]["_id"] in neighbour_docs
+    ]
+
+    now = datetime.utcnow()
+    await RELATED(db).replace_one(
+        {"_id": slug},
+        {"articleId": str(doc["_id"]), "vector": vector, "related": related, "updatedAt": now},
+        upsert=True,
+    )
+
+    # Refresh this article in other lists where it now ranks in the top k
+    await RELATED(db).update_many({"related.slug": slug}, {"$pull": {"related": {"slug": slug}}})
+    entry_ops = []
+    for i, other in enumerate(others):
+        if scores[i] <= 0:
+            continue
+        current = [r for r in other.get("related", []) if r.get("slug") != slug]
+        if len(current) < k or scores[i] > min(r.get("score", 0) for r in current):
+            entry_ops.append(UpdateOne(
+                {"_id": other["_id"]},
+                {"$push": {"related": {"$each": [card(doc, scores[i])], "$sort": {"score": -1}, "$slice": k}}},
+            ))
+    if entry_ops:
+        await RELATED(db).bulk_write(entry_ops, ordered=False)
+    return True
+
+
+async def refresh_related(db, slugs: List[str]):
+    """Background-task entry point; failures never surface to the request"""
+    skipped = []
+    for slug in slugs:
+        try:
+            if not await update_related(db, slug):
+                skipped.append(slug)
+        except Exception:
+            logger.exception("Failed to update related articles for %s", slug)
+    if skipped:
+        logger.warning(
+            "No related-articles model for %s dimensions; run rebuild_related.py", settings.related_dimensions,
+            extra={"skipped": len(skipped), "slugs": skipped[:10]},
+        )
+
+
+async def get_related(db, slug: str, limit: int) -> Optional[List[dict]]:
+    doc = await RELATED(db).find_one({"_id": slug}, {"related": {"$slice": limit}})
+    if doc is None:
+        return None
+    return doc.get("related", [])
@@ -0,0 +1,120 @@
+"""
+Process-wide snapshot of the admin-editable site settings.
+
+The "admin" document in the settings collection is loaded at
+startup and kept in memory, so request paths (registration, article and
+comment creation, list page size) read it without a database round trip.
+update() bumps a version counter in the document; every worker polls that
+version every SITE_SETTINGS_REFRESH_SECONDS and reloads the document only
+when it changed. The snapshot dict is replaced, never mutated, so readers
+always see one consistent version.
+"""
+from datetime import datetime
+from typing import Any, Optional
+import asyncio
+import logging
+from pymongo import ReturnDocument
+
+logger = logging.getLogger(__name__)
+
+ADMIN_TYPE = "admin"
+DEFAULTS = {
+    "site_name": "IAS UWU Blog",
+    "site_description": "IEEE Industry Applications Society - Uva Wellassa University Student Branch Chapter",
+    "allow_registration": True,
+    "require_email_verification": False,
+    "auto_approve_articles": False,
+    "featured_articles_limit": 5,
+    "articles_per_page": 10,
+    "enable_comments": True,
+}
+# Managed here, never taken from an update payload
+PROTECTED_FIELDS = {"_id", "id", "type", "version", "updated_at"}
+# Same cap as the limit query parameter of GET /articles/
+MAX_ARTICLES_PER_PAGE = 100
+
+
+class SiteSettings:
+    def __init__(self):
+        self.values: dict = dict(DEFAULTS)
+        self.version: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self.values.get(key, default)
+
+    def articles_per_page(self) -> int:
+        """Default list page size, clamped in case the stored value predates validation"""
+        try:
+            size = int(self.values.get("articles_per_page", DEFAULTS["articles_per_page"]))
+        except (TypeError, ValueError):
+            size = DEFAULTS["articles_per_page"]
+        return min(max(size, 1), MAX_ARTICLES_PER_PAGE)
+
+    def snapshot(self) -> dict:
+        return {**self.values, "version": self.version}
+
+    def _apply(self, doc: dict):
+        values = {**DEFAULTS, **{k: v for k, v in doc.items() if k not in ("_id", "type", "version")}}
+        values["id"] = str(doc.get("_id", ""))
+        self.values = values
+        self.version = doc.get("version", 0)
+
+    async def load(self, db):
+        """Read the document, creating it with the defaults on first start"""
+        doc = await db["settings"].find_one_and_update(
+            {"_id": ADMIN_TYPE},
+            {"$setOnInsert": {**DEFAULTS, "type": ADMIN_TYPE, "version": 1, "updated_at": datetime.utcnow()}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+        self._apply(doc)
+
+    async def refresh(self, db) -> bool:
+        """Reload when another worker bumped the version; True if it changed"""
+        meta = await db["settings"].find_one({"_id": ADMIN_TYPE}, {"version": 1})
+        if meta is not None and meta.get("version", 0) == self.version:
+            return False
+        await self.load(db)
+        return True
+
+    async def update(self, db, changes: dict) -> dict:
+        """Apply validated changes (see SiteSettingsUpdate); only known top-level keys are written"""
+        unknown = [k for k in changes if k not in DEFAULTS]
+        if unknown:
+            raise ValueError(f"Unknown settings: {', '.join(sorted(map(str, unknown)))}")
+        changes = {k: v for k, v in changes.items() if k not in PROTECTED_FIELDS}
+        changes["updated_at"] = datetime.utcnow()
+        doc = await db["settings"].find_one_and_update(
+            {"_id": ADMIN_TYPE},
+            {"$set": {**changes, "type": ADMIN_TYPE}, "$inc": {"version": 1}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+        self._apply(doc)
+        return self.snapshot()
+
+    async def poll(self, get_db, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                if await self.refresh(get_db()):
+                    logger.info("Reloaded site settings", extra={"version": self.version})
+            except Exception:
+                logger.exception("Failed to refresh site settings")
+
+    def start(self, get_db, interval: float):
+        if interval > 0 and self._task is None:
+            self._task = asyncio.create_task(self.poll(get_db, interval))
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+site_settings = SiteSettings()
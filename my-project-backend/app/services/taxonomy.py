@@ -0,0 +1,218 @@
+"""
+Tag and category counts maintained with $inc deltas.
+
+Each write path passes the article before and after the change; the delta
+on (kind, name) counters is applied with one unordered bulk_write.
+`total` counts every article, `approved` only published ones.
+rebuild_taxonomy.py recomputes everything from the articles collection.
+
+The deltas are only meaningful on top of a full build, so a rebuild writes a
+version marker to the settings collection. Startup runs the first build
+under a short lease when the marker is missing, and readers aggregate from
+the articles collection until it exists.
+"""
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+import logging
+import os
+import socket
+from pymongo import ReplaceOne, ReturnDocument, UpdateOne
+from pymongo.errors import DuplicateKeyError
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+TAXONOMY_FIELDS = {"slug": 1, "tags": 1, "category": 1, "status": 1}
+KINDS = ("tag", "category")
+MARKER_TYPE = "taxonomy_counts"
+# Bump when the counter layout changes so startup rebuilds
+TAXONOMY_VERSION = 1
+LEASE_ID = "taxonomy_lease"
+LEASE_SECONDS = 600
+
+TAXONOMY = lambda db: db[settings.taxonomy_collection]
+
+# Set once this worker has seen the build marker
+_built = False
+
+
+def _entries(doc: Optional[dict]) -> List[Tuple[str, str]]:
+    if not doc:
+        return []
+    entries = {("tag", tag) for tag in (doc.get("tags") or []) if tag}
+    if doc.get("category"):
+        entries.add(("category", doc["category"]))
+    return list(entries)
+
+
+def compute_deltas(changes: Iterable[Tuple[Optional[dict], Optional[dict]]]) -> Dict[Tuple[str, str], List[int]]:
+    """Sum [total, approved] deltas over (before, after) article pairs"""
+    deltas: Dict[Tuple[str, str], List[int]] = defaultdict(lambda: [0, 0])
+    for before, after in changes:
+        for sign, doc in ((-1, before), (1, after)):
+            approved = 1 if doc and doc.get("status") == "approved" else 0
+            for key in _entries(doc):
+                deltas[key][0] += sign
+                deltas[key][1] += sign * approved
+    return {key: d for key, d in deltas.items() if d[0] or d[1]}
+
+
+async def record_changes(db, changes: Iterable[Tuple[Optional[dict], Optional[dict]]]):
+    """Apply count deltas for article changes; failures are logged, not raised"""
+    deltas = compute_deltas(changes)
+    if not deltas:
+        return
+    now = datetime.utcnow()
+    ops = [
+        UpdateOne(
+            {"_id": f"{kind}:{name}"},
+            {
+                "$inc": {"total": total, "approved": approved},
+                "$set": {"kind": kind, "name": name, "updatedAt": now},
+            },
+            upsert=True,
+        )
+        for (kind, name), (total, approved) in deltas.items()
+    ]
+    try:
+        await TAXONOMY(db).bulk_write(ops, ordered=False)
+    except Exception:
+        logger.exception("Failed to update taxonomy counts")
+
+
+async def record_change(db, before: Optional[dict], after: Optional[dict]):
+    """Pass the documents returned by the atomic write (find_one_and_update/delete),
+    so two concurrent writes to one article never see the same `before`"""
+    await record_changes(db, [(before, after)])
+
+
+async def record_guarded_changes(
+    db, changes: List[Tuple[Optional[dict], Optional[dict]]], expected: int, applied: int
+):
+    """record_changes for a multi-document write guarded on the documents read
+    before it. When fewer documents were written than read, a concurrent write
+    got there first and the deltas cannot be attributed, so rebuild instead."""
+    if applied == expected:
+        await record_changes(db, changes)
+        return
+    logger.warning("Concurrent article writes; rebuilding taxonomy counts",
+                   extra={"expected": expected, "applied": applied})
+    try:
+        await rebuild_taxonomy(db)
+    except Exception:
+        logger.exception("Failed to rebuild taxonomy counts")
+
+
+async def aggregate_counts(db) -> Tuple[List[dict], List[dict]]:
+    """(tags, categories) rows of {_id, total, approved} straight from the articles"""
+    approved = {"$sum": {"$cond": [{"$eq": ["$status", "approved"]}, 1, 0]}}
+    articles = db[settings.articles_collection]
+    tags = await articles.aggregate([
+        {"$project": {"tags": {"$setUnion": [{"$ifNull": ["$tags", []]}, []]}, "status": 1}},
+        {"$unwind": "$tags"},
+        {"$group": {"_id": "$tags", "total": {"$sum": 1}, "approved": approved}},
+    ]).to_list(length=None)
+    categories = await articles.aggregate([
+        {"$match": {"category": {"$nin": [None, ""]}}},
+        {"$group": {"_id": "$category", "total": {"$sum": 1}, "approved": approved}},
+    ]).to_list(length=None)
+    return tags, categories
+
+
+async def rebuild_taxonomy(db) -> dict:
+    """Recompute all counters from the articles collection"""
+    global _built
+    tags, categories = await aggregate_counts(db)
+
+    now = datetime.utcnow()
+    ops = []
+    for kind, rows in (("tag", tags), ("category", categories)):
+        for row in rows:
+            if not row["_id"]:
+                continue
+            ops.append(ReplaceOne(
+                {"_id": f"{kind}:{row['_id']}"},
+                {"kind": kind, "name": row["_id"], "total": row["total"], "approved": row["approved"], "updatedAt": now},
+                upsert=True,
+            ))
+    if ops:
+        await TAXONOMY(db).bulk_write(ops, ordered=False)
+    await TAXONOMY(db).delete_many({"updatedAt": {"$lt": now}})
+    await db["settings"].update_one(
+        {"_id": MARKER_TYPE},
+        {"$set": {"type": MARKER_TYPE, "version": TAXONOMY_VERSION, "built_at": now}},
+        upsert=True,
+    )
+    _built = True
+    return {"tags": len(tags), "categories": len(categories)}
+
+
+
+async def taxonomy_built(db) -> bool:
+    """Whether the counters have had a full build; cached once true"""
+    global _built
+    if not _built:
+        _built = await db["settings"].find_one(
+            {"_id": MARKER_TYPE, "version": TAXONOMY_VERSION}, {"_id": 1}
+        ) is not None
+    return _built
+
+
+async def ensure_taxonomy(db):
+    """Build the counters at startup when no current build exists.
+
+    Only the worker that takes the lease builds; the others keep serving from
+    the articles aggregation until the marker appears."""
+    try:
+        if await taxonomy_built(db):
+            return
+        owner = f"{socket.gethostname()}:{os.getpid()}"
+        now = datetime.utcnow()
+        try:
+            await db["settings"].find_one_and_update(
+                {"_id": LEASE_ID, "expiresAt": {"$lt": now}},
+                {"$set": {"type": LEASE_ID, "owner": owner, "expiresAt": now + timedelta(seconds=LEASE_SECONDS)}},
+                upsert=True,
+                return_document=ReturnDocument.AFTER,
+            )
+        except DuplicateKeyError:
+            # Another worker is building
+            return
+        try:
+            summary = await rebuild_taxonomy(db)
+            logger.info("Built taxonomy counts", extra=summary)
+        finally:
+            await db["settings"].delete_one({"_id": LEASE_ID, "owner": owner})
+    except Exception:
+        logger.exception("Failed to build taxonomy counts")
+
+
+async def _aggregated_docs(db):
+    """Counter-shaped documents computed from the articles (before the first build)"""
+    tags, categories = await aggregate_counts(db)
+    for kind, rows in (("tag", tags), ("category", categories)):
+        for row in rows:
+            if row["_id"]:
+                yield {"kind": kind, "name": row["_id"], "total": row["total"], "approved": row["approved"]}
+
+
+async def get_facets(db, approved_only: bool = True, limit: int = 50) -> dict:
+    """Tag cloud and category facets from one small read"""
+    field = "approved" if approved_only else "total"
+    facets = {kind: [] for kind in KINDS}
+    if await taxonomy_built(db):
+        docs = TAXONOMY(db).find({field: {"$gt": 0}}, {"kind": 1, "name": 1, "total": 1, "approved": 1})
+    else:
+        docs = _aggregated_docs(db)
+    async for doc in docs:
+        if doc.get(field, 0) <= 0:
+            continue
+        entry = {"name": doc["name"], "count": doc.get(field, 0)}
+        if not approved_only:
+            entry["approved"] = doc.get("approved", 0)
+        facets.setdefault(doc["kind"], []).append(entry)
+    return {
+        "tags": sorted(facets["tag"], key=lambda e: (-e["count"], e["name"]))[:limit],
+        "categories": sorted(facets["category"], key=lambda e: (-e["count"], e["name"])),
+    }
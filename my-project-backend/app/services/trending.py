@@ -0,0 +1,149 @@
+"""
+Trending articles: exponentially time-decayed view/like scores.
+
+Scores are kept in log space relative to a fixed epoch, so an event adds
+log(weight) + decay_rate * (t - EPOCH) via logaddexp and older scores never
+need rewriting: ranking by the stored value is ranking by the decayed score.
+Each worker buffers events in memory, merges them into
+articles.trendingScore on a timer, and reloads a bounded top-N from the
+(status, trendingScore) index, so no request ever sorts the full collection.
+"""
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+import asyncio
+import heapq
+import logging
+import math
+import time
+from pymongo import UpdateOne
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+EPOCH = datetime(2024, 1, 1).timestamp()
+
+
+def logaddexp(a: float, b: float) -> float:
+    hi, lo = (a, b) if a >= b else (b, a)
+    return hi + math.log1p(math.exp(lo - hi))
+
+
+def merge_expression(delta: float) -> dict:
+    """Aggregation-pipeline equivalent of logaddexp($trendingScore, delta)"""
+    return {
+        "$cond": [
+            # Missing/null sorts below every number
+            {"$gt": ["$trendingScore", None]},
+            {
+                "$let": {
+                    "vars": {
+                        "hi": {"$max": ["$trendingScore", delta]},
+                        "lo": {"$min": ["$trendingScore", delta]},
+                    },
+                    "in": {"$add": ["$$hi", {"$ln": {"$add": [1, {"$exp": {"$subtract": ["$$lo", "$$hi"]}}]}}]},
+                }
+            },
+            delta,
+        ]
+    }
+
+
+class TrendingTracker:
+    """Bounded in-memory top-N of decayed scores, persisted periodically"""
+
+    def __init__(self, half_life_hours: float, capacity: int):
+        self.decay_rate = math.log(2) / (half_life_hours * 3600)
+        self.capacity = capacity
+        self.scores: Dict[str, float] = {}
+        self.pending: Dict[str, float] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def log_weight(self, weight: float, at: Optional[float] = None) -> float:
+        at = time.time() if at is None else at
+        return math.log(weight) + self.decay_rate * (at - EPOCH)
+
+    def record(self, slug: str, weight: float, at: Optional[float] = None):
+        """Add an engagement event (O(1) amortized, no I/O)"""
+        if weight <= 0:
+            return
+        delta = self.log_weight(weight, at)
+        self.pending[slug] = logaddexp(self.pending[slug], delta) if slug in self.pending else delta
+        self.scores[slug] = logaddexp(self.scores[slug], delta) if slug in self.scores else delta
+        if len(self.scores) > self.capacity * 2:
+            self._prune()
+
+    def _prune(self):
+        keep = heapq.nlargest(self.capacity, self.scores.items(), key=lambda item: item[1])
+        self.scores = dict(keep)
+
+    def decayed(self, log_score: float, now: Optional[float] = None) -> float:
+        now = time.time() if now is None else now
+        return math.exp(log_score - self.decay_rate * (now - EPOCH))
+
+    def top(self, n: int) -> List[Tuple[str, float]]:
+        now = time.time()
+        best = heapq.nlargest(n, self.scores.items(), key=lambda item: item[1])
+        return [(slug, self.decayed(score, now)) for slug, score in best]
+
+    async def flush(self, db):
+        """Merge buffered deltas into Mongo, then reload the shared top-N"""
+        pending, self.pending = self.pending, {}
+        articles = db[settings.articles_collection]
+        if pending:
+            ops = [
+                UpdateOne({"slug": slug}, [{"$set": {"trendingScore": merge_expression(delta)}}])
+                for slug, delta in pending.items()
+            ]
+            try:
+                await articles.bulk_write(ops, ordered=False)
+            except Exception:
+                # Keep the events for the next attempt
+                for slug, delta in pending.items():
+                    self.pending[slug] = logaddexp(self.pending[slug], delta) if slug in self.pending else delta
+                raise
+
+        cursor = articles.find(
+            {"status": "approved", "trendingScore": {"$exists": True}},
+            {"slug": 1, "trendingScore": 1, "_id": 0},
+        ).sort("trendingScore", -1).limit(self.capacity)
+        scores = {doc["slug"]: doc["trendingScore"] async for doc in cursor}
+        # Events recorded while the flush was in flight are not persisted yet
+        for slug, delta in self.pending.items():
+            scores[slug] = logaddexp(scores[slug], delta) if slug in scores else delta
+        self.scores = scores
+
+    async def run(self, db, interval: float):
+        while True:
+            try:
+                await self.flush(db)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Failed to persist trending scores")
+            await asyncio.sleep(interval)
+
+    def start(self, db, interval: float):
+        if self._task is None:
+            self._task = asyncio.create_task(self.run(db, interval))
+
+    async def stop(self, db):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self.pending:
+            await self.flush(db)
+
+
+trending = TrendingTracker(settings.trending_half_life_hours, settings.trending_capacity)
+
+
+def record_view(slug: str):
+    trending.record(slug, settings.trending_view_weight)
+
+
+def record_like(slug: str):
+    trending.record(slug, settings.trending_like_weight)
@@ -0,0 +1,47 @@
+"""
+Micro-benchmark: CPU cost vs bytes saved for gzip/brotli levels, and cached variants
+Usage: python -m benchmarks.bench_compression [--content-words 3000] [--number 200]
+"""
+import argparse
+import timeit
+from app.core.compression import CompressionMiddleware, brotli
+from app.core.responses import dumps, etag_for
+from benchmarks.bench_json import make_article, serialize
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--content-words", type=int, default=3000)
+    parser.add_argument("--items", type=int, default=20)
+    parser.add_argument("--number", type=int, default=200)
+    args = parser.parse_args()
+
+    article = dumps(serialize(make_article(0, args.content_words)))
+    page = dumps({"items": [serialize(make_article(i, args.content_words // 10)) for i in range(args.items)]})
+
+    configs = [("gzip", level) for level in (1, 5, 9)]
+    if brotli is not None:
+        configs += [("br", quality) for quality in (1, 4, 11)]
+
+    for label, body in (("article", article), ("list page", page)):
+        print(f"{label}: {len(body)} bytes uncompressed")
+        for encoding, level in configs:
+            mw = CompressionMiddleware(None, gzip_level=level, brotli_quality=level, cache_size=0)
+            size = len(mw.compress(body, encoding))
+            seconds = min(timeit.repeat(lambda: mw.compress(body, encoding), number=args.number, repeat=3))
+            print(
+                f"  {encoding:<4} level {level:<2} {size:>8} bytes ({size / len(body):6.1%})"
+                f" {seconds / args.number * 1e6:>10.1f} us/op"
+            )
+
+        mw = CompressionMiddleware(None, cache_size=16)
+        etag = etag_for(body)
+        mw.compress_cached(body, "gzip", etag)
+        seconds = min(timeit.repeat(
+            lambda: mw.compress_cached(body, "gzip", etag_for(body)), number=args.number, repeat=3
+        ))
+        print(f"  cached gzip (etag hash + lookup)        {seconds / args.number * 1e6:>10.1f} us/op")
+
+
+if __name__ == "__main__":
+    main()
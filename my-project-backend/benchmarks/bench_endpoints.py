@@ -0,0 +1,213 @@
+"""
+Endpoint load benchmarks for the hot API paths
+Usage: python -m benchmarks.bench_endpoints [--backend memory|mongod] [--articles 2000]
+           [--uri mongodb://localhost:27017] [--db ias_blog_bench]
+           [--concurrency 1,8,32] [--duration 5] [--scenarios list_skip_0,get_article]
+           [--output results.json] [--compare baseline.json]
+
+The app runs in-process (httpx ASGITransport, lifespan included), so the
+numbers measure the application and the database, not a network stack.
+  memory  in-memory Motor stand-in (pip install mongomock-motor); good for
+          comparing Python-side costs between commits, not query plans
+  mongod  --uri (default mongodb://localhost:27017, never MONGODB_URI from
+          .env), database --db (default ias_blog_bench), dropped and
+          re-seeded on every run; names that do not look like a scratch
+          database (bench, scratch, test, ...) are refused
+Rate limiting is disabled for the run. Results are written as JSON together
+with the git revision, so two runs can be compared with --compare.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+# Must be set before app settings are loaded (the database is pinned in main())
+os.environ["RATE_LIMIT_ENABLED"] = "false"
+os.environ.setdefault("AUTHOR_STATS_SYNC", "off")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+import httpx
+from app.db.scratch import LOCAL_URI, pin_scratch_database
+from benchmarks.loadgen import run_load
+
+CATEGORIES = ["Power", "Electronics", "Robotics", "Energy", "Automation", "Career"]
+ADMIN = {"email": "bench-admin@example.com", "password": "bench-admin-password"}
+USER = {"email": "bench-user@example.com", "password": "bench-user-password"}
+
+
+def use_memory_backend():
+    """Swap the Motor client for mongomock-motor before the app starts"""
+    try:
+        from mongomock_motor import AsyncMongoMockClient
+    except ImportError:
+        sys.exit("The memory backend needs mongomock-motor: pip install mongomock-motor")
+    import app.db.mongo as mongo
+    import app.main as main
+
+    async def connect_memory():
+        mongo._client = AsyncMongoMockClient()
+        mongo._db = mongo._client[os.environ["DB_NAME"]]
+        mongo._read_db = mongo._db
+
+    mongo.connect_to_mongo = connect_memory
+    main.connect_to_mongo = connect_memory
+
+
+async def seed(db, n_articles: int, rng: random.Random) -> list:
+    from app.core.config import settings
+    from benchmarks.bench_json import make_article
+    from app.core.security import get_password_hash
+    from app.services.taxonomy import rebuild_taxonomy
+
+    for name in await db.list_collection_names():
+        await db.drop_collection(name)
+    users = []
+    for account, superuser in ((ADMIN, True), (USER, False)):
+        users.append({
+            "email": account["email"],
+            "full_name": account["email"].split("@")[0],
+            "hashed_password": get_password_hash(account["password"]),
+            "is_active": True,
+            "is_superuser": superuser,
+            "created_at": datetime.utcnow(),
+        })
+    result = await db[settings.users_collection].insert_many(users)
+    author_id = str(result.inserted_ids[1])
+
+    slugs, docs = [], []
+    for i in range(n_articles):
+        doc = make_article(i, rng.randint(300, 3000))
+        doc.update({
+            "category": rng.choice(CATEGORIES),
+            "status": "approved" if rng.random() < 0.8 else rng.choice(["pending", "rejected"]),
+            "isFeatured": rng.random() < 0.05,
+            "authorId": author_id,
+            "authorEmail": USER["email"],
+            "viewCount": rng.randint(0, 5000),
+            "likes": [],
+            "likesCount": 0,
+        })
+        docs.append(doc)
+        if doc["status"] == "approved":
+            slugs.append(doc["slug"])
+    for start in range(0, len(docs), 1000):
+        await db[settings.articles_collection].insert_many(docs[start:start + 1000])
+    await rebuild_taxonomy(db)
+    return slugs
+
+
+def scenarios(slugs: list, admin_token: str) -> dict:
+    """name -> make_request(i) for run_load"""
+    admin_headers = {"Authorization": f"Bearer {admin_token}"}
+
+    def cycle(i):
+        return slugs[i * 7919 % len(slugs)]
+
+    return {
+        "list_skip_0": lambda i: ("GET", "/articles/?skip=0&limit=20", {}),
+        "list_skip_100": lambda i: ("GET", "/articles/?skip=100&limit=20", {}),
+        "list_skip_1000": lambda i: ("GET", "/articles/?skip=1000&limit=20", {}),
+        "get_article": lambda i: ("GET", f"/articles/{cycle(i)}", {}),
+        "view": lambda i: ("POST", f"/articles/{cycle(i)}/view", {}),
+        "like_toggle": lambda i: ("POST", f"/articles/{cycle(i)}/like", {}),
+        "public_metrics": lambda i: ("GET", "/metrics", {}),
+        "dashboard_stats": lambda i: ("GET", "/admin/dashboard/stats", {"headers": admin_headers}),
+        "login": lambda i: ("POST", "/api/auth/login", {"json": USER}),
+    }
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True).stdout.strip()
+    except OSError:
+        return "unknown"
+
+
+def compare(results: list, baseline_path: str):
+    with open(baseline_path) as f:
+        baseline = {(r["scenario"], r["concurrency"]): r for r in json.load(f)["results"]}
+    print(f"\nvs {baseline_path}")
+    for r in results:
+        base = baseline.get((r["scenario"], r["concurrency"]))
+        if not base or not base["throughput_rps"]:
+            continue
+        rps = (r["throughput_rps"] / base["throughput_rps"] - 1) * 100
+        p99 = (r["p99_ms"] / base["p99_ms"] - 1) * 100 if base["p99_ms"] else 0.0
+        print(f"  {r['scenario']:<18} c={r['concurrency']:<4} throughput {rps:+6.1f}%   p99 {p99:+6.1f}%")
+
+
+async def run(args) -> dict:
+    import app.main as main
+    from app.core.security import create_access_token
+    from app.db.mongo import get_db
+
+    rng = random.Random(args.seed)
+    async with main.app.router.lifespan_context(main.app):
+        slugs = await seed(get_db(), args.articles, rng)
+        token = create_access_token({"sub": ADMIN["email"]})
+        available = scenarios(slugs, token)
+        names = args.scenarios.split(",") if args.scenarios else list(available)
+        transport = httpx.ASGITransport(app=main.app, client=("127.0.0.1", 5000))
+
+        results = []
+        for name, concurrency in itertools.product(names, args.concurrency):
+            summary = await run_load(
+                "http://bench", available[name], concurrency, args.duration,
+                warmup=args.warmup, transport=transport,
+            )
+            results.append({"scenario": name, "concurrency": concurrency, **summary})
+            print(
+                f"{name:<18} c={concurrency:<4} {summary['throughput_rps']:>9.1f} req/s  "
+                f"p50 {summary['p50_ms']:>8.2f}  p95 {summary['p95_ms']:>8.2f}  p99 {summary['p99_ms']:>8.2f} ms"
+                f"  errors {summary['errors']}"
+            )
+
+    return {
+        "meta": {
+            "revision": git_revision(),
+            "backend": args.backend,
+            "articles": args.articles,
+            "duration_s": args.duration,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "started_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--backend", choices=["memory", "mongod"], default="memory")
+    parser.add_argument("--articles", type=int, default=2000)
+    parser.add_argument("--uri", default=LOCAL_URI, help="mongod to seed (mongod backend)")
+    parser.add_argument("--db", default="ias_blog_bench", help="Scratch database, dropped on every run")
+    parser.add_argument("--concurrency", type=lambda v: [int(c) for c in v.split(",")], default=[1, 8, 32])
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--warmup", type=float, default=1.0)
+    parser.add_argument("--scenarios", help="Comma-separated subset (default: all)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Write results as JSON")
+    parser.add_argument("--compare", help="Baseline JSON from an earlier run")
+    args = parser.parse_args()
+
+    pin_scratch_database(args.uri, args.db)
+    if args.backend == "memory":
+        use_memory_backend()
+    report = asyncio.run(run(args))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.compare:
+        compare(report["results"], args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Micro-benchmark: default FastAPI JSON path vs FastJSONResponse / RawJSONResponse
+Usage: python -m benchmarks.bench_json [--content-words 3000] [--items 20] [--number 200]
+"""
+import argparse
+import timeit
+from datetime import datetime, timedelta
+from bson import ObjectId
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from app.core.responses import FastJSONResponse, RawJSONResponse, dumps
+from app.schemas.article import ArticleOut
+
+
+def make_article(i: int, content_words: int) -> dict:
+    now = datetime.utcnow()
+    return {
+        "_id": ObjectId(),
+        "slug": f"benchmark-article-{i}",
+        "title": f"Benchmark article {i}",
+        "author": "Bench Author",
+        "authorEmail": "bench@example.com",
+        "authorId": str(ObjectId()),
+        "category": "Technology",
+        "tags": ["power", "drives", "automation"],
+        "readingTime": f"{max(1, content_words // 200)} min read",
+        "featuredImage": None,
+        "shortDescription": "A short description of the benchmark article.",
+        "content": " ".join(["lorem"] * content_words),
+        "status": "approved",
+        "isFeatured": False,
+        "viewCount": 1234,
+        "likesCount": 56,
+        "likes": [f"10.0.0.{n % 255}" for n in range(56)],
+        "createdAt": now - timedelta(days=i),
+        "updatedAt": now,
+    }
+
+
+def serialize(doc: dict) -> dict:
+    doc = dict(doc)
+    doc["_id"] = str(doc["_id"])
+    return doc
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--content-words", type=int, default=3000)
+    parser.add_argument("--items", type=int, default=20)
+    parser.add_argument("--number", type=int, default=200)
+    args = parser.parse_args()
+
+    docs = [make_article(i, args.content_words) for i in range(args.items)]
+    page = {"items": [serialize(d) for d in docs], "count": len(docs)}
+    single = serialize(docs[0])
+    created = {**single, "id": single.pop("_id")}
+    cached = dumps(single)
+
+    cases = {
+        "list: jsonable_encoder + JSONResponse": lambda: JSONResponse(jsonable_encoder(page)),
+        "list: FastJSONResponse": lambda: FastJSONResponse(page),
+        "get: jsonable_encoder + JSONResponse": lambda: JSONResponse(jsonable_encoder(single)),
+        "get: FastJSONResponse": lambda: FastJSONResponse(single),
+        "get: RawJSONResponse (cached bytes)": lambda: RawJSONResponse(cached),
+        "create: ArticleOut + jsonable_encoder": lambda: JSONResponse(jsonable_encoder(ArticleOut(**created))),
+        "create: FastJSONResponse": lambda: FastJSONResponse(created, status_code=201),
+    }
+
+    print(f"{args.items} items, {args.content_words} words per article, {args.number} iterations")
+    for name, fn in cases.items():
+        seconds = min(timeit.repeat(fn, number=args.number, repeat=3))
+        print(f"{name:<42} {seconds / args.number * 1e6:>10.1f} us/op")
+
+
+if __name__ == "__main__":
+    main()
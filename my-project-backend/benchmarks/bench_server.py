@@ -0,0 +1,100 @@
+"""
+Load-test comparison: single-worker uvicorn default vs serve.py (multi-worker, uvloop/httptools)
+Usage: python -m benchmarks.bench_server [--path /health] [--workers 4] [--concurrency 64] [--duration 10]
+                                          [--uri mongodb://localhost:27017] [--db ias_blog_bench]
+
+Needs a reachable mongod: the app's startup connects, warms the pool, loads
+the site settings and builds the taxonomy counters before serving, even for
+/health. Each server is started in a subprocess on a free port against
+--uri/--db (a local mongod and a scratch database by default, never the
+MONGODB_URI/DB_NAME from .env) with INDEX_MODE=off so it skips index
+creation. Pick a path that exercises what you want to compare (e.g.
+/articles/ or /home after seeding the database with bench_endpoints or
+generate_dataset.py).
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+import httpx
+from app.db.scratch import LOCAL_URI, is_scratch_db
+from benchmarks.loadgen import run_load
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def wait_ready(url: str, timeout: float = 30.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if httpx.get(url, timeout=1.0).status_code < 500:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"Server at {url} did not become ready")
+
+
+def bench(name: str, command: list, path: str, concurrency: int, duration: float, uri: str, db_name: str) -> dict:
+    port = free_port()
+    env = {
+        **os.environ,
+        "MONGODB_URI": uri, "MONGO_URI": uri, "DB_NAME": db_name,
+        "INDEX_MODE": os.environ.get("INDEX_MODE", "off"),
+    }
+    proc = subprocess.Popen(
+        [arg.format(port=port) for arg in command], env=env,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        base_url = f"http://127.0.0.1:{port}"
+        wait_ready(base_url + path)
+        result = asyncio.run(run_load(base_url, lambda i: ("GET", path, {}), concurrency, duration))
+    finally:
+        proc.terminate()
+        proc.wait(timeout=60)
+    return {"server": name, "path": path, "concurrency": concurrency, **result}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--path", default="/health/")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--uri", default=LOCAL_URI, help="mongod the servers connect to")
+    parser.add_argument("--db", default="ias_blog_bench", help="Scratch database (name must contain bench, test, ...)")
+    parser.add_argument("--output", help="Write results as JSON")
+    args = parser.parse_args()
+    if not is_scratch_db(args.db):
+        # Startup writes settings and taxonomy counters into the database
+        sys.exit(f"Refusing to start servers against {args.db!r}; use a scratch database name (e.g. ias_blog_bench)")
+
+    servers = [
+        ("uvicorn default (1 worker)", [sys.executable, "-m", "uvicorn", "app.main:app", "--port", "{port}"]),
+        (f"serve.py ({args.workers} workers)", [sys.executable, "serve.py", "--port", "{port}", "--workers", str(args.workers)]),
+    ]
+    results = [
+        bench(name, cmd, args.path, args.concurrency, args.duration, args.uri, args.db)
+        for name, cmd in servers
+    ]
+    for r in results:
+        print(
+            f"{r['server']:<28} {r['throughput_rps']:>9.1f} req/s  p50 {r['p50_ms']:>7.2f} ms"
+            f"  p95 {r['p95_ms']:>7.2f} ms  p99 {r['p99_ms']:>7.2f} ms  errors {r['errors']}"
+        )
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
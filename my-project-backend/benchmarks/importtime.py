@@ -0,0 +1,83 @@
+"""
+Import-time budget check for worker cold start
+Usage: python -m benchmarks.importtime [--budget-ms 1500] [--runs 5] [--top 15]
+
+Runs `python -X importtime -c "import app.main"` in fresh interpreters and
+fails (exit 1) when the median cumulative import time exceeds the budget or
+when a lazily loaded integration is imported at startup.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+# Integrations that must stay behind app.core.lazy until first use
+LAZY_MODULES = (
+    "cloudinary",
+    "google.oauth2",
+    "google.auth.transport.requests",
+    "passlib",
+    "jose",
+    "numpy",
+)
+
+RSS_SNIPPET = (
+    "import resource, sys, app.main; "
+    "print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss); "
+    "print(','.join(m for m in sys.modules))"
+)
+
+
+def run_importtime() -> list:
+    """One fresh interpreter; returns [(self_us, cumulative_us, module)]"""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        capture_output=True, text=True, cwd=os.getcwd(), check=True,
+    )
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, module = line[len("import time:"):].split("|")
+        rows.append((int(self_us), int(cumulative_us), module.strip()))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--budget-ms", type=float, default=1500)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    totals = []
+    rows = []
+    for _ in range(args.runs):
+        rows = run_importtime()
+        totals.append(next(c for _, c, m in rows if m == "app.main") / 1000)
+    median_ms = statistics.median(totals)
+
+    proc = subprocess.run([sys.executable, "-c", RSS_SNIPPET], capture_output=True, text=True, check=True)
+    rss_line, modules_line = proc.stdout.strip().splitlines()
+    loaded = set(modules_line.split(","))
+    eager = [m for m in LAZY_MODULES if m in loaded]
+
+    print(f"import app.main: median {median_ms:.1f} ms over {args.runs} runs (budget {args.budget_ms:.0f} ms)")
+    print(f"max RSS after import: {int(rss_line) / 1024:.1f} MiB")
+    print(f"top {args.top} modules by self time:")
+    for self_us, cumulative_us, module in sorted(rows, reverse=True)[:args.top]:
+        print(f"  {self_us / 1000:8.1f} ms self {cumulative_us / 1000:8.1f} ms cumulative  {module}")
+
+    failed = False
+    if eager:
+        print(f"FAIL: imported at startup but should be lazy: {', '.join(eager)}")
+        failed = True
+    if median_ms > args.budget_ms:
+        print("FAIL: import time over budget")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
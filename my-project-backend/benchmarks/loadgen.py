@@ -0,0 +1,79 @@
+"""
+Minimal closed-loop HTTP load generator shared by the benchmark scripts.
+Requires httpx (pip install httpx).
+"""
+import asyncio
+import time
+from typing import Callable, Optional
+import httpx
+
+
+def percentile(sorted_values: list, pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(pct / 100 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def summarize(latencies: list, errors: int, elapsed: float) -> dict:
+    latencies = sorted(latencies)
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "max_ms": round((latencies[-1] if latencies else 0) * 1000, 2),
+    }
+
+
+async def run_load(
+    base_url: str,
+    make_request: Callable[[int], tuple],
+    concurrency: int,
+    duration: float,
+    warmup: float = 1.0,
+    transport: Optional[httpx.AsyncBaseTransport] = None,
+) -> dict:
+    """Run `concurrency` workers for `duration` seconds after a warm-up.
+
+    make_request(i) returns (method, path, kwargs) for the i-th request of a worker.
+    Non-2xx/3xx responses count as errors.
+    """
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30.0, transport=transport) as client:
+        latencies: list = []
+        errors = 0
+        recording = False
+        deadline = 0.0
+
+        async def worker():
+            nonlocal errors
+            i = 0
+            while time.perf_counter() < deadline:
+                method, path, kwargs = make_request(i)
+                i += 1
+                start = time.perf_counter()
+                try:
+                    response = await client.request(method, path, **kwargs)
+                    ok = response.status_code < 400
+                except httpx.HTTPError:
+                    ok = False
+                if not recording:
+                    continue
+                if ok:
+                    latencies.append(time.perf_counter() - start)
+                else:
+                    errors += 1
+
+        if warmup > 0:
+            deadline = time.perf_counter() + warmup
+            await asyncio.gather(*[worker() for _ in range(concurrency)])
+
+        recording = True
+        started = time.perf_counter()
+        deadline = started + duration
+        await asyncio.gather(*[worker() for _ in range(concurrency)])
+        return summarize(latencies, errors, time.perf_counter() - started)
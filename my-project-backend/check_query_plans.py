@@ -0,0 +1,311 @@
+"""
+Query-plan regression check for the queries the API routes issue
+Usage: python check_query_plans.py [--uri mongodb://localhost:27017] [--db ias_blog_plans]
+           [--articles 20000] [--users 2000] [--ratio 4] [--verbose]
+
+Seeds the scratch database --db (dropped first) on the mongod at --uri
+(default a local mongod; MONGODB_URI/DB_NAME from .env are never used, and
+names that do not look disposable are refused) with generate_dataset.py's
+synthetic data and the declared
+indexes, then calls the article, comment, admin, metrics and engagement
+routes in-process. Every find/aggregate/count/distinct/findAndModify/update/
+delete they send (background fan-out included) is captured by a command
+listener, deduplicated by shape and re-run as explain("executionStats").
+
+A shape fails when its winning plan uses no index or examines more than
+--ratio documents per document returned (skipped documents count as
+returned). Deliberate scans are listed in KNOWN_SCANS with the reason.
+Exits 1 on any failure or failing route, so a new unindexed query fails CI
+instead of production. Needs a real mongod (explain is not emulated) and
+httpx from requirements-dev.txt.
+"""
+import argparse
+import asyncio
+import os
+import secrets
+import sys
+from datetime import datetime
+from types import SimpleNamespace
+
+from app.db.scratch import LOCAL_URI, pin_scratch_database
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Assert that route queries use indexes")
+    parser.add_argument("--uri", default=LOCAL_URI, help="mongod to seed and explain against")
+    parser.add_argument("--db", default="ias_blog_plans", help="Scratch database, dropped on every run")
+    parser.add_argument("--articles", type=int, default=20000)
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--ratio", type=float, default=4.0, help="Max documents examined per document returned")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--verbose", action="store_true", help="Print every shape with its plan")
+    return parser.parse_args(argv)
+
+
+# Must be set before app settings are loaded
+if __name__ == "__main__":
+    ARGS = parse_args()
+    pin_scratch_database(ARGS.uri, ARGS.db)
+os.environ["RATE_LIMIT_ENABLED"] = "false"
+os.environ["SLOW_QUERY_MS"] = "0"
+os.environ["INDEX_MODE"] = "off"
+os.environ.setdefault("AUTHOR_STATS_SYNC", "off")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+import httpx
+import orjson
+from bson import ObjectId
+from pymongo import monitoring
+from app.core.config import settings
+from app.core.log import request_scope_var
+from app.db.slow_queries import EXPLAIN_STRIP, SHAPED_COMMANDS, command_parts, shape, shape_key, summarize_explain
+
+INDEX_STAGES = ("IXSCAN", "COUNT_SCAN", "DISTINCT_SCAN", "IDHACK", "EXPRESS")
+# Documents a plan may examine regardless of --ratio (tiny collections, empty results)
+SLACK_DOCS = 20
+
+# (collection, filter shape) -> why a scan is acceptable
+KNOWN_SCANS = {
+    (settings.users_collection, "{}"): "whole-collection count (dashboard, database stats, list totals)",
+    (settings.articles_collection, "{}"): "whole-collection count (dashboard, database stats, list totals)",
+    (settings.comments_collection, "{}"): "whole-collection count (dashboard, database stats, list totals)",
+    (settings.users_collection, '{"is_active":"?"}'): "dashboard count over the small users collection",
+    (settings.users_collection, '{"is_superuser":"?"}'): "dashboard count over the small users collection",
+    (settings.users_collection, '{"$or":[{"email":{"$options":"?","$regex":"?"}},{"full_name":{"$options":"?","$regex":"?"}}]}'):
+        "admin user search: unanchored case-insensitive $regex cannot use an index",
+    (settings.articles_collection, '{"$or":[{"title":{"$options":"?","$regex":"?"}},{"author":{"$options":"?","$regex":"?"}}]}'):
+        "admin article search: unanchored case-insensitive $regex cannot use an index",
+    (settings.taxonomy_collection, '{"total":{"$gt":"?"}}'): "one document per tag/category",
+    (settings.taxonomy_collection, '{"approved":{"$gt":"?"}}'): "one document per tag/category",
+    (settings.feeds_collection, "{}"): "one document per sitemap shard/feed file",
+}
+
+
+class CommandCapture(monitoring.CommandListener):
+    """First command of every shape sent while active, with the route that sent it"""
+
+    def __init__(self):
+        self.active = False
+        self.commands = {}
+
+    def started(self, event):
+        if not self.active or event.command_name not in SHAPED_COMMANDS:
+            return
+        collection = event.command.get(event.command_name)
+        key, described = shape_key(event.command_name, collection, event.command)
+        if key in self.commands:
+            return
+        scope = request_scope_var.get()
+        route = f"{scope['method']} {getattr(scope.get('route'), 'path', scope['path'])}" if scope else "-"
+        self.commands[key] = SimpleNamespace(
+            name=event.command_name,
+            database=event.database_name,
+            collection=collection,
+            command=dict(event.command),
+            described=described,
+            route=route,
+        )
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+async def seed(db, args) -> SimpleNamespace:
+    from generate_dataset import build_batch, build_users, paragraph_pool, user_id
+    from app.core.security import get_password_hash
+    from app.db.indexes import apply_indexes
+    from app.services.taxonomy import rebuild_taxonomy
+
+    for name in await db.list_collection_names():
+        await db.drop_collection(name)
+    gen = SimpleNamespace(
+        seed=args.seed, users=args.users, articles=args.articles, batch_size=1000, days=730,
+        comments_per_article=2.0, until=datetime.utcnow().replace(microsecond=0),
+    )
+    # Routes are called with minted tokens, so nobody needs a usable password
+    users = build_users(gen, get_password_hash(secrets.token_urlsafe(16)), gen.until)
+    # user 0 acts as the admin; user 1 is a prolific regular author
+    users[0]["is_superuser"] = True
+    users[0]["is_active"] = users[1]["is_active"] = True
+    await db[settings.users_collection].insert_many(users)
+    pool = paragraph_pool(gen.seed)
+    for batch in range((gen.articles + gen.batch_size - 1) // gen.batch_size):
+        articles, comments = build_batch(gen, batch, pool, gen.until)
+        await db[settings.articles_collection].insert_many(articles, ordered=False)
+        if comments:
+            await db[settings.comments_collection].insert_many(comments, ordered=False)
+    await apply_indexes(db)
+    await rebuild_taxonomy(db)
+
+    articles = db[settings.articles_collection]
+    commented = await db[settings.comments_collection].find_one({})
+    return SimpleNamespace(
+        admin=users[0],
+        user=users[1],
+        victim=users[-1],
+        article=await articles.find_one({"_id": ObjectId(commented["article_id"])}),
+        pending=[d["slug"] async for d in articles.find({"status": "pending"}, {"slug": 1}).limit(4)],
+        approved=[d["slug"] async for d in articles.find({"status": "approved"}, {"slug": 1}).limit(4)],
+        comment_ids=[str(d["_id"]) async for d in db[settings.comments_collection].find({}, {"_id": 1}).limit(3)],
+        victim_id=str(user_id(gen, len(users) - 1)),
+    )
+
+
+async def exercise(client: httpx.AsyncClient, fx: SimpleNamespace) -> list:
+    """Call every route under test once; returns the failed calls"""
+    from app.core.security import create_access_token
+
+    admin = {"Authorization": f"Bearer {create_access_token({'sub': fx.admin['email']})}"}
+    user = {"Authorization": f"Bearer {create_access_token({'sub': fx.user['email']})}"}
+    slug, article_id = fx.article["slug"], str(fx.article["_id"])
+    failures = []
+
+    async def call(method, path, headers=None, **kwargs):
+        response = await client.request(method, path, headers=headers, **kwargs)
+        if response.status_code >= 400:
+            failures.append(f"{method} {path} -> {response.status_code} {response.text[:200]}")
+        return response
+
+    # articles
+    await call("GET", "/articles/?limit=20")
+    await call("GET", "/articles/?skip=100&limit=20")
+    await call("GET", "/articles/?category=Robotics")
+    await call("GET", "/articles/?featured=true")
+    await call("GET", "/articles/?status=pending")
+    await call("GET", "/articles/trending")
+    await call("GET", f"/articles/{slug}")
+    await call("GET", f"/articles/{slug}/related")
+    created = await call("POST", "/articles/", user, json={
+        "title": "Query plan check", "category": "Research", "tags": ["testing"],
+        "content": "<p>Checking query plans.</p>",
+    })
+    new_slug = created.json().get("slug", "missing") if created.status_code == 201 else "missing"
+    await call("GET", "/articles/my/articles", user)
+    await call("PUT", f"/articles/{new_slug}", user, json={"shortDescription": "Updated"})
+    await call("PATCH", f"/articles/{fx.pending[0]}/approve", admin)
+    await call("PATCH", f"/articles/{fx.pending[1]}/reject", admin)
+    await call("DELETE", f"/articles/{new_slug}", user)
+
+    # engagement
+    await call("POST", f"/articles/{slug}/view")
+    await call("POST", f"/articles/{slug}/like")
+    await call("GET", f"/articles/{slug}/stats")
+    await call("GET", f"/articles/stats?slugs={slug},{fx.approved[0]},missing-slug")
+
+    # comments
+    await call("GET", f"/comments/article/{article_id}")
+    await call("GET", "/comments/my/comments", user)
+    comment = await call("POST", "/comments/", user, json={"content": "Plan check", "article_id": article_id})
+    comment_id = comment.json().get("id", "0" * 24) if comment.status_code == 201 else "0" * 24
+    await call("PUT", f"/comments/{comment_id}", user, json={"content": "Plan check, edited"})
+    await call("DELETE", f"/comments/{comment_id}", user)
+
+    # metrics
+    await call("GET", "/metrics")
+
+    # admin
+    await call("GET", "/admin/dashboard/stats", admin)
+    await call("GET", "/admin/database/stats", admin)
+    await call("GET", "/admin/taxonomy", admin)
+    await call("GET", "/admin/settings", admin)
+    await call("GET", "/admin/users?skip=20", admin)
+    await call("GET", "/admin/users?search=user1", admin)
+    await call("PUT", f"/admin/users/{fx.victim_id}?is_active=true", admin)
+    await call("GET", "/admin/articles", admin)
+    await call("GET", "/admin/articles?status=pending", admin)
+    await call("GET", "/admin/articles?status=approved&category=Power", admin)
+    await call("GET", "/admin/articles?search=smart", admin)
+    await call("PUT", f"/admin/articles/{fx.pending[2]}/approve", admin)
+    await call("PUT", f"/admin/articles/{fx.approved[0]}/reject", admin)
+    await call("PUT", f"/admin/articles/{fx.approved[1]}/feature?is_featured=true", admin)
+    await call("PUT", "/admin/articles/bulk/approve", admin, json={"slugs": [fx.pending[3]]})
+    await call("PUT", "/admin/articles/bulk/feature", admin, json={"slugs": [fx.approved[2]], "is_featured": True})
+    await call("PUT", "/admin/articles/bulk/reject", admin, json={"slugs": [fx.approved[3]], "reason": "check"})
+    await call("GET", "/admin/comments", admin)
+    await call("GET", f"/admin/comments?article_id={article_id}", admin)
+    await call("POST", "/admin/comments/bulk/delete", admin, json={"ids": fx.comment_ids[:2]})
+    await call("DELETE", f"/admin/comments/{fx.comment_ids[2]}", admin)
+    await call("POST", "/admin/articles/bulk/delete", admin, json={"slugs": [fx.pending[0]]})
+    await call("DELETE", f"/admin/users/{fx.victim_id}", admin)
+    return failures
+
+
+def documents_skipped(name: str, command: dict) -> int:
+    if name == "find":
+        return command.get("skip") or 0
+    if name == "aggregate":
+        return sum(stage.get("$skip", 0) for stage in command.get("pipeline") or [])
+    return 0
+
+
+def evaluate(captured, plan: dict, ratio: float):
+    """Failure message, or None when the plan is acceptable"""
+    stages = plan["stages"]
+    if plan["collscan"] or not any(s.startswith(INDEX_STAGES) for s in stages):
+        return f"no index used ({' > '.join(stages) or 'unknown plan'})"
+    allowed = ratio * (plan["nReturned"] + documents_skipped(captured.name, captured.command)) + SLACK_DOCS
+    if plan["totalDocsExamined"] > allowed:
+        return f"examined {plan['totalDocsExamined']} documents for {plan['nReturned']} returned ({' > '.join(stages)})"
+    return None
+
+
+async def explain(db, captured) -> dict:
+    replay = {k: v for k, v in captured.command.items() if k not in EXPLAIN_STRIP}
+    result = await db.client[captured.database].command({"explain": replay, "verbosity": "executionStats"})
+    return summarize_explain(result)
+
+
+async def run(args) -> int:
+    capture = CommandCapture()
+    # Listeners apply to clients created afterwards, i.e. the app's client in lifespan
+    monitoring.register(capture)
+    import app.main as main
+    from app.db.mongo import get_db
+
+    async with main.app.router.lifespan_context(main.app):
+        db = get_db()
+        await db.command("ping")
+        print(f"Seeding {args.articles} articles into {settings.db_name} ...")
+        fx = await seed(db, args)
+        transport = httpx.ASGITransport(app=main.app, client=("127.0.0.1", 5000))
+        async with httpx.AsyncClient(transport=transport, base_url="http://plans") as client:
+            capture.active = True
+            route_failures = await exercise(client, fx)
+            capture.active = False
+
+        failures, known = [], 0
+        for captured in capture.commands.values():
+            filter_shape = orjson.dumps(
+                shape(command_parts(captured.name, captured.command)[0]), option=orjson.OPT_SORT_KEYS
+            ).decode()
+            try:
+                plan = await explain(db, captured)
+            except Exception as e:
+                failures.append((captured, f"explain failed: {e}"))
+                continue
+            problem = evaluate(captured, plan, args.ratio)
+            reason = KNOWN_SCANS.get((captured.collection, filter_shape))
+            if problem and reason:
+                known += 1
+                if args.verbose:
+                    print(f"known   {captured.route:<40} {captured.described}\n        {problem}; {reason}")
+            elif problem:
+                failures.append((captured, problem))
+            elif args.verbose:
+                print(f"ok      {captured.route:<40} {captured.described}\n        {' > '.join(plan['stages'])}, "
+                      f"{plan['totalDocsExamined']} examined / {plan['nReturned']} returned")
+
+    for call in route_failures:
+        print(f"ROUTE   {call}")
+    for captured, problem in failures:
+        print(f"FAIL    {captured.route:<40} {captured.described}\n        {problem}")
+    print(f"{len(capture.commands)} query shapes: {len(capture.commands) - len(failures) - known} indexed, "
+          f"{known} known scans, {len(failures)} failing; {len(route_failures)} failing routes")
+    return 1 if failures or route_failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(run(ARGS)))
@@ -0,0 +1,288 @@
+"""
+Synthetic dataset generator for scale testing
+Usage: python generate_dataset.py --uri mongodb://localhost:27017 --db ias_blog_scale
+           --articles 1000000 [--users 5000] [--comments-per-article 2] [--processes 4]
+           [--concurrency 4] [--batch-size 1000] [--seed 42] [--until 2026-01-01]
+           [--drop] [--derived] [--admin]
+
+Users, articles (lognormal content lengths, tags, categories, statuses,
+createdAt spread over --days, views and likes) and comments are bulk-inserted
+with unordered insert_many. Batches are spread over --processes worker
+processes, each keeping --concurrency inserts in flight.
+
+Every batch draws from its own RNG seeded by (seed, batch number) and every
+document gets a deterministic ObjectId, so the dataset is identical whatever
+the parallelism and comments can reference articles without a lookup.
+All generated users share --password, hashed once (bcrypt per user would
+dominate the run time), and none of them is an admin unless --admin is
+given; user0 then gets a random password that is printed once. With --drop
+the collections are loaded without secondary indexes and indexed at the
+end, which is much faster.
+
+The target is never taken from .env: --uri and --db are required, and
+--drop is refused unless the database name looks disposable (scale, bench,
+scratch, test, ...).
+"""
+import argparse
+import asyncio
+import math
+import os
+import random
+import secrets
+import struct
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timedelta
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorClient
+from app.core.config import settings
+from app.db.scratch import require_scratch_db
+
+CATEGORIES = ["Power", "Electronics", "Robotics", "Energy", "Automation", "Career", "Research", "Events"]
+# Skewed so a few categories dominate, like real blogs
+CATEGORY_WEIGHTS = [30, 20, 15, 12, 10, 6, 4, 3]
+TAGS = [
+    "power-electronics", "motor-drives", "plc", "scada", "renewables", "solar", "wind", "battery",
+    "smart-grid", "iot", "embedded", "control-systems", "robotics", "ai", "machine-learning",
+    "industry-4-0", "safety", "standards", "internship", "career", "workshop", "competition",
+    "hvdc", "ev-charging", "microgrid", "sensors", "pcb-design", "simulation", "matlab", "python",
+]
+WORDS = (
+    "system power control drive motor voltage current design energy grid signal sensor data model "
+    "network device circuit converter inverter battery solar module process industry automation "
+    "student project research team event workshop engineer analysis performance efficiency load "
+    "frequency phase protection relay cable transformer station measurement testing simulation "
+    "hardware software firmware interface protocol standard safety quality maintenance operation "
+    "the a of and to in for with on by from is are was this that we our new using based results"
+).split()
+ADJECTIVES = ["Practical", "Modern", "Efficient", "Reliable", "Smart", "Scalable", "Robust", "Hands-on"]
+NOUNS = ["Guide", "Overview", "Case Study", "Lessons", "Introduction", "Deep Dive", "Notes", "Review"]
+
+USER_KIND, ARTICLE_KIND, COMMENT_KIND = 1, 2, 3
+MAX_COMMENTS_PER_ARTICLE = 255
+
+
+def object_id(kind: int, index: int, when: datetime) -> ObjectId:
+    """Deterministic, unique ObjectId whose timestamp matches the document's creation time"""
+    return ObjectId(struct.pack(">IQ", int(when.timestamp()), (kind << 56) | index))
+
+
+def user_id(args, index: int) -> ObjectId:
+    # Articles reference users by id alone, so user ids use the dataset start as timestamp
+    return object_id(USER_KIND, index, args.until - timedelta(days=args.days))
+
+
+def paragraph_pool(seed: int, size: int = 2000) -> list:
+    rng = random.Random(seed)
+    pool = []
+    for _ in range(size):
+        sentences = []
+        for _ in range(rng.randint(3, 7)):
+            words = rng.choices(WORDS, k=rng.randint(8, 18))
+            sentences.append(" ".join(words).capitalize() + ".")
+        pool.append("<p>" + " ".join(sentences) + "</p>")
+    return pool
+
+
+def zipf_index(rng: random.Random, n: int) -> int:
+    """Heavy-tailed pick in [0, n): a few prolific authors, a long tail of occasional ones"""
+    return min(n - 1, int(n ** rng.random()) - 1)
+
+
+def reading_time(words: int) -> str:
+    return f"{max(1, round(words / 200))} min read"
+
+
+def build_users(args, password_hash: str, until: datetime) -> list:
+    rng = random.Random(f"{args.seed}:users")
+    users = []
+    for i in range(args.users):
+        created = until - timedelta(seconds=rng.uniform(0, args.days * 86400))
+        users.append({
+            "_id": user_id(args, i),
+            "email": f"user{i}@example.com",
+            "full_name": f"Synthetic User {i}",
+            "hashed_password": password_hash,
+            "bio": "",
+            "is_active": rng.random() > 0.02,
+            "is_superuser": False,
+            "created_at": created,
+        })
+    return users
+
+
+def build_batch(args, batch: int, pool: list, until: datetime) -> tuple:
+    """Articles and their comments for one batch"""
+    rng = random.Random(f"{args.seed}:{batch}")
+    start = batch * args.batch_size
+    stop = min(args.articles, start + args.batch_size)
+    articles, comments = [], []
+    for i in range(start, stop):
+        created = until - timedelta(seconds=rng.uniform(0, args.days * 86400))
+        author = zipf_index(rng, args.users)
+        roll = rng.random()
+        status = "approved" if roll < 0.8 else "pending" if roll < 0.92 else "rejected"
+        paragraphs = max(2, int(rng.lognormvariate(math.log(10), 0.6)))
+        content = "\n".join(rng.choices(pool, k=paragraphs))
+        words = content.count(" ") + 1
+        views = int(rng.lognormvariate(math.log(200), 1.2)) if status == "approved" else 0
+        likes_count = int(views * rng.uniform(0.0, 0.05))
+        title_topic = " ".join(rng.choices(WORDS[:60], k=3)).title()
+        article_id = object_id(ARTICLE_KIND, i, created)
+        articles.append({
+            "_id": article_id,
+            "slug": f"{title_topic.lower().replace(' ', '-')}-{i}",
+            "title": f"{rng.choice(ADJECTIVES)} {title_topic} {rng.choice(NOUNS)}",
+            "author": f"Synthetic User {author}",
+            "authorEmail": f"user{author}@example.com",
+            "authorId": str(user_id(args, author)),
+            "category": rng.choices(CATEGORIES, CATEGORY_WEIGHTS)[0],
+            "tags": rng.sample(TAGS, rng.randint(1, 5)),
+            "readingTime": reading_time(words),
+            "featuredImage": None,
+            "shortDescription": " ".join(rng.choices(WORDS, k=rng.randint(15, 30))).capitalize() + ".",
+            "content": content,
+            "status": status,
+            "isFeatured": status == "approved" and rng.random() < 0.02,
+            "viewCount": views,
+            "likesCount": likes_count,
+            "likes": [f"10.{rng.randrange(256)}.{rng.randrange(256)}.{rng.randrange(256)}" for _ in range(likes_count)],
+            "createdAt": created,
+            "updatedAt": created + timedelta(hours=rng.uniform(0, 72)),
+        })
+        if status != "approved" or args.comments_per_article <= 0:
+            continue
+        n_comments = min(MAX_COMMENTS_PER_ARTICLE, int(rng.expovariate(1 / args.comments_per_article)))
+        for j in range(n_comments):
+            commenter = zipf_index(rng, args.users)
+            commented = min(until, created + timedelta(seconds=rng.expovariate(1 / 86400)))
+            comments.append({
+                "_id": object_id(COMMENT_KIND, i * (MAX_COMMENTS_PER_ARTICLE + 1) + j, commented),
+                "content": " ".join(rng.choices(WORDS, k=rng.randint(5, 40))).capitalize() + ".",
+                "article_id": str(article_id),
+                "author": f"Synthetic User {commenter}",
+                "author_email": f"user{commenter}@example.com",
+                "author_id": str(user_id(args, commenter)),
+                "created_at": commented,
+                "updated_at": commented,
+            })
+    return articles, comments
+
+
+async def insert_batches(args, batches: list, until: datetime) -> tuple:
+    client = AsyncIOMotorClient(args.uri, maxPoolSize=args.concurrency + 2)
+    db = client[args.db]
+    pool = paragraph_pool(args.seed)
+    semaphore = asyncio.Semaphore(args.concurrency)
+    totals = [0, 0]
+
+    async def run(batch: int):
+        articles, comments = build_batch(args, batch, pool, until)
+        async with semaphore:
+            await db[settings.articles_collection].insert_many(articles, ordered=False)
+            if comments:
+                await db[settings.comments_collection].insert_many(comments, ordered=False)
+        totals[0] += len(articles)
+        totals[1] += len(comments)
+
+    try:
+        await asyncio.gather(*[run(b) for b in batches])
+    finally:
+        client.close()
+    return tuple(totals)
+
+
+def worker(args, batches: list, until: datetime) -> tuple:
+    return asyncio.run(insert_batches(args, batches, until))
+
+
+async def prepare(args, until: datetime):
+    from app.core.security import get_password_hash
+
+    client = AsyncIOMotorClient(args.uri)
+    db = client[args.db]
+    try:
+        if args.drop:
+            for name in (settings.articles_collection, settings.comments_collection, settings.users_collection):
+                await db.drop_collection(name)
+        elif await db[settings.articles_collection].estimated_document_count():
+            sys.exit(f"Database {args.db} already has articles; pass --drop to replace them")
+        users = build_users(args, get_password_hash(args.password), until)
+        if args.admin:
+            password = secrets.token_urlsafe(16)
+            users[0].update(is_superuser=True, is_active=True, hashed_password=get_password_hash(password))
+            print(f"Admin: {users[0]['email']} / {password}")
+        for start in range(0, len(users), args.batch_size):
+            await db[settings.users_collection].insert_many(users[start:start + args.batch_size], ordered=False)
+    finally:
+        client.close()
+
+
+async def finish(args) -> dict:
+    from app.db.indexes import apply_indexes
+    from app.services.taxonomy import rebuild_taxonomy
+    from app.services.author_stats import rebuild_author_stats
+
+    client = AsyncIOMotorClient(args.uri)
+    db = client[args.db]
+    try:
+        created = await apply_indexes(db)
+        if args.derived:
+            await rebuild_taxonomy(db)
+            await rebuild_author_stats(db)
+    finally:
+        client.close()
+    return created
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk-generate a synthetic dataset")
+    parser.add_argument("--uri", required=True, help="Target mongod, e.g. mongodb://localhost:27017")
+    parser.add_argument("--db", required=True, help="Target database, e.g. ias_blog_scale")
+    parser.add_argument("--articles", type=int, default=10000)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--comments-per-article", type=float, default=2.0, help="Mean for approved articles")
+    parser.add_argument("--days", type=int, default=730, help="Spread createdAt over this many days")
+    parser.add_argument("--until", type=lambda v: datetime.fromisoformat(v),
+                        default=datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0))
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--concurrency", type=int, default=4, help="In-flight insert_many per process")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--password", default="Password@123", help="Password of every generated user")
+    parser.add_argument("--drop", action="store_true", help="Drop users/articles/comments first")
+    parser.add_argument("--derived", action="store_true", help="Rebuild taxonomy and author stats afterwards")
+    parser.add_argument("--admin", action="store_true", help="Make user0 an admin with a random, printed password")
+    args = parser.parse_args()
+    args.users = max(1, args.users)
+    if args.drop:
+        require_scratch_db(args.db)
+
+    started = time.perf_counter()
+    asyncio.run(prepare(args, args.until))
+    print(f"Inserted {args.users} users")
+
+    n_batches = math.ceil(args.articles / args.batch_size)
+    # Small chunks keep all processes busy until the end and give progress output
+    chunk = max(1, min(20, n_batches // (args.processes * 4) or 1))
+    chunks = [list(range(b, min(n_batches, b + chunk))) for b in range(0, n_batches, chunk)]
+    articles = comments = 0
+    with ProcessPoolExecutor(max_workers=args.processes) as executor:
+        futures = [executor.submit(worker, args, c, args.until) for c in chunks]
+        for future in as_completed(futures):
+            a, c = future.result()
+            articles += a
+            comments += c
+            elapsed = time.perf_counter() - started
+            print(f"\r{articles}/{args.articles} articles, {comments} comments, {articles / elapsed:,.0f} articles/s",
+                  end="", flush=True)
+    print()
+
+    created = asyncio.run(finish(args))
+    print(f"Indexes created: {created}")
+    print(f"Done in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+Script to bulk import articles from an NDJSON file
+Usage: python import_articles.py posts.ndjson [--author-email admin@iasuuwu.com] [--batch-size 500]
+"""
+import argparse
+import asyncio
+import sys
+from motor.motor_asyncio import AsyncIOMotorClient
+from app.core.config import settings
+from app.services.article_import import import_articles, DEFAULT_BATCH_SIZE
+
+
+async def run_import(path: str, author_email: str | None, batch_size: int) -> int:
+    client = AsyncIOMotorClient(settings.mongo_uri)
+    db = client[settings.db_name]
+
+    default_author = {}
+    if author_email:
+        user = await db[settings.users_collection].find_one({"email": author_email})
+        if not user:
+            print(f"No user found with email: {author_email}")
+            client.close()
+            return 1
+        default_author = {
+            "id": str(user["_id"]),
+            "email": user["email"],
+            "name": user.get("full_name"),
+        }
+
+    if path == "-":
+        lines = sys.stdin
+        summary = await import_articles(db[settings.articles_collection], lines, default_author, batch_size)
+    else:
+        with open(path, encoding="utf-8") as f:
+            summary = await import_articles(db[settings.articles_collection], f, default_author, batch_size)
+
+    for result in summary["results"]:
+        if not result["ok"]:
+            print(f"Line {result['line']}: {result['error']}")
+    print(f"Imported {summary['inserted']} articles, {summary['failed']} failed")
+
+    client.close()
+    return 0 if summary["failed"] == 0 else 2
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk import articles from NDJSON")
+    parser.add_argument("path", help="NDJSON file, or - for stdin")
+    parser.add_argument("--author-email", help="Existing user to attribute articles without author fields")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    args = parser.parse_args()
+    sys.exit(asyncio.run(run_import(args.path, args.author_email, args.batch_size)))
@@ -0,0 +1,49 @@
+"""
+Script to apply or check the declared MongoDB indexes (app/db/indexes.py)
+Usage: python manage_indexes.py apply | check [--no-usage]
+`check` exits non-zero when indexes are missing or conflict with the registry
+"""
+import argparse
+import asyncio
+import sys
+from motor.motor_asyncio import AsyncIOMotorClient
+from app.core.config import settings
+from app.db.indexes import apply_indexes, check_indexes
+
+
+async def run(command: str, with_usage: bool) -> int:
+    client = AsyncIOMotorClient(settings.mongo_uri)
+    db = client[settings.db_name]
+
+    if command == "apply":
+        created = await apply_indexes(db)
+        for collection, names in created.items():
+            print(f"{collection}: created {', '.join(names)}")
+        if not created:
+            print("All declared indexes already exist")
+
+    reports = await check_indexes(db, with_usage=with_usage)
+    problems = 0
+    for collection, report in reports.items():
+        for spec in report["missing"]:
+            print(f"{collection}: MISSING {spec.name}")
+        for conflict in report["conflicts"]:
+            print(f"{collection}: CONFLICT {conflict['name']} expected {conflict['expected']} actual {conflict['actual']}")
+        for name in report["unexpected"]:
+            print(f"{collection}: not declared {name}")
+        for stat in report["unused"]:
+            if "error" in stat:
+                print(f"{collection}: $indexStats unavailable ({stat['error']})")
+            else:
+                print(f"{collection}: unused since {stat['since']} {stat['name']}")
+        problems += len(report["missing"]) + len(report["conflicts"])
+
+    client.close()
+    return 1 if problems else 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Apply or check declared MongoDB indexes")
+    parser.add_argument("command", choices=["apply", "check"])
+    parser.add_argument("--no-usage", action="store_true", help="Skip $indexStats usage report")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(run(args.command, not args.no_usage)))
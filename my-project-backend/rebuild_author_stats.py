@@ -0,0 +1,19 @@
+"""
+Script to rebuild per-author stats from the articles collection
+Run once after deploying, or to repair drift; the API keeps them current afterwards
+"""
+import asyncio
+from motor.motor_asyncio import AsyncIOMotorClient
+from app.core.config import settings
+from app.services.author_stats import rebuild_author_stats
+
+
+async def main():
+    client = AsyncIOMotorClient(settings.mongo_uri)
+    db = client[settings.db_name]
+    summary = await rebuild_author_stats(db)
+    print(f"Rebuilt stats for {summary['authors']} authors")
+    client.close()
+
+if __name__ == "__main__":
+    asyncio.run(main())
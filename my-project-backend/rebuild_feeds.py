@@ -0,0 +1,20 @@
+"""
+Script to regenerate sitemap.xml and the RSS/Atom feeds from approved articles
+Run once after deploying; article approve/update/delete events keep them current
+"""
+import asyncio
+from motor.motor_asyncio import AsyncIOMotorClient
+from app.core.config import settings
+from app.services.feeds import build_feeds
+
+
+async def main():
+    client = AsyncIOMotorClient(settings.mongo_uri)
+    db = client[settings.db_name]
+    summary = await build_feeds(db)
+    print(f"{summary['files']} files ({summary['shards']} sitemap shards), "
+          f"{len(summary['written'])} rewritten, {len(summary['removed'])} removed")
+    client.close()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,20 @@
+"""
+Script to rebuild the related-articles model from all approved articles
+Run after bulk imports or when changing RELATED_DIMENSIONS / RELATED_TOP_K
+"""
+import asyncio
+from motor.motor_asyncio import AsyncIOMotorClient
+from app.core.config import settings
+from app.services.related import rebuild_related
+
+
+async def main():
+    client = AsyncIOMotorClient(settings.mongo_uri)
+    db = client[settings.db_name]
+    summary = await rebuild_related(db)
+    print(f"Rebuilt related articles for {summary['articles']} articles "
+          f"(k={summary['k']}, dimensions={summary['dimensions']})")
+    client.close()
+
+if __name__ == "__main__":
+    asyncio.run(main())
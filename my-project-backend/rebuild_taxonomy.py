@@ -0,0 +1,19 @@
+"""
+Script to rebuild tag/category counts from the articles collection
+Run once after deploying, or to repair drift in the incremental counters
+"""
+import asyncio
+from motor.motor_asyncio import AsyncIOMotorClient
+from app.core.config import settings
+from app.services.taxonomy import rebuild_taxonomy
+
+
+async def main():
+    client = AsyncIOMotorClient(settings.mongo_uri)
+    db = client[settings.db_name]
+    summary = await rebuild_taxonomy(db)
+    print(f"Rebuilt counts for {summary['tags']} tags and {summary['categories']} categories")
+    client.close()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,62 @@
+"""
+Production server entry point
+Usage: python serve.py [--workers N] [--port 8000]
+
+Runs uvicorn with multiple worker processes, uvloop and httptools (when
+installed), tuned keep-alive/backlog, and no auto-reload. On SIGTERM each
+worker stops accepting connections, waits up to SERVER_GRACEFUL_TIMEOUT
+seconds for in-flight requests, then runs the app's lifespan shutdown
+(which flushes buffered trending scores and closes Mongo). uvicorn's access
+log is off unless SERVER_ACCESS_LOG=true, since RequestIdMiddleware already
+logs one app.access line per request (method, route, status, duration_ms
+and request_id). `python -m app.main` runs the same server.
+For local development keep using: python -m uvicorn app.main:app --reload
+"""
+import argparse
+import glob
+import importlib.util
+import os
+import uvicorn
+from app.core.config import settings
+
+
+def default_workers() -> int:
+    return settings.web_concurrency or os.cpu_count() or 1
+
+
+def reset_metrics_dir():
+    """Drop worker snapshots from a previous run so counters start from zero"""
+    if settings.metrics_dir:
+        for path in glob.glob(os.path.join(settings.metrics_dir, "http-*.json")):
+            os.remove(path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the API with production settings")
+    parser.add_argument("--host", default=settings.server_host)
+    parser.add_argument("--port", type=int, default=settings.server_port)
+    parser.add_argument("--workers", type=int, default=default_workers())
+    args = parser.parse_args(argv)
+
+    reset_metrics_dir()
+    uvicorn.run(
+        "app.main:app",
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        loop="uvloop" if importlib.util.find_spec("uvloop") else "asyncio",
+        http="httptools" if importlib.util.find_spec("httptools") else "h11",
+        lifespan="on",
+        reload=False,
+        timeout_keep_alive=settings.server_keep_alive,
+        backlog=settings.server_backlog,
+        timeout_graceful_shutdown=settings.server_graceful_timeout,
+        limit_concurrency=settings.server_limit_concurrency,
+        proxy_headers=True,
+        forwarded_allow_ips=settings.server_forwarded_allow_ips,
+        access_log=settings.server_access_log,
+    )
+
+
+if __name__ == "__main__":
+    main()